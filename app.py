@@ -1,22 +1,37 @@
 import streamlit as st
-import yfinance as yf
-import pandas as pd
-import requests
-import plotly.graph_objects as go
-from supabase import create_client, Client
+import os
+import time
+from contextlib import contextmanager
+from datetime import date
+from mizan import metrics
+from mizan.agent import ANALYSIS_METRICS, STRATEGIES, MizanAgent, exit_targets, run_analysis, score_strategy
+from mizan.boycott import default_boycott_list
+from mizan.charts import DEFAULT_RANGE, INTRADAY, RANGES, as_of as chart_as_of, chart_series
+from mizan.compliance import purification, shariah_timeline
+from mizan.monitor import default_monitor
+from mizan.peers import composite, default_peer_index
+from mizan.snapshot import Fundamentals
+from mizan.symbols import search_remote, search_symbol as find_symbol
+from mizan.watchlist import LOCAL_OWNER, default_watchlists
+from theme import apply_theme
+from translations import TRANSLATIONS
 
 # =========================================================
 # 🔐 CONFIGURATION SUPABASE (AUTH)
 # =========================================================
-# On utilise st.cache_resource pour ne pas reconnecter à chaque clic
+# Début du rerun : la durée totale de la page est enregistrée en fin de script
+run_started = time.perf_counter()
+
+# On utilise st.cache_resource pour ne pas reconnecter à chaque clic.
+# Client créé au premier login / inscription / déconnexion : ni l'import de supabase ni le client HTTP
+# (près d'une seconde à froid) ne retardent le premier rendu.
 @st.cache_resource
 def init_connection():
+    from supabase import create_client
     url = st.secrets["supabase"]["url"]
     key = st.secrets["supabase"]["key"]
     return create_client(url, key)
 
-supabase = init_connection()
-
 # Gestion de la session utilisateur
 if 'user' not in st.session_state:
     st.session_state.user = None
@@ -26,39 +41,8 @@ if 'user' not in st.session_state:
 # =========================================================
 st.set_page_config(page_title="Mizan Investments", page_icon="⚖️", layout="wide")
 
-st.markdown("""
-<style>
-    @import url('https://fonts.googleapis.com/css2?family=Space+Grotesk:wght@300;400;500;600;700&family=Inter:wght@300;400;500;600&display=swap');
-    :root { --bg-dark: #0B0E13; --bg-card: rgba(28, 32, 43, 0.6); --accent-green: #00E096; --accent-gold: #E0C38C; --text-white: #FFFFFF; --text-silver: #C8CDD5; --border-subtle: rgba(255, 255, 255, 0.08); }
-    .stApp { background-color: var(--bg-dark); background-image: radial-gradient(circle at 50% 0%, #151922 0%, #0B0E13 80%), url("data:image/svg+xml,%3Csvg width='60' height='60' viewBox='0 0 60 60' xmlns='http://www.w3.org/2000/svg'%3E%3Cg fill='none' fill-rule='evenodd'%3E%3Cg fill='%231C202B' fill-opacity='0.4'%3E%3Cpath d='M36 34v-4h-2v4h-4v2h4v4h2v-4h4v-2h-4zm0-30V0h-2v4h-4v2h4v4h2V6h4V4h-4zM6 34v-4H4v4H0v2h4v4h2v-4h4v-2H6zM6 4V0H4v4H0v2h4v4h2V6h4V4H6z'/%3E%3C/g%3E%3C/g%3E%3C/svg%3E"); font-family: 'Inter', sans-serif; color: var(--text-silver); }
-    h1, h2, h3 { font-family: 'Space Grotesk', sans-serif !important; letter-spacing: -0.02em; }
-    .glass-card { background: var(--bg-card); backdrop-filter: blur(12px); -webkit-backdrop-filter: blur(12px); border: 1px solid var(--border-subtle); border-radius: 16px; padding: 24px; height: 100%; margin-bottom: 20px; transition: all 0.3s cubic-bezier(0.25, 0.8, 0.25, 1); display: flex; flex-direction: column; justify-content: space-between; box-shadow: 0 4px 20px rgba(0,0,0,0.2); }
-    .glass-card:hover { transform: translateY(-4px); border-color: rgba(0, 224, 150, 0.3); box-shadow: 0 10px 30px rgba(0, 224, 150, 0.1); }
-    .kpi-title { font-family: 'Inter', sans-serif; font-size: 0.8rem; text-transform: uppercase; letter-spacing: 1px; color: #6E7687; margin-bottom: 8px; display: flex; align-items: center; gap: 6px; }
-    .kpi-value { font-family: 'Space Grotesk', sans-serif; font-size: 2rem; font-weight: 700; color: var(--text-white); margin-bottom: 4px; }
-    .kpi-target { font-size: 0.85rem; color: #555; font-family: 'Space Grotesk', sans-serif; }
-    .val-green { color: var(--accent-green); text-shadow: 0 0 15px rgba(0, 224, 150, 0.4); }
-    .val-gold { color: var(--accent-gold); text-shadow: 0 0 15px rgba(224, 195, 140, 0.3); }
-    .val-red { color: #FF4B4B; text-shadow: 0 0 15px rgba(255, 75, 75, 0.3); }
-    .stTextInput > div > div > input { background-color: #0F1218; color: white; border: 1px solid #333; border-radius: 12px; padding: 12px; font-family: 'Space Grotesk'; }
-    .stButton > button { background: linear-gradient(135deg, #00E096 0%, #00B075 100%); color: #0B0E13; border: none; border-radius: 8px; padding: 0.6rem 1.5rem; font-family: 'Space Grotesk', sans-serif; font-weight: 700; text-transform: uppercase; letter-spacing: 0.5px; transition: all 0.3s; }
-    .stButton > button:hover { transform: scale(1.02); box-shadow: 0 0 20px rgba(0, 224, 150, 0.4); color: black; }
-    .stTabs [data-baseweb="tab-list"] { gap: 8px; background-color: rgba(255,255,255,0.02); border-radius: 12px; padding: 8px; }
-    .stTabs [data-baseweb="tab"] { background-color: transparent; border-radius: 8px; color: #6E7687; font-family: 'Space Grotesk'; border: none; }
-    .stTabs [aria-selected="true"] { background-color: #1C202B; color: var(--accent-gold); border: 1px solid rgba(224, 195, 140, 0.2); }
-    .verdict-box { padding: 24px; border-radius: 16px; margin-bottom: 30px; display: flex; align-items: center; gap: 20px; border: 1px solid; backdrop-filter: blur(10px); }
-    .verdict-halal { background: linear-gradient(90deg, rgba(0, 224, 150, 0.1) 0%, rgba(0,0,0,0) 100%); border-color: rgba(0, 224, 150, 0.3); }
-    .verdict-haram { background: linear-gradient(90deg, rgba(255, 75, 75, 0.1) 0%, rgba(0,0,0,0) 100%); border-color: rgba(255, 75, 75, 0.3); }
-    [data-testid="stMetricLabel"] { font-family: 'Inter'; color: #6E7687; font-size: 0.9rem; }
-    [data-testid="stMetricValue"] { font-family: 'Space Grotesk'; color: white; font-size: 1.8rem; font-weight: 600; }
-</style>
-""", unsafe_allow_html=True)
-
-# =========================================================
-# 🚫 BLACKLIST
-# =========================================================
-SECTOR_BLACKLIST = ['Banks', 'Insurance', 'Capital Markets', 'Credit Services', 'Mortgage', 'Beverages - Wineries & Distilleries', 'Beverages - Brewers', 'Tobacco', 'Gambling', 'Casinos', 'Defense']
-KEYWORD_BLACKLIST = ['alcohol', 'liquor', 'wine', 'beer', 'brewery', 'pork', 'gambling', 'casino', 'betting', 'tobacco', 'interest', 'lending', 'banking', 'adult']
+# Feuilles de style communes aux pages (assets/base.css + assets/app.css), lues une fois par process
+apply_theme("app")
 
 # =========================================================
 # 💾 STATE
@@ -68,347 +52,134 @@ if 'selected_strategy' not in st.session_state: st.session_state.selected_strate
 
 def trigger_analysis(ticker): st.session_state.active_ticker = ticker
 
-# =========================================================
-# 🌍 TRADUCTIONS (MODIFIED: INC_HARAM FR RENAMED)
-# =========================================================
-TRANSLATIONS = {
-    'en': {
-        'sidebar_title': "Mizan Inv.", 'sidebar_subtitle': "Institutional Grade Analysis",
-        'analyze_btn': "INITIATE SCAN", 'search_placeholder': "Search ticker...", 
-        'no_result': "No asset found.", 'select_stock': "Select Asset", 'crunching': "Processing...",
-        'hero_title': "Take your wealth<br>to the next level.", 'hero_sub': "Manage. Analyze. Dominate.",
-        'search_title': "ASSET INTELLIGENCE",
-        'methodology': "Proprietary Algorithm",
-
-        'verdict_halal_title': "COMPLIANT ASSET", 'verdict_halal_desc': "Meets quantitative Shariah standards.",
-        'verdict_haram_title': "NON-COMPLIANT", 'verdict_haram_desc': "Failed checks: ",
-        
-        'tab_fund': "STRATEGY AUDIT", 'tab_shariah': "COMPLIANCE", 'tab_exit': "EXIT PLAN",
-        
-        'company': "Issuer", 'company_help': "Official registered name.",
-        'price': "Spot Price", 'price_help': "Real-time market price.",
-        'mcap': "Market Cap", 'mcap_help': "Total value of all shares.",
-        'momentum': "Momentum (3M)", 'momentum_help': "Price trend over last 3 months.",
-        
-        'strategy_label': "STRATEGY SELECTION",
-        'strat_name_fb': "Mizan Strategy (Quality Growth)",
-        'strat_name_bg': "Ben Graham (Modern Value)",
-        'strat_name_pl': "Peter Lynch (Growth)",
-        'strategy_active': "Active Strategy:",
-        'bullets_fin': "• Dynamic FCF Yield 🌟<br>• P/E < 25<br>• Margin > 15%",
-        'bullets_graham': "• P/E < 15<br>• Interest Cov > 3x<br>• ROE > 8%",
-        'bullets_shariah': "• Debt < 33%<br>• Interest < 5%<br>• Real Assets > 20%",
-
-        'per': "P/E Ratio", 'per_help': "Price-to-Earnings Ratio. N/A usually means negative earnings.", 
-        'pb': "P/B Ratio", 'pb_help': "Price-to-Book Ratio.", 
-        'peg': "PEG Ratio", 'peg_help': "Price/Earnings-to-Growth. N/A means no growth or negative earnings.",
-        'fcf_yield': "FCF Yield", 'fcf_help': "Free Cash Flow Yield.",
-        'roe': "ROE", 'roe_help': "Return on Equity.", 
-        'margin': "Ops Margin", 'margin_help': "Operating Margin.",
-        'solvency': "Net Debt/EBITDA", 'solvency_help': "Years to pay off debt.",
-        'growth': "Rev Growth", 'growth_help': "Revenue Growth.",
-        'current_ratio': "Current Ratio", 'current_help': "Short-term liquidity.",
-        'debt_equity': "Debt/Equity", 'de_help': "Total Debt to Equity.",
-        'interest_cov': "Interest Cov.", 'ic_help': "Can the company pay its interest? (EBIT / Interest Expense).",
-        'goal': "Goal:",
-
-        'act_check': "Activity", 'act_help': "Sector Screening.",
-        'inc_haram': "Interest Inc.", 'inc_help': "Interest Income from cash deposits (Riba). Does not include operational revenue.", 'inc_target': "Limit < 5%",
-        'debt': "Leverage", 'debt_help': "Debt/Assets Ratio.", 'debt_target': "Limit < 33%",
-        'real_assets': "Real Assets", 'real_help': "Tangible Assets Ratio.", 'real_target': "Min > 20%",
-        'cash_cap': "Liquidity", 'cash_help': "Cash vs Market Cap.", 'cash_target': "Cash < Market Cap",
-        'boycott_check': "Boycott", 'boycott_help': "Boycott List Check.", 'boycott_target': "Not Listed",
-        
-        'status_safe': "SAFE", 'status_listed': "LISTED",
-        'status_approved': "APPROVED", 'status_restricted': "RESTRICTED",
-        'status_pass': "PASS", 'status_fail': "FAIL",
-
-        # Exit Plan Keys
-        'chart_title': "Price Action (1Y)", 
-        'dynamic_targets': "🎯 Dynamic Targets",
-        'tp1_safety': "TP1 (Safety)", 'tp2_euphoria': "TP2 (Euphoria)",
-        'tp1_help': "Partial profit taking zone.", 'tp2_help': "Full exit recommended.",
-        'trend_ma50': "Trend (MA50)", 'trend_broken': "⚠️ BROKEN", 'trend_intact': "✅ INTACT",
-        'trend_help': "If price falls below this line, the uptrend is broken.",
-        'ps_note': "ℹ️ *Note: Zero profits detected. Targets based on Revenue (Price/Sales).*",
-        'data_insufficient': "Insufficient data to calculate price targets."
-    },
-    'fr': {
-        'sidebar_title': "Mizan Inv.", 'sidebar_subtitle': "Analyse de niveau institutionnel",
-        'analyze_btn': "LANCER LE SCAN", 'search_placeholder': "Rechercher...", 
-        'no_result': "Aucun actif trouvé.", 'select_stock': "Sélectionner l'actif", 'crunching': "Traitement...",
-        'hero_title': "Votre patrimoine passe<br>au niveau supérieur.", 'hero_sub': "Gérez. Analysez. Dominez.",
-        'search_title': "INTELLIGENCE D'ACTIF",
-        'methodology': "Algorithme Propriétaire",
-
-        'verdict_halal_title': "ACTIF CONFORME", 'verdict_halal_desc': "Respecte les standards Shariah.",
-        'verdict_haram_title': "NON-CONFORME", 'verdict_haram_desc': "Échecs : ",
-        
-        'tab_fund': "AUDIT STRATÉGIQUE", 'tab_shariah': "CONFORMITÉ", 'tab_exit': "PLAN DE SORTIE",
-        
-        'company': "Émetteur", 'company_help': "Nom officiel enregistré.",
-        'price': "Prix Spot", 'price_help': "Prix marché temps réel.",
-        'mcap': "Capitalisation", 'mcap_help': "Valeur totale des actions.",
-        'momentum': "Momentum 3M", 'momentum_help': "Tendance sur 3 mois.",
-
-        'strategy_label': "SÉLECTION STRATÉGIE",
-        'strat_name_fb': "Stratégie Mizan (Qualité/Croissance)",
-        'strat_name_bg': "Ben Graham (Modern Value)",
-        'strat_name_pl': "Peter Lynch (Croissance)",
-        'strategy_active': "Stratégie Active :",
-        'bullets_fin': "• Rendement FCF Dynamique<br>• PER < 25<br>• Marge > 15%",
-        'bullets_graham': "• PER < 15<br>• Couv. Intérêts > 3x<br>• ROE > 8%",
-        'bullets_shariah': "• Dette < 33%<br>• Intérêts < 5%<br>• Actifs Réels > 20%",
-
-        'per': "PER", 'per_help': "Ratio Cours/Bénéfice. N/A indique souvent un résultat net négatif.", 
-        'pb': "Price/Book", 'pb_help': "Ratio Cours/Actif Net.", 
-        'peg': "Ratio PEG", 'peg_help': "Ratio PER/Croissance. N/A indique une croissance ou des profits absents.",
-        'fcf_yield': "Rendement FCF", 'fcf_help': "Rendement du Cash Flow Libre.",
-        'roe': "ROE", 'roe_help': "Rentabilité des Capitaux Propres.", 
-        'margin': "Marge Ops", 'margin_help': "Marge Opérationnelle.",
-        'solvency': "Dette Nette/EBITDA", 'solvency_help': "Années pour rembourser la dette.",
-        'growth': "Croissance CA", 'growth_help': "Croissance du CA (Annuel).",
-        'current_ratio': "Ratio Courant", 'current_help': "Liquidité à court terme.",
-        'debt_equity': "Dette/Equity", 'de_help': "Dette sur Capitaux Propres.",
-        'interest_cov': "Couv. Intérêts", 'ic_help': "Capacité à payer les intérêts (EBIT / Charges d'intérêts).",
-        'goal': "Cible :",
-
-        'act_check': "Activité", 'act_help': "Scan Sectoriel.",
-        
-        # --- LABEL RENOMMÉ (FR) ---
-        'inc_haram': "Revenus basés sur Interets", 
-        'inc_help': "Intérêts perçus sur la trésorerie (Riba). N'inclut pas les revenus opérationnels.", 
-        'inc_target': "Limite < 5%",
-        # --------------------------
-
-        'debt': "Levier", 'debt_help': "Ratio Dette/Actifs.", 'debt_target': "Limite < 33%",
-        'real_assets': "Actifs Réels", 'real_help': "Ratio Actifs Tangibles.", 'real_target': "Min > 20%",
-        'cash_cap': "Liquidité", 'cash_help': "Cash vs Capitalisation.", 'cash_target': "Cash < Capitalisation",
-        'boycott_check': "Boycott", 'boycott_help': "Vérification Liste Boycott.", 'boycott_target': "Non Listé",
-
-        'status_safe': "SÛR", 'status_listed': "LISTÉ",
-        'status_approved': "APPROUVÉ", 'status_restricted': "RESTREINT",
-        'status_pass': "VALIDE", 'status_fail': "ÉCHEC",
-
-        # Exit Plan Keys
-        'chart_title': "Action des Prix (1 An)", 
-        'dynamic_targets': "🎯 Objectifs Dynamiques",
-        'tp1_safety': "TP1 (Sécurité)", 'tp2_euphoria': "TP2 (Euphorie)",
-        'tp1_help': "Zone de prise de profits partielle.", 'tp2_help': "Zone de sortie totale conseillée.",
-        'trend_ma50': "Tendance (MA50)", 'trend_broken': "⚠️ CASSÉE", 'trend_intact': "✅ INTACTE",
-        'trend_help': "Si le prix passe sous cette ligne, la tendance haussière est cassée.",
-        'ps_note': "ℹ️ *Note : Profits nuls ou négatifs. Cibles basées sur le Chiffre d'Affaires (Price/Sales).*",
-        'data_insufficient': "Données insuffisantes pour calculer des objectifs de prix."
-    }
-}
-
 # =========================================================
 # 🧠 BACKEND (LOGIQUE AVANCÉE VALORISATION)
 # =========================================================
-class MizanAgent:
-    def __init__(self, ticker):
-        self.ticker = ticker
-        self.stock = yf.Ticker(ticker)
-        self.info = self.stock.info
-        self.financials = self.stock.financials
-        self.balance_sheet = self.stock.balance_sheet
-        self.income_stmt = self.stock.income_stmt
-        self.cashflow = self.stock.cashflow
-        self.data = {}
-        
-    def _safe_get(self, key, default=None): return self.info.get(key, default)
-    def _get_item(self, df, items_list):
-        if df is None or df.empty: return 0
-        for item in items_list:
-            if item in df.index: return df.loc[item].iloc[0]
-        return 0
-
-    def collect_data(self):
-        self.data['name'] = self._safe_get('longName', self.ticker)
-        self.data['industry'] = self._safe_get('industry', 'Unknown')
-        self.data['sector'] = self._safe_get('sector', 'Unknown')
-        self.data['description'] = self._safe_get('longBusinessSummary', '')
-        self.data['current_price'] = self._safe_get('currentPrice', 0)
-        self.data['currency'] = self._safe_get('currency', 'USD')
-        self.data['market_cap'] = self._safe_get('marketCap', 1)
-
-        # VALORISATION : Utilisation de None par défaut
-        self.data['per'] = self._safe_get('trailingPE') # Peut être None
-        self.data['eps'] = self._safe_get('trailingEps')
-        self.data['pb'] = self._safe_get('priceToBook')
-        self.data['peg'] = self._safe_get('pegRatio') # Peut être None
-        
-        self.data['roe'] = self._safe_get('returnOnEquity', 0) * 100 if self._safe_get('returnOnEquity') else 0
-        self.data['ops_margin'] = self._safe_get('operatingMargins', 0) * 100 if self._safe_get('operatingMargins') else 0
-        self.data['current_ratio'] = self._safe_get('currentRatio', 0)
-        self.data['debt_to_equity'] = self._safe_get('debtToEquity', 0)
+# Annuaire local en mémoire ; la recherche Yahoo n'est qu'un repli optionnel, mis en cache entre sessions
+REMOTE_SEARCH = os.environ.get("MIZAN_REMOTE_SEARCH", "1") != "0"
 
-        try:
-            ocf = self._get_item(self.cashflow, ['Operating Cash Flow', 'Total Cash From Operating Activities'])
-            capex = self._get_item(self.cashflow, ['Capital Expenditure', 'Net PPE Purchase And Sale'])
-            fcf = ocf + capex 
-            self.data['fcf_yield'] = (fcf / self.data['market_cap']) * 100 if self.data['market_cap'] > 0 else 0
-        except: self.data['fcf_yield'] = 0
+@st.cache_data(ttl=3600, max_entries=2000, show_spinner=False)
+def search_remote_cached(query):
+    return search_remote(query)
 
-        try:
-            total_debt = self._safe_get('totalDebt', 0)
-            cash = self._safe_get('totalCash', 0)
-            ebitda = self._safe_get('ebitda', 1)
-            self.data['net_debt_ebitda'] = (total_debt - cash) / ebitda if ebitda else 0
-        except: self.data['net_debt_ebitda'] = 0
+def search_symbol(query):
+    return find_symbol(query, remote=search_remote_cached if REMOTE_SEARCH else None)
+
+# Analyse mémorisée par (ticker, jour) et partagée entre sessions : changer de stratégie ou de langue
+# ne relance ni appel réseau ni calcul, seulement score_strategy et la traduction
+@st.cache_data(ttl=900, max_entries=256, show_spinner=False)
+def load_analysis(ticker, as_of):
+    metrics.incr("cache_misses_total", cache="analysis")
+    agent = MizanAgent(ticker)
+    analysis = run_analysis(ticker, agent=agent)
+    # Chaque analyse complète enrichit l'index des pairs (seuls l'industrie et le secteur du ticker seront recalculés).
+    # Instantané de l'agent, comme le screener : les métriques sans données n'y entrent pas avec leur défaut 0.
+    if not degraded(analysis): default_peer_index().update([Fundamentals.from_agent(agent, ANALYSIS_METRICS)])
+    return dict(analysis, as_of=as_of)
+
+def degraded(analysis):
+    # Dataset en échec ou hors délai (valeur de repli vide), ou boycott inconnu
+    return bool(analysis['errors']) or analysis['shariah']['is_boycotted'] is None
+
+def analyze(ticker, as_of):
+    # Une analyse dégradée est affichée mais retirée du cache aussitôt : la demande suivante retente Yahoo
+    analysis = load_analysis(ticker, as_of)
+    if degraded(analysis):
+        metrics.incr("analysis_degraded_total")
+        load_analysis.clear(ticker, as_of)
+    return analysis
+
+# Historique Shariah : les clôtures déjà calculées viennent du cache disque, seules les nouvelles sont recalculées.
+# profile : (activity_ok, activity_msg, is_boycotted) de l'analyse affichée, ni info ni boycott ne sont rechargés.
+@st.cache_data(ttl=900, max_entries=256, show_spinner=False)
+def load_timeline(ticker, as_of, profile):
+    return shariah_timeline(ticker, profile=profile)
+
+# Figure de l'historique par (ticker, jour, fréquence, libellés traduits), partagée comme celle de load_chart.
+# plotly n'est importé qu'au premier graphique (pas au démarrage de la page).
+@st.cache_resource(ttl=900, max_entries=256, show_spinner=False)
+def load_timeline_chart(ticker, as_of, profile, freq, labels):
+    import plotly.graph_objects as go
+    timeline = load_timeline(ticker, as_of, profile)
+    rows = timeline[timeline['freq'] == freq]
+    x = rows['period_end'].dt.strftime('%Y-%m-%d').tolist()
+    fig = go.Figure()
+    for col, label, color, limit in zip(('debt_ratio', 'haram_ratio', 'illiquid_ratio'), labels, ('#E0C38C', '#FF4B4B', '#00E096'), (33, 5, 20)):
+        fig.add_trace(go.Scatter(x=x, y=rows[col].tolist(), mode='lines+markers', name=label, line=dict(color=color, width=2)))
+        fig.add_hline(y=limit, line_dash="dot", line_color=color, opacity=0.4)
+    fig.update_layout(template="plotly_dark", paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', height=320, margin=dict(l=10, r=10, t=20, b=10), font=dict(family="Space Grotesk"), xaxis=dict(showgrid=False), yaxis=dict(showgrid=True, gridcolor='rgba(255,255,255,0.05)', ticksuffix="%"), legend=dict(orientation="h"))
+    return fig
+
+# Figure du plan de sortie mémorisée par (ticker, plage, fraîcheur) : séries réduites par LTTB, traces WebGL.
+# Objet Figure partagé entre sessions (cache_resource, ni copie ni pickle), données en listes : st.plotly_chart
+# revalide entièrement une figure passée en dict, et sérialise les tableaux numpy de dates bien plus lentement
+# que des listes (~75 ms -> ~4 ms par rendu sur 1 000 points).
+@st.cache_resource(ttl=900, max_entries=256, show_spinner=False)
+def load_chart(ticker, chart_range, as_of, tp1, tp2, target_type, title):
+    series = chart_series(ticker, chart_range)
+    if series is None: return None
+    import plotly.graph_objects as go
+    x = series.index.strftime('%Y-%m-%d %H:%M' if chart_range in INTRADAY else '%Y-%m-%d').tolist()
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(x=x, y=series['Close'].tolist(), mode='lines', name='Price', line=dict(color='#00E096', width=2)))
+    if 'MA50' in series: fig.add_trace(go.Scattergl(x=x, y=series['MA50'].tolist(), mode='lines', name='Trend (MA50)', line=dict(color='#6E7687', width=1, dash='solid'), opacity=0.5))
+    fig.add_hline(y=tp1, line_dash="dot", line_color="#E0C38C", annotation_text=f"TP1 ({target_type})", annotation_font_color="#E0C38C")
+    fig.add_hline(y=tp2, line_dash="dot", line_color="#FF4B4B", annotation_text=f"TP2 ({target_type})", annotation_font_color="#FF4B4B")
+    fig.update_layout(template="plotly_dark", title=title, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', height=450, margin=dict(l=10, r=10, t=40, b=10), font=dict(family="Space Grotesk"), xaxis=dict(showgrid=False), yaxis=dict(showgrid=True, gridcolor='rgba(255,255,255,0.05)'))
+    return fig
+
+# Panneau de debug : MIZAN_DEBUG=1 ou ?debug=1 dans l'URL. Export Prometheus sur MIZAN_METRICS_PORT.
+DEBUG = os.environ.get("MIZAN_DEBUG") == "1" or st.query_params.get("debug") == "1"
 
-        # Données pour Exit Plan (RPS) et Croissance
-        try:
-            revs = self.financials.loc['Total Revenue']
-            self.data['revenue_growth'] = ((revs.iloc[0] - revs.iloc[1]) / revs.iloc[1]) * 100 if len(revs) >= 2 else 0
-            shares = self._safe_get('sharesOutstanding', 1)
-            self.data['rps'] = revs.iloc[0] / shares 
-        except: 
-            self.data['revenue_growth'] = 0
-            self.data['rps'] = 0
-
-        # Données pour Modern Graham (Couverture Intérêts)
-        try:
-            ebit = self._get_item(self.financials, ['Ebit', 'Operating Income', 'Earnings Before Interest and Taxes'])
-            interest_expense = self._get_item(self.financials, ['Interest Expense', 'Interest Expense Non Operating'])
-            interest_expense = abs(interest_expense)
-            if interest_expense > 0:
-                self.data['interest_coverage'] = ebit / interest_expense
-            else:
-                self.data['interest_coverage'] = 100 # Safe if no debt
-        except:
-            self.data['interest_coverage'] = 0
+@st.cache_resource
+def start_metrics_server(port):
+    return metrics.serve(port)
 
-        try:
-            hist = self.stock.history(period="3mo")
-            if not hist.empty:
-                start = hist['Close'].iloc[0]
-                end = hist['Close'].iloc[-1]
-                self.data['momentum_3m'] = ((end - start) / start) * 100
-            else: self.data['momentum_3m'] = 0
-        except: self.data['momentum_3m'] = 0
-
-        self.data['total_debt'] = self._safe_get('totalDebt', 0)
-        self.data['total_assets'] = self._get_item(self.balance_sheet, ['Total Assets'])
-        if self.data['total_assets'] == 0: self.data['total_assets'] = 1
-        self.data['interest_income'] = self._get_item(self.income_stmt, ['Interest Income', 'Interest Income Non Operating', 'Total Interest Income'])
-        ppe = self._get_item(self.balance_sheet, ['Net PPE', 'Net Property, Plant And Equipment'])
-        goodwill = self._get_item(self.balance_sheet, ['Goodwill'])
-        intangibles = self._get_item(self.balance_sheet, ['Intangible Assets', 'Other Intangible Assets'])
-        inventory = self._get_item(self.balance_sheet, ['Inventory'])
-        self.data['illiquid_assets'] = ppe + goodwill + intangibles + inventory
-        self.data['current_assets'] = self._get_item(self.balance_sheet, ['Total Current Assets', 'Current Assets'])
-        if self.data['illiquid_assets'] == 0 and self.data['current_assets'] > 0:
-             self.data['illiquid_assets'] = self.data['total_assets'] - self.data['current_assets']
-
-    def evaluate_strategy(self, strategy_key):
-        d = self.data
-        results = [] 
-        
-        per = d.get('per')
-        per_v = f"{per:.2f}" if (per is not None and per > 0) else "N/A"
-        per_val = per if (per is not None and per > 0) else 999
+if os.environ.get(metrics.PORT_ENV): start_metrics_server(int(os.environ[metrics.PORT_ENV]))
 
-        peg = d.get('peg')
-        peg_v = f"{peg:.2f}" if peg is not None else "N/A"
-        
-        pb = d.get('pb')
-        pb_v = f"{pb:.2f}" if pb else "N/A"
-        
-        growth = d.get('revenue_growth', 0)
-        
-        if strategy_key == "Mizan":
-            # 1. FCF Yield Dynamique (Adapté Qualité)
-            if growth > 10:
-                target_fcf = 2.5
-                fcf_desc = "> 2.5% (Growth)"
-            else:
-                target_fcf = 5.0
-                fcf_desc = "> 5% (Mature)"
-            
-            results.append({"k": "fcf_yield", "v": f"{d['fcf_yield']:.2f}%", "t": fcf_desc, "pass": d['fcf_yield'] > target_fcf, "h": "fcf_help"})
-            results.append({"k": "per", "v": per_v, "t": "< 25", "pass": per_val < 25, "h": "per_help"})
-            results.append({"k": "margin", "v": f"{d['ops_margin']:.1f}%", "t": "> 15%", "pass": d['ops_margin'] > 15, "h": "margin_help"})
-            results.append({"k": "solvency", "v": f"{d['net_debt_ebitda']:.2f}x", "t": "< 3.0", "pass": d['net_debt_ebitda'] < 3, "h": "solvency_help"})
-
-        elif strategy_key == "Graham":
-            # MODERN GRAHAM: No P/B, Added Quality & Coverage
-            results.append({"k": "per", "v": per_v, "t": "< 15", "pass": per_val < 15, "h": "per_help"})
-            
-            cr = d['current_ratio'] if d['current_ratio'] else 0
-            results.append({"k": "current_ratio", "v": f"{cr:.2f}", "t": "> 1.5", "pass": cr > 1.5, "h": "current_help"})
-            
-            de = d['debt_to_equity'] if d['debt_to_equity'] else 999
-            results.append({"k": "debt_equity", "v": f"{de:.0f}%", "t": "< 50%", "pass": de < 50, "h": "de_help"})
-            
-            # NOUVEAU: Couverture des Intérêts
-            ic = d.get('interest_coverage', 0)
-            results.append({"k": "interest_cov", "v": f"{ic:.1f}x", "t": "> 3.0x", "pass": ic > 3.0, "h": "ic_help"})
-
-            # NOUVEAU: ROE minimum (éviter les pièges)
-            results.append({"k": "roe", "v": f"{d['roe']:.2f}%", "t": "> 8%", "pass": d['roe'] > 8, "h": "roe_help"})
-
-        elif strategy_key == "Lynch":
-            peg_val = peg if peg is not None else 999
-            results.append({"k": "peg", "v": peg_v, "t": "< 1.0", "pass": peg_val < 1.0, "h": "peg_help"})
-            results.append({"k": "growth", "v": f"{growth:.1f}%", "t": "> 15%", "pass": growth > 15, "h": "growth_help"})
-            de = d['debt_to_equity'] if d['debt_to_equity'] else 999
-            results.append({"k": "debt_equity", "v": f"{de:.0f}%", "t": "< 80%", "pass": de < 80, "h": "de_help"})
-            results.append({"k": "per", "v": per_v, "t": "< 25", "pass": per_val < 25, "h": "per_help"})
-
-        return results
-
-    def check_boycott_status(self):
-        try:
-            clean_name = self.data['name'].replace(" Inc.", "").replace(" Corporation", "").split(" - ")[0].strip()
-            url = f"https://api.boycottisraeli.biz/v1/search/{clean_name}"
-            r = requests.get(url, timeout=2)
-            if r.status_code == 200 and len(r.json()) > 0: return True
-            return False
-        except: return False
-
-    def check_business_activity(self):
-        industry = str(self.data['industry']).lower()
-        sector = str(self.data['sector']).lower()
-        desc = str(self.data['description']).lower()
-        issues = [f"Sector: {s}" for s in SECTOR_BLACKLIST if s.lower() in industry or s.lower() in sector]
-        if not issues:
-            for k in KEYWORD_BLACKLIST:
-                if f" {k} " in f" {desc} ":
-                    issues.append(f"Keyword: {k}")
-                    break
-        return (False, ", ".join(issues)) if issues else (True, "OK")
-
-    def calculate_shariah_ratios(self):
-        d = self.data
-        ratio_haram = (d['interest_income'] / d['total_revenue']) * 100 if 'total_revenue' in d and d['total_revenue'] else 0
-        ratio_debt = (d['total_debt'] / d['total_assets']) * 100
-        ratio_illiquid = (d['illiquid_assets'] / d['total_assets']) * 100
-        is_liquid_ok = d['current_assets'] < d['market_cap']
-        is_act_halal, act_msg = self.check_business_activity()
-        is_boycotted = self.check_boycott_status()
-
-        failures = []
-        if not is_act_halal: failures.append(f"Activity")
-        if is_boycotted: failures.append("Boycott Listed")
-        if ratio_haram >= 5: failures.append("Interest > 5%")
-        if ratio_debt >= 33: failures.append("Debt > 33%")
-        if ratio_illiquid <= 20: failures.append("Real Assets < 20%")
-        if not is_liquid_ok: failures.append("Cash > Cap")
-        
-        return {
-            "haram_ratio": ratio_haram, "debt_ratio": ratio_debt, "illiquid_ratio": ratio_illiquid,
-            "liquid_ok": is_liquid_ok, "activity_ok": is_act_halal, "activity_msg": act_msg, "is_boycotted": is_boycotted,
-            "status": "HALAL" if not failures else "HARAM", "details": failures
-        }
+# Moniteur de watchlists (tendance, TP1/TP2) dans ce process avec MIZAN_MONITOR=1, sinon worker dédié : python -m mizan monitor
+@st.cache_resource
+def start_monitor():
+    return default_monitor().start()
+
+if os.environ.get("MIZAN_MONITOR") == "1": start_monitor()
+
+def alerts_panel(t):
+    # File d'alertes du moniteur pour l'utilisateur connecté (ou "local")
+    watchlists = default_watchlists()
+    owner = st.session_state.user.email if st.session_state.user is not None else LOCAL_OWNER
+    alerts = watchlists.alerts(owner)
+    if not alerts: return
+    with st.expander(f"🔔 {t['alerts_title']} ({len(alerts)})"):
+        for a in alerts:
+            st.markdown(f"**{a['ticker']}** · {t['alert_' + a['kind']]} · {a['price']:.2f} ({a['level']:.2f})")
+        if st.button(t['alerts_read']):
+            watchlists.mark_read(owner, [a['id'] for a in alerts])
+            st.rerun()
 
-def search_symbol(query):
-    try:
-        r = requests.get(f"https://query2.finance.yahoo.com/v1/finance/search?q={query}", headers={'User-Agent': 'Mozilla/5.0'})
-        data = r.json()
-        if 'quotes' in data and len(data['quotes']) > 0: return data['quotes']
-    except: return []
-    return []
+def debug_panel(t):
+    registry = metrics.default_registry()
+    with st.expander(t['debug_title']):
+        stages = registry.stages()
+        if stages:
+            st.caption(t['debug_stages'])
+            st.dataframe([{"stage": k, "n": v["count"], "p50": round(v["p50"], 4), "p95": round(v["p95"], 4), "p99": round(v["p99"], 4), "max": round(v["max"], 4)} for k, v in stages.items()], hide_index=True)
+        caches = registry.cache_rates()
+        if caches:
+            st.caption(t['debug_caches'])
+            st.dataframe([{"cache": k, "lookups": v["lookups"], "hit %": round(100 * v["hit_rate"], 1)} for k, v in caches.items()], hide_index=True)
+        counters = [c for c in registry.counters() if not c["name"].startswith("cache_")]
+        if counters:
+            st.caption(t['debug_counters'])
+            st.dataframe([{"counter": c["name"], "labels": ", ".join(f"{k}={v}" for k, v in c["labels"].items()), "value": c["value"]} for c in counters], hide_index=True)
+        st.download_button("metrics.json", registry.to_json(), file_name="mizan-metrics.json", mime="application/json")
+        st.download_button("metrics.prom", registry.to_prometheus(), file_name="mizan-metrics.prom", mime="text/plain")
+
+def format_age(seconds, day_unit="d"):
+    if seconds is None: return "?"
+    if seconds < 3600: return f"{seconds / 60:.0f} min"
+    if seconds < 86400: return f"{seconds / 3600:.0f} h"
+    return f"{seconds / 86400:.0f} {day_unit}"
 
 def kpi_card(label, value_str, target_text, is_success, help_text, goal_label="Goal:"):
     if is_success: color_class = "val-green"
@@ -416,6 +187,185 @@ def kpi_card(label, value_str, target_text, is_success, help_text, goal_label="G
     icon = """<svg xmlns="http://www.w3.org/2000/svg" width="14" height="14" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><circle cx="12" cy="12" r="10"></circle><line x1="12" y1="16" x2="12" y2="12"></line><line x1="12" y1="8" x2="12.01" y2="8"></line></svg>"""
     st.markdown(f"""<div class="glass-card"><div><div class="kpi-title">{label}<span title="{help_text}" style="cursor:help; opacity:0.6;">{icon}</span></div><div class="kpi-value {color_class}">{value_str}</div></div><div class="kpi-target"><span style="opacity:0.5;">{goal_label}</span> {target_text}</div></div>""", unsafe_allow_html=True)
 
+# =========================================================
+# 🧩 FRAGMENTS (RERUNS PARTIELS)
+# =========================================================
+# Chaque bloc de la page est un st.fragment : taper une recherche, changer la plage du graphique, la
+# fréquence de l'historique ou le nombre d'actions ne réexécute que son bloc, sur l'analyse déjà chargée
+# (passée en argument, sans relecture du cache) et des figures mises en cache. Le script complet ne
+# tourne qu'au lancement d'une analyse et aux changements de la sidebar (langue, stratégie, compte).
+@contextmanager
+def page_errors():
+    # Une erreur reste dans son bloc : les autres onglets s'affichent quand même
+    try: yield
+    except Exception as e:
+        metrics.incr("errors_total", source="page", kind=type(e).__name__)
+        st.error(f"Error: {e}")
+
+@st.fragment
+def search_panel(t):
+    with metrics.span("page.fragment.search"):
+        st.markdown(f"### {t['search_title']}")
+        c1, c2 = st.columns([2, 1])
+        input_ticker = None
+        with c1: search_query = st.text_input("Search", placeholder=t['search_placeholder'], label_visibility="collapsed")
+        with c2:
+            if search_query:
+                with metrics.span("page.search"): results = search_symbol(search_query)
+                if results:
+                    opts = {f"{r['shortname']} ({r['symbol']})": r['symbol'] for r in results if 'shortname' in r}
+                    sel = st.selectbox("Select", opts.keys(), label_visibility="collapsed")
+                    input_ticker = opts[sel]
+                else: st.selectbox("Select", [t['no_result']], disabled=True, label_visibility="collapsed")
+            else: st.selectbox("Select", [t['select_stock']], disabled=True, label_visibility="collapsed")
+
+
+        st.markdown("###")
+        clicked = st.button(t['analyze_btn'], type="primary", use_container_width=True, disabled=not input_ticker)
+    # Nouvelle analyse : toute la page (en-tête, onglets) est relancée
+    if clicked:
+        trigger_analysis(input_ticker)
+        st.rerun()
+
+@st.fragment
+def verdict_header(t, d, shariah):
+    with metrics.span("page.fragment.header"):
+        st.markdown("---")
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric(t['company'], d['name'], help=t['company_help'])
+        m2.metric(t['price'], f"{d['current_price']} {d['currency']}", help=t['price_help'])
+        m3.metric(t['mcap'], f"{d['market_cap']/1e9:.1f}B", help=t['mcap_help'])
+        m4.metric(t['momentum'], f"{d['momentum_3m']:.2f}%", delta="Trend", delta_color="normal" if d['momentum_3m'] > 0 else "inverse", help=t['momentum_help'])
+
+        st.markdown("###")
+        if shariah['status'] == "HALAL":
+            st.markdown(f"""<div class="verdict-box verdict-halal"><div style="font-size:2rem; text-shadow: 0 0 20px #00E096;">⚖️</div><div><div style="font-weight:700; font-size:1.2rem; font-family:'Space Grotesk'; color:#00E096;">{t['verdict_halal_title']}</div><div style="font-size:0.9rem; opacity:0.8;">{t['verdict_halal_desc']}</div></div></div>""", unsafe_allow_html=True)
+        elif shariah['status'] == "UNKNOWN":
+            # Critères financiers respectés mais liste boycott injoignable : pas de verdict HALAL par défaut
+            st.markdown(f"""<div class="verdict-box verdict-unknown"><div style="font-size:2rem; text-shadow: 0 0 20px #E0C38C;">⏳</div><div><div style="font-weight:700; font-size:1.2rem; font-family:'Space Grotesk'; color:#E0C38C;">{t['verdict_unknown_title']}</div><div style="font-size:0.9rem; opacity:0.8;">{t['verdict_unknown_desc']}</div></div></div>""", unsafe_allow_html=True)
+        else:
+            fail_txt = t['verdict_haram_desc'] + ", ".join(shariah['details'])
+            st.markdown(f"""<div class="verdict-box verdict-haram"><div style="font-size:2rem; text-shadow: 0 0 20px #FF4B4B;">🚫</div><div><div style="font-weight:700; font-size:1.2rem; font-family:'Space Grotesk'; color:#FF4B4B;">{t['verdict_haram_title']}</div><div style="font-size:0.9rem; opacity:0.8;">{fail_txt}</div></div></div>""", unsafe_allow_html=True)
+
+@st.fragment
+def fundamentals_tab(t, lang, ticker, d, strategy):
+    with page_errors(), metrics.span("page.fragment.fundamentals"):
+        with metrics.span("page.strategy"): strategy_results = score_strategy(d, strategy)
+        rule_labels = {r.key: r.spec.get('label', {}) for r in STRATEGIES[strategy].rules}
+        cols = st.columns(4)
+        for i, item in enumerate(strategy_results):
+            # SAFE TRANSLATION ACCESS
+            label = t.get(item['k']) or rule_labels.get(item['k'], {}).get(lang, item['k'])
+            tooltip = t.get(item['h'], "") 
+            with cols[i % 4]:
+                kpi_card(label, item['v'], item['t'], item['pass'], tooltip, goal_label=t['goal'])
+
+        # Contexte des pairs : rangs précalculés par l'index (mizan.peers), lus hors du cache d'analyse
+        st.markdown(f"#### {t['peers_title']}")
+        peer = default_peer_index().peers(ticker)
+        if peer is None: st.caption(t['peers_none'])
+        else:
+            st.caption(t['peers_scope'].format(n=peer['count'], group=peer['group']))
+            rules = STRATEGIES[strategy].rules
+            peer_score = composite(peer['ranks'], strategy)
+            pcols = st.columns(len(rules) + 1)
+            pcols[0].metric(t['peers_composite'], f"{peer_score:.0f}/100" if peer_score is not None else "N/A", help=t['peers_composite_help'])
+            for col, rule in zip(pcols[1:], rules):
+                rank, quantiles = peer['ranks'].get(rule.metric), peer['quantiles'].get(rule.metric)
+                median = rule.format.format(quantiles[2]) if quantiles else "N/A"
+                col.metric(t.get(rule.key) or rule_labels.get(rule.key, {}).get(lang, rule.key), f"P{rank:.0f}" if rank is not None else "N/A", help=t['peers_rank_help'].format(median=median))
+
+@st.fragment
+def shariah_tab(t, ticker, d, shariah):
+    with page_errors(), metrics.span("page.fragment.shariah"):
+        cs_a, cs_b = st.columns(2)
+        with cs_a:
+            is_boycotted = shariah['is_boycotted']
+            status_text = t['status_unknown'] if is_boycotted is None else (t['status_listed'] if is_boycotted else t['status_safe'])
+            kpi_card(t['boycott_check'], status_text, t['boycott_target'], is_boycotted is False, t['boycott_help'], goal_label=t['goal'])
+            boycott_list = default_boycott_list()
+            st.caption(t['boycott_age'].format(age=format_age(boycott_list.age, t['unit_day'])) if boycott_list.loaded else t['boycott_live'])
+        with cs_b:
+            is_act_good = shariah['activity_ok']
+            status_text = t['status_approved'] if is_act_good else t['status_restricted']
+            kpi_card(t['act_check'], status_text, d['industry'][:20]+"...", is_act_good, t['act_help'], goal_label=t['goal'])
+        st.markdown("---")
+        cs1, cs2, cs3, cs4 = st.columns(4)
+        # UPDATED KEY: 'inc_haram' (renamed in TRANSLATIONS)
+        with cs1: kpi_card(t['inc_haram'], f"{shariah['haram_ratio']:.2f}%", t['inc_target'], (shariah['haram_ratio'] < 5), t['inc_help'], goal_label=t['goal'])
+        with cs2: kpi_card(t['debt'], f"{shariah['debt_ratio']:.1f}%", t['debt_target'], (shariah['debt_ratio'] < 33), t['debt_help'], goal_label=t['goal'])
+        with cs3: kpi_card(t['real_assets'], f"{shariah['illiquid_ratio']:.1f}%", t['real_target'], (shariah['illiquid_ratio'] > 20), t['real_help'], goal_label=t['goal'])
+        with cs4: 
+            is_liq = shariah['liquid_ok']
+            status_text = t['status_pass'] if is_liq else t['status_fail']
+            kpi_card(t['cash_cap'], status_text, t['cash_target'], is_liq, t['cash_help'], goal_label=t['goal'])
+
+        st.markdown(f"#### {t['timeline_title']}")
+        as_of = date.today().isoformat()
+        profile = (shariah['activity_ok'], shariah['activity_msg'], shariah['is_boycotted'])
+        with metrics.span("page.timeline"): timeline = load_timeline(ticker, as_of, profile)
+        if timeline.empty: st.caption(t['timeline_empty'])
+        else:
+            freq_labels = {'A': t['timeline_annual'], 'Q': t['timeline_quarterly']}
+            freq = st.radio(t['timeline_freq'], list(freq_labels), format_func=freq_labels.get, horizontal=True)
+            rows = timeline[timeline['freq'] == freq]
+            st.plotly_chart(load_timeline_chart(ticker, as_of, profile, freq, (t['debt'], t['inc_haram'], t['real_assets'])), use_container_width=True)
+            st.dataframe(rows[['period_end', 'status', 'debt_ratio', 'haram_ratio', 'illiquid_ratio', 'cash_ratio', 'details']].iloc[::-1].round(2), hide_index=True, use_container_width=True)
+            st.caption(t['timeline_note'])
+
+            st.markdown(f"#### {t['purif_title']}")
+            shares = st.number_input(t['purif_shares'], min_value=0.0, value=0.0, step=1.0, help=t['purif_help'])
+            if shares > 0:
+                purified = purification(timeline, shares)
+                st.metric(t['purif_total'], f"{purified['purification'].sum():.2f} {d['currency']}")
+                st.dataframe(purified[['period_end', 'dividends', 'haram_ratio', 'purification']].iloc[::-1].round(4), hide_index=True, use_container_width=True)
+
+@st.fragment
+def exit_plan_tab(t, ticker, analysis):
+    with page_errors(), metrics.span("page.fragment.exit_plan"):
+        # --- RÉCUPÉRATION DES DONNÉES ---
+        d = analysis['data']
+        hist = analysis['history']
+        current_price = d['current_price']
+
+        # Indicateurs incrémentaux (mizan.indicators) : MA50, drawdown, ATR, croisements, sans recalcul à chaque rendu
+        ind = analysis.get('indicators') or {}
+        ma50_val = ind.get('sma_50', 0) if not hist.empty else 0
+
+        # --- MOTEUR DE CALCUL DES CIBLES ---
+        # Rentable : PER 15 / 25 ; croissance ou déficitaire : P/S 6 / 10 (mêmes cibles que le moniteur de watchlists)
+        target_type, tp1, tp2 = exit_targets(d)
+
+        # --- AFFICHAGE GRAPHIQUE ---
+        if tp1 > 0:
+            chart_range = st.radio(t['chart_range'], list(RANGES), index=list(RANGES).index(DEFAULT_RANGE), format_func=lambda r: t['range_' + r], horizontal=True, key="chart_range")
+            with metrics.span("page.chart"):
+                fig = load_chart(ticker, chart_range, chart_as_of(chart_range), tp1, tp2, target_type, f"{t.get('chart_title', 'Price Action')} ({t['range_' + chart_range]})")
+                if fig is not None: st.plotly_chart(fig, use_container_width=True)
+
+            # --- INDICATEURS DE SORTIE (SÉCURISÉS) ---
+            st.markdown(f"#### {t.get('dynamic_targets', 'Dynamic Targets')}")
+            c1, c2, c3 = st.columns(3)
+
+            c1.metric(t.get('tp1_safety', 'TP1'), f"{tp1:.2f} {d['currency']}", help=t.get('tp1_help', ''))
+            c2.metric(t.get('tp2_euphoria', 'TP2'), f"{tp2:.2f} {d['currency']}", help=t.get('tp2_help', ''))
+
+            is_trend_broken = current_price < ma50_val
+            trend_status = t.get('trend_broken', 'BROKEN') if is_trend_broken else t.get('trend_intact', 'INTACT')
+            c3.metric(t.get('trend_ma50', 'Trend'), trend_status, f"{ma50_val:.2f}", delta_color="normal" if not is_trend_broken else "inverse", help=t.get('trend_help', ''))
+
+            if ind:
+                c4, c5, c6 = st.columns(3)
+                c4.metric(t['drawdown'], f"{ind['drawdown']:.1f}%", help=t['drawdown_help'])
+                c5.metric(t['atr'], f"{ind['atr_14']:.2f} {d['currency']}", help=t['atr_help'])
+                cross_text = {1: t['cross_golden'], -1: t['cross_death']}.get(int(ind['cross']), t['cross_none'])
+                c6.metric(t['ma_cross'], cross_text, ind['cross_at'].strftime('%Y-%m-%d') if ind['cross'] else None, delta_color="off", help=t['cross_help'])
+
+            if target_type == "Sales (P/S)":
+                st.caption(t.get('ps_note', ''))
+        else:
+            st.warning(t.get('data_insufficient', 'Insufficient Data'))
+
 # =========================================================
 # 📱 FRONTEND
 # =========================================================
@@ -432,7 +382,7 @@ with st.sidebar:
             password_login = st.text_input("Password", type="password", key="login_pass")
             if st.button("Se connecter", type="primary"):
                 try:
-                    response = supabase.auth.sign_in_with_password({"email": email_login, "password": password_login})
+                    response = init_connection().auth.sign_in_with_password({"email": email_login, "password": password_login})
                     st.session_state.user = response.user
                     st.rerun()
                 except Exception as e:
@@ -444,7 +394,7 @@ with st.sidebar:
             password_signup = st.text_input("Password", type="password", key="signup_pass")
             if st.button("Créer un compte"):
                 try:
-                    response = supabase.auth.sign_up({"email": email_signup, "password": password_signup})
+                    response = init_connection().auth.sign_up({"email": email_signup, "password": password_signup})
                     st.success("Compte créé ! Vérifiez vos emails ou connectez-vous.")
                 except Exception as e:
                     st.error(f"Erreur : {e}")
@@ -453,7 +403,7 @@ with st.sidebar:
         # Si connecté
         st.success(f"👋 {st.session_state.user.email}")
         if st.button("Se déconnecter"):
-            supabase.auth.sign_out()
+            init_connection().auth.sign_out()
             st.session_state.user = None
             st.rerun()
     
@@ -464,10 +414,12 @@ with st.sidebar:
     lang = 'en' if lang_choice == "English" else 'fr'
     t = TRANSLATIONS[lang]
     st.caption(t['sidebar_subtitle'])
+    alerts_panel(t)
     st.markdown("---")
     
     st.markdown(f"**{t['strategy_label']}**")
-    strat_map = {"Mizan": t['strat_name_fb'], "Graham": t['strat_name_bg'], "Lynch": t['strat_name_pl']}
+    # Noms, puces et règles des stratégies : data/strategies.json
+    strat_map = {key: strategy.name(lang) for key, strategy in STRATEGIES.items()}
     reverse_map = {v: k for k, v in strat_map.items()}
     selected_display_name = st.selectbox("Strat", list(strat_map.values()), key='strategy_box', label_visibility="collapsed")
     st.session_state.selected_strategy = reverse_map[selected_display_name]
@@ -476,8 +428,10 @@ with st.sidebar:
     st.markdown("---")
     st.markdown(f"**{t['methodology']}**")
     
-    with st.expander(t['strat_name_fb']): st.markdown(f"<div style='font-size:13px; color:#C8CDD5;'>{t['bullets_fin']}</div>", unsafe_allow_html=True)
-    with st.expander(t['strat_name_bg']): st.markdown(f"<div style='font-size:13px; color:#C8CDD5;'>{t.get('bullets_graham', '')}</div>", unsafe_allow_html=True)
+    for key, strategy in STRATEGIES.items():
+        bullets = strategy.spec.get('bullets', {}).get(lang)
+        if bullets:
+            with st.expander(strat_map[key]): st.markdown(f"<div style='font-size:13px; color:#C8CDD5;'>{'<br>'.join('• ' + b for b in bullets)}</div>", unsafe_allow_html=True)
     with st.expander(t['tab_shariah']): st.markdown(f"<div style='font-size:13px; color:#C8CDD5;'>{t['bullets_shariah']}</div>", unsafe_allow_html=True)
     
     st.markdown("---")
@@ -486,136 +440,27 @@ with st.sidebar:
 
 st.markdown(f"""<div style="margin-bottom: 40px;"><h1 style="font-size: 3.5rem; line-height: 1.1;">{t['hero_title']}</h1><p style="font-size: 1.2rem; color: #00E096; font-family: 'Space Grotesk'; margin-top:10px;">{t['hero_sub']}</p></div>""", unsafe_allow_html=True)
 
-st.markdown(f"### {t['search_title']}")
-c1, c2 = st.columns([2, 1])
-input_ticker = None
-with c1: search_query = st.text_input("Search", placeholder=t['search_placeholder'], label_visibility="collapsed")
-with c2:
-    if search_query:
-        results = search_symbol(search_query)
-        if results:
-            opts = {f"{r['shortname']} ({r['symbol']})": r['symbol'] for r in results if 'shortname' in r}
-            sel = st.selectbox("Select", opts.keys(), label_visibility="collapsed")
-            input_ticker = opts[sel]
-        else: st.selectbox("Select", [t['no_result']], disabled=True, label_visibility="collapsed")
-    else: st.selectbox("Select", [t['select_stock']], disabled=True, label_visibility="collapsed")
-
-st.markdown("###")
-if st.button(t['analyze_btn'], type="primary", use_container_width=True, disabled=not input_ticker): trigger_analysis(input_ticker)
+search_panel(t)
 
 if st.session_state.active_ticker:
     ticker = st.session_state.active_ticker
     with st.spinner(t['crunching']):
         try:
-            agent = MizanAgent(ticker)
-            agent.collect_data()
-            d = agent.data
-            shariah = agent.calculate_shariah_ratios()
-            strategy_results = agent.evaluate_strategy(st.session_state.selected_strategy)
-
-            st.markdown("---")
-            m1, m2, m3, m4 = st.columns(4)
-            m1.metric(t['company'], d['name'], help=t['company_help'])
-            m2.metric(t['price'], f"{d['current_price']} {d['currency']}", help=t['price_help'])
-            m3.metric(t['mcap'], f"{d['market_cap']/1e9:.1f}B", help=t['mcap_help'])
-            m4.metric(t['momentum'], f"{d['momentum_3m']:.2f}%", delta="Trend", delta_color="normal" if d['momentum_3m'] > 0 else "inverse", help=t['momentum_help'])
-            
-            st.markdown("###")
-            if shariah['status'] == "HALAL":
-                st.markdown(f"""<div class="verdict-box verdict-halal"><div style="font-size:2rem; text-shadow: 0 0 20px #00E096;">⚖️</div><div><div style="font-weight:700; font-size:1.2rem; font-family:'Space Grotesk'; color:#00E096;">{t['verdict_halal_title']}</div><div style="font-size:0.9rem; opacity:0.8;">{t['verdict_halal_desc']}</div></div></div>""", unsafe_allow_html=True)
-            else:
-                fail_txt = t['verdict_haram_desc'] + ", ".join(shariah['details'])
-                st.markdown(f"""<div class="verdict-box verdict-haram"><div style="font-size:2rem; text-shadow: 0 0 20px #FF4B4B;">🚫</div><div><div style="font-weight:700; font-size:1.2rem; font-family:'Space Grotesk'; color:#FF4B4B;">{t['verdict_haram_title']}</div><div style="font-size:0.9rem; opacity:0.8;">{fail_txt}</div></div></div>""", unsafe_allow_html=True)
+            metrics.incr("cache_lookups_total", cache="analysis")
+            with metrics.span("page.analysis"): analysis = analyze(ticker, date.today().isoformat())
+            verdict_header(t, analysis['data'], analysis['shariah'])
 
             tab1, tab2, tab3 = st.tabs([t['tab_fund'], t['tab_shariah'], t['tab_exit']])
+            with tab1: fundamentals_tab(t, lang, ticker, analysis['data'], st.session_state.selected_strategy)
+            with tab2: shariah_tab(t, ticker, analysis['data'], analysis['shariah'])
+            with tab3: exit_plan_tab(t, ticker, analysis)
 
-            with tab1:
-                cols = st.columns(4)
-                for i, item in enumerate(strategy_results):
-                    # SAFE TRANSLATION ACCESS
-                    label = t.get(item['k'], item['k']) 
-                    tooltip = t.get(item['h'], "") 
-                    with cols[i % 4]:
-                        kpi_card(label, item['v'], item['t'], item['pass'], tooltip, goal_label=t['goal'])
-
-            with tab2:
-                cs_a, cs_b = st.columns(2)
-                with cs_a:
-                    is_boycotted = shariah['is_boycotted']
-                    status_text = t['status_listed'] if is_boycotted else t['status_safe']
-                    kpi_card(t['boycott_check'], status_text, t['boycott_target'], (not is_boycotted), t['boycott_help'], goal_label=t['goal'])
-                with cs_b:
-                    is_act_good = shariah['activity_ok']
-                    status_text = t['status_approved'] if is_act_good else t['status_restricted']
-                    kpi_card(t['act_check'], status_text, d['industry'][:20]+"...", is_act_good, t['act_help'], goal_label=t['goal'])
-                st.markdown("---")
-                cs1, cs2, cs3, cs4 = st.columns(4)
-                # UPDATED KEY: 'inc_haram' (renamed in TRANSLATIONS)
-                with cs1: kpi_card(t['inc_haram'], f"{shariah['haram_ratio']:.2f}%", t['inc_target'], (shariah['haram_ratio'] < 5), t['inc_help'], goal_label=t['goal'])
-                with cs2: kpi_card(t['debt'], f"{shariah['debt_ratio']:.1f}%", t['debt_target'], (shariah['debt_ratio'] < 33), t['debt_help'], goal_label=t['goal'])
-                with cs3: kpi_card(t['real_assets'], f"{shariah['illiquid_ratio']:.1f}%", t['real_target'], (shariah['illiquid_ratio'] > 20), t['real_help'], goal_label=t['goal'])
-                with cs4: 
-                    is_liq = shariah['liquid_ok']
-                    status_text = t['status_pass'] if is_liq else t['status_fail']
-                    kpi_card(t['cash_cap'], status_text, t['cash_target'], is_liq, t['cash_help'], goal_label=t['goal'])
-
-            with tab3:
-                # --- RÉCUPÉRATION DES DONNÉES ---
-                hist = agent.stock.history(period="1y")
-                current_price = d['current_price']
-                
-                # Calcul de la Moyenne Mobile 50 jours
-                if not hist.empty:
-                    hist['MA50'] = hist['Close'].rolling(window=50).mean()
-                    ma50_val = hist['MA50'].iloc[-1]
-                else:
-                    ma50_val = 0
-
-                # --- MOTEUR DE CALCUL DES CIBLES ---
-                eps_val = d.get('eps', 0)
-                rps_val = d.get('rps', 0)
-                
-                target_type = ""
-                tp1, tp2 = 0, 0
-
-                # CAS 1 : Rentable (PER)
-                if eps_val > 0:
-                    target_type = "Earnings (PER)"
-                    tp1 = eps_val * 15  
-                    tp2 = eps_val * 25  
-                
-                # CAS 2 : Croissance/Déficitaire (Price/Sales)
-                elif rps_val > 0:
-                    target_type = "Sales (P/S)"
-                    tp1 = rps_val * 6   
-                    tp2 = rps_val * 10  
-                
-                # --- AFFICHAGE GRAPHIQUE ---
-                if tp1 > 0:
-                    fig = go.Figure()
-                    fig.add_trace(go.Scatter(x=hist.index, y=hist['Close'], mode='lines', name='Price', line=dict(color='#00E096', width=2)))
-                    fig.add_trace(go.Scatter(x=hist.index, y=hist['MA50'], mode='lines', name='Trend (MA50)', line=dict(color='#6E7687', width=1, dash='solid'), opacity=0.5))
-                    fig.add_hline(y=tp1, line_dash="dot", line_color="#E0C38C", annotation_text=f"TP1 ({target_type})", annotation_font_color="#E0C38C")
-                    fig.add_hline(y=tp2, line_dash="dot", line_color="#FF4B4B", annotation_text=f"TP2 ({target_type})", annotation_font_color="#FF4B4B")
-                    fig.update_layout(template="plotly_dark", title=t.get('chart_title', "Price Action"), paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', height=450, margin=dict(l=10, r=10, t=40, b=10), font=dict(family="Space Grotesk"), xaxis=dict(showgrid=False), yaxis=dict(showgrid=True, gridcolor='rgba(255,255,255,0.05)'))
-                    st.plotly_chart(fig, use_container_width=True)
-                    
-                    # --- INDICATEURS DE SORTIE (SÉCURISÉS) ---
-                    st.markdown(f"#### {t.get('dynamic_targets', 'Dynamic Targets')}")
-                    c1, c2, c3 = st.columns(3)
-                    
-                    c1.metric(t.get('tp1_safety', 'TP1'), f"{tp1:.2f} {d['currency']}", help=t.get('tp1_help', ''))
-                    c2.metric(t.get('tp2_euphoria', 'TP2'), f"{tp2:.2f} {d['currency']}", help=t.get('tp2_help', ''))
-                    
-                    is_trend_broken = current_price < ma50_val
-                    trend_status = t.get('trend_broken', 'BROKEN') if is_trend_broken else t.get('trend_intact', 'INTACT')
-                    c3.metric(t.get('trend_ma50', 'Trend'), trend_status, f"{ma50_val:.2f}", delta_color="normal" if not is_trend_broken else "inverse", help=t.get('trend_help', ''))
-
-                    if target_type == "Sales (P/S)":
-                        st.caption(t.get('ps_note', ''))
-                else:
-                    st.warning(t.get('data_insufficient', 'Insufficient Data'))
-
-        except Exception as e: st.error(f"Error: {e}")
+        except Exception as e:
+            metrics.incr("errors_total", source="page", kind=type(e).__name__)
+            st.error(f"Error: {e}")
 elif not st.session_state.active_ticker:
-    st.markdown(f"""<div style="margin-top:50px; text-align:center; opacity:0.5;"><p>Mizan Protocol v7.9 • Final Stable Release</p></div>""", unsafe_allow_html=True)
\ No newline at end of file
+    st.markdown(f"""<div style="margin-top:50px; text-align:center; opacity:0.5;"><p>Mizan Protocol v7.9 • Final Stable Release</p></div>""", unsafe_allow_html=True)
+
+metrics.observe("page.run", time.perf_counter() - run_started)
+if DEBUG:
+    with st.sidebar: debug_panel(t)
\ No newline at end of file
@@ -0,0 +1,182 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, "fixtures")
+# Tout tourne hors ligne sur les fixtures (avant tout import de mizan)
+os.environ.setdefault("MIZAN_REPLAY", FIXTURES)
+sys.path.insert(0, ROOT)
+
+from mizan import yahoo
+from mizan.agent import ANALYSIS_METRICS, STRATEGY_METRICS, MizanAgent
+from mizan.backtest import load_ticker, prepare_universe, run_backtest
+from mizan.boycott import BoycottList
+from mizan.cache import DiskCache
+from mizan.charts import chart_series
+from mizan.indicators import IndicatorBank
+from mizan.monitor import WatchlistMonitor
+from mizan.peers import PeerIndex
+from mizan.prices import PriceStore
+from mizan.replay import ReplayProvider
+from mizan.screener import score_frame, shariah_columns
+from mizan.snapshot import Fundamentals, FundamentalsTable
+from mizan.statements import field_matrix
+from mizan.watchlist import WatchlistStore
+from startup import cold_starts
+
+# =========================================================
+# ⏱️ BENCHMARKS (REJEU HORS LIGNE)
+# =========================================================
+# python benchmarks/bench.py                  -> 1, 100 et 5 000 tickers
+# python benchmarks/bench.py --compare        -> échoue si une étape régresse vs la dernière mesure
+RESULTS = os.path.join(ROOT, "benchmarks", "results.jsonl")
+SIZES = (1, 100, 5000)
+RENDER_MAX = 100
+
+
+def universe(provider, n):
+    # Les fixtures d'abord, puis des tickers synthétiques qui rejouent une fixture
+    tickers = list(provider.tickers[:n])
+    return tickers + [f"T{i:05d}" for i in range(n - len(tickers))]
+
+
+def bench_engine(provider, tickers):
+    cache = DiskCache(":memory:", max_bytes=4 * 1024 ** 3)
+    prices = PriceStore(cache, provider.history)
+    boycott = BoycottList(os.path.join(FIXTURES, "boycott.json"))
+    timings = {}
+
+    def timed(stage, fn):
+        start = time.perf_counter()
+        out = fn()
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+        return out
+
+    for label in ("cold", "warm"):
+        agents = [MizanAgent(t, cache=cache, prices=prices, boycott=boycott) for t in tickers]
+        timed(f"collect_data_{label}", lambda: [a.collect_data(ANALYSIS_METRICS) for a in agents])
+    timed("evaluate_strategy", lambda: [a.evaluate_strategy(s) for a in agents for s in STRATEGY_METRICS])
+    timed("calculate_shariah_ratios", lambda: [a.calculate_shariah_ratios() for a in agents])
+    # Même travail en colonnes : toutes les stratégies + Shariah sur un seul DataFrame
+    frame = pd.DataFrame([dict(a.data, ticker=a.ticker, is_boycotted=a.check_boycott_status()) for a in agents])
+    shariah = timed("shariah_columns", lambda: shariah_columns(frame))
+    timed("score_frame", lambda: [score_frame(frame, s, shariah) for s in STRATEGY_METRICS])
+    # Instantanés compacts : construction de la table typée et aller-retour en octets (échange entre processus)
+    table = timed("snapshot_table", lambda: FundamentalsTable.from_records([Fundamentals.from_agent(a, ANALYSIS_METRICS) for a in agents]))
+    timed("snapshot_bytes", lambda: FundamentalsTable.from_bytes(table.to_bytes()).to_frame())
+    # Index des pairs : ingestion des instantanés (recalcul des groupes compris), puis une lecture par ticker
+    peers = PeerIndex(":memory:")
+    timed("peers_update", lambda: (peers.update([table.record(a.ticker) for a in agents]), peers.peers(tickers[0])))
+    timed("peers_lookup", lambda: [peers.peers(t) for t in tickers])
+    # Backtest mensuel sur les données déjà en cache (le chargement n'est pas chronométré)
+    data = {a.ticker: load_ticker(a.ticker, agent=a) for a in agents}
+    # Champs canoniques de la dernière clôture pour tout l'univers (tickers x champs, NaN quand absent)
+    timed("field_matrix", lambda: field_matrix({t: d["statements"] for t, d in data.items()}))
+    universe = timed("backtest_prepare", lambda: prepare_universe(data))
+    timed("backtest", lambda: [run_backtest(None, s, freq='M', universe=universe) for s in STRATEGY_METRICS])
+    # Graphique du plan de sortie sur tout l'historique (séries mises en cache d'abord, hors chrono) : réduit à
+    # CHART_POINTS points par LTTB
+    for t in tickers: chart_series(t, 'max', cache=cache)
+    timed("chart_series", lambda: [chart_series(t, 'max', cache=cache) for t in tickers])
+    # Indicateurs : amorçage complet, puis une seule nouvelle barre (seule la dernière barre est rejouée)
+    bank = IndicatorBank()
+    histories = {t: d['history'] for t, d in data.items()}
+    timed("indicators_seed", lambda: bank.ingest({t: h.iloc[:-1] for t, h in histories.items()}, include_last=True))
+    timed("indicators_update", lambda: bank.snapshot(prices=bank.ingest(histories, include_last=True) or None))
+    # Moniteur de watchlists : premier cycle (objectifs + amorçage), puis cycle sans mouvement de cours
+    watchlists = WatchlistStore(":memory:")
+    watchlists.save("bench", tickers)
+    monitor = WatchlistMonitor(watchlists, prices, IndicatorBank(), cache, request_interval=0.0, target_budget=len(tickers))
+    timed("monitor_cold", monitor.run_once)
+    timed("monitor_warm", monitor.run_once)
+    return timings
+
+
+def bench_render(tickers):
+    # Chemin complet de la page (Streamlit AppTest), mémo d'analyse compris
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        return None
+    # Hors serveur, Streamlit journalise un avertissement par appel de cache : on le fait taire
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith("streamlit"): logging.getLogger(name).setLevel(logging.ERROR)
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=120)
+    at.secrets["supabase"] = {"url": "https://bench.supabase.co", "key": "bench"}
+    start = time.perf_counter()
+    for ticker in tickers:
+        at.session_state["active_ticker"] = ticker
+        at.run()
+        if at.exception: raise RuntimeError(at.exception[0].value)
+    return time.perf_counter() - start
+
+
+def git_commit():
+    try: return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip() or None
+    except OSError: return None
+
+
+def last_record(path):
+    try:
+        with open(path, encoding="utf-8") as f: lines = [l for l in f if l.strip()]
+    except OSError: return None
+    return json.loads(lines[-1]) if lines else None
+
+
+def compare(previous, current, threshold):
+    regressions = []
+    for key, seconds in current["results"].items():
+        before = previous["results"].get(key)
+        if before and seconds > before * (1 + threshold): regressions.append((key, before, seconds))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mizan offline benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--render-max", type=int, default=RENDER_MAX, help="largest universe for the page render stage")
+    parser.add_argument("--no-render", action="store_true")
+    parser.add_argument("--results", default=RESULTS, help="JSON lines history file")
+    parser.add_argument("--compare", action="store_true", help="exit 1 if a stage is slower than the previous record")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before --compare fails (0.25 = +25%%)")
+    args = parser.parse_args(argv)
+
+    provider = ReplayProvider(FIXTURES, alias_unknown=True)
+    yahoo.use_provider(provider)
+    results = {}
+    for n in args.sizes:
+        tickers = universe(provider, n)
+        for stage, seconds in bench_engine(provider, tickers).items(): results[f"{stage}[{n}]"] = seconds
+        if not args.no_render and n <= args.render_max:
+            seconds = bench_render(tickers)
+            if seconds is not None: results[f"page_render[{n}]"] = seconds
+    if not args.no_render:
+        # Démarrage à froid : premier rendu de chaque page dans un interpréteur neuf (détail : benchmarks/startup.py)
+        for page, seconds in cold_starts().items(): results[f"cold_start[{page}]"] = seconds
+
+    record = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"), "commit": git_commit(),
+        "python": platform.python_version(), "machine": platform.machine(), "results": results,
+    }
+    for key, seconds in results.items(): print(f"{key:<36} {seconds * 1000:>10.1f} ms")
+
+    previous = last_record(args.results)
+    with open(args.results, "a", encoding="utf-8") as f: f.write(json.dumps(record) + "\n")
+    if args.compare and previous:
+        regressions = compare(previous, record, args.threshold)
+        for key, before, after in regressions: print(f"REGRESSION {key}: {before * 1000:.1f} ms -> {after * 1000:.1f} ms", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, "fixtures")
+PAGES = {"app": "app.py", "strategies": os.path.join("pages", "strategies.py"), "screener": os.path.join("pages", "screener.py")}
+MARK = "-- mizan: first run --"
+
+# =========================================================
+# 🚀 PROFIL DE DÉMARRAGE (IMPORTS & PREMIER RENDU)
+# =========================================================
+# python benchmarks/startup.py                -> chaque page dans un interpréteur neuf (conteneur froid)
+# python benchmarks/startup.py app --top 20   -> détail des paquets importés pendant le premier rendu
+# Le premier rendu comprend les imports que la page ajoute à Streamlit ; le second rendu (rerun) n'en fait plus.
+RUNNER = """
+import json, logging, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+for name in list(logging.root.manager.loggerDict):
+    if name.startswith("streamlit"): logging.getLogger(name).setLevel(logging.ERROR)
+ready = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.secrets["supabase"] = {"url": "https://bench.supabase.co", "key": "bench"}
+print(sys.argv[2], file=sys.stderr, flush=True)
+first = time.perf_counter()
+at.run()
+rerun = time.perf_counter()
+at.run()
+end = time.perf_counter()
+if at.exception: raise SystemExit(at.exception[0].value)
+print(json.dumps({"streamlit": ready - start, "first_render": rerun - first, "rerun": end - rerun}))
+"""
+
+
+def parse_importtime(lines):
+    # Lignes "import time: self | cumulé | module" : seuls les imports de premier niveau (non indentés) sont sommés, par paquet racine
+    packages = {}
+    for line in lines:
+        if not line.startswith("import time:") or "|" not in line: continue
+        _, cumulative, name = line.split("|", 2)
+        if name.startswith("  ") or not cumulative.strip().isdigit(): continue
+        root = name.strip().split(".")[0]
+        packages[root] = packages.get(root, 0.0) + int(cumulative) / 1e6
+    return packages
+
+
+def profile(page):
+    # Un interpréteur neuf par page, hors ligne (fixtures) ; imports du premier rendu isolés par un marqueur sur stderr
+    env = dict(os.environ, MIZAN_REPLAY=os.environ.get("MIZAN_REPLAY", FIXTURES))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", RUNNER, os.path.join(ROOT, PAGES[page]), MARK],
+                          cwd=ROOT, env=env, capture_output=True, text=True)
+    if proc.returncode: raise RuntimeError(f"{page}: {proc.stderr.strip().splitlines()[-1]}")
+    stderr = proc.stderr.splitlines()
+    timings = json.loads(proc.stdout.strip().splitlines()[-1])
+    imports = parse_importtime(stderr[stderr.index(MARK) + 1:])
+    return dict(timings, imports=sum(imports.values()), packages=imports)
+
+
+def cold_starts(pages=("app", "strategies")):
+    # Pour bench.py : premier rendu de chaque page dans un interpréteur neuf
+    return {page: profile(page)["first_render"] for page in pages}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mizan startup profile")
+    parser.add_argument("pages", nargs="*", help=f"among {', '.join(PAGES)} (default: all)")
+    parser.add_argument("--top", type=int, default=8, help="packages listed per page")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+    for page in args.pages:
+        if page not in PAGES: parser.error(f"unknown page: {page}")
+    report = {page: profile(page) for page in args.pages or PAGES}
+    if args.json:
+        print(json.dumps(report))
+        return 0
+    for page, r in report.items():
+        print(f"{page:<12} streamlit {r['streamlit'] * 1000:>7.0f} ms · first render {r['first_render'] * 1000:>7.0f} ms "
+              f"(imports {r['imports'] * 1000:.0f} ms) · rerun {r['rerun'] * 1000:>6.0f} ms")
+        for name, seconds in sorted(r["packages"].items(), key=lambda kv: -kv[1])[:args.top]:
+            print(f"    {name:<28} {seconds * 1000:>8.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mizan.replay import write_frame
+
+# =========================================================
+# 🧪 FIXTURES SYNTHÉTIQUES (SOCIÉTÉS FICTIVES)
+# =========================================================
+# Régénère les fixtures de rejeu sans réseau : python fixtures/synth.py
+# Pour des données réelles : python -m mizan.replay AAPL MSFT
+ROOT = os.path.dirname(os.path.abspath(__file__))
+AS_OF = pd.Timestamp('2026-10-16')
+YEARS = pd.to_datetime(['2025-12-31', '2024-12-31', '2023-12-31', '2022-12-31'])
+QUARTERS = pd.to_datetime(['2026-06-30', '2026-03-31', '2025-12-31', '2025-09-30', '2025-06-30'])
+
+COMPANIES = {
+    # Logiciel peu endetté : conforme, profil Mizan / Lynch
+    'ACME': dict(name='Acme Software Corporation', sector='Technology', industry='Software - Application', price=142.0, shares=2.1e9,
+                 revenue=3.8e10, growth=0.18, op_margin=0.31, net_margin=0.24, debt=6e9, cash=1.9e10, assets=7.4e10, ppe=9e9, goodwill=1.1e10,
+                 inventory=0.0, current_assets=3.1e10, current_liabilities=1.4e10, equity=4.2e10, interest_income=6e8, interest_expense=2.5e8,
+                 summary="Acme Software develops cloud productivity and security software for enterprises worldwide.", seed=1),
+    # Banque : échoue au filtre d'activité
+    'GLBX': dict(name='Globex Financial Group, Inc.', sector='Financial Services', industry='Banks - Regional', price=48.5, shares=1.2e9,
+                 revenue=2.2e10, growth=0.04, op_margin=0.36, net_margin=0.27, debt=9.5e10, cash=3.0e10, assets=4.1e11, ppe=4e9, goodwill=2e9,
+                 inventory=0.0, current_assets=1.2e11, current_liabilities=2.9e11, equity=3.6e10, interest_income=1.4e10, interest_expense=6e9,
+                 summary="Globex provides retail banking, lending and wealth management services.", seed=2),
+    # Agroalimentaire endetté et mature : profil Graham limite
+    'INIT': dict(name='Initech Foods Co.', sector='Consumer Defensive', industry='Packaged Foods', price=61.2, shares=6.5e8,
+                 revenue=2.6e10, growth=0.03, op_margin=0.14, net_margin=0.09, debt=1.6e10, cash=1.8e9, assets=4.0e10, ppe=1.2e10, goodwill=9e9,
+                 inventory=3.1e9, current_assets=9.5e9, current_liabilities=8.8e9, equity=1.4e10, interest_income=9e7, interest_expense=6.4e8,
+                 summary="Initech Foods manufactures packaged snacks, cereals and frozen meals sold in grocery chains.", seed=3),
+}
+
+
+def yearly(value, growth, periods=YEARS):
+    # Colonne la plus récente en premier, comme yfinance
+    return [value / (1 + growth) ** i for i in range(len(periods))]
+
+
+def statements(c, periods=YEARS, flow=1.0, step=1.0):
+    # flow : part de l'exercice couverte par une colonne (1/4 en trimestriel) ; step : part de la croissance annuelle par colonne
+    g = c['growth'] * step
+    rev = [r * flow for r in yearly(c['revenue'], g, periods)]
+    op = [r * c['op_margin'] for r in rev]
+    net = [r * c['net_margin'] for r in rev]
+    income = pd.DataFrame({
+        'Total Revenue': rev, 'Operating Income': op, 'EBIT': [o * 1.02 for o in op],
+        'EBITDA': [o * 1.25 for o in op], 'Net Income': net,
+        'Interest Income': [v * flow for v in yearly(c['interest_income'], g, periods)], 'Interest Expense': [v * flow for v in yearly(c['interest_expense'], 0.02 * step, periods)],
+        'Diluted Average Shares': [c['shares']] * len(periods), 'Diluted EPS': [n / c['shares'] for n in net],
+    }, index=periods).T
+    balance = pd.DataFrame({
+        'Total Assets': yearly(c['assets'], g / 2, periods), 'Current Assets': yearly(c['current_assets'], g / 2, periods),
+        'Current Liabilities': yearly(c['current_liabilities'], g / 2, periods), 'Net PPE': yearly(c['ppe'], 0.03 * step, periods),
+        'Goodwill': [c['goodwill']] * len(periods), 'Inventory': yearly(c['inventory'], 0.03 * step, periods), 'Total Debt': yearly(c['debt'], 0.02 * step, periods),
+        'Cash And Cash Equivalents': yearly(c['cash'], 0.05 * step, periods), 'Stockholders Equity': yearly(c['equity'], g / 2, periods),
+    }, index=periods).T
+    ocf = [n * 1.2 for n in net]
+    capex = [-r * 0.04 for r in rev]
+    cashflow = pd.DataFrame({
+        'Operating Cash Flow': ocf, 'Capital Expenditure': capex, 'Free Cash Flow': [o + k for o, k in zip(ocf, capex)],
+        'Cash Dividends Paid': [-n * 0.3 for n in net],
+    }, index=periods).T
+    return income, balance, cashflow, net
+
+
+def build(symbol, c):
+    income, balance, cashflow, net = statements(c)
+    quarterly = statements(c, QUARTERS, flow=0.25, step=0.25)[:3]
+
+    rng = np.random.default_rng(c['seed'])
+    days = pd.bdate_range(end=AS_OF, periods=5 * 252)
+    close = np.exp(np.cumsum(rng.normal(0.0003, 0.015, len(days))))
+    close = close / close[-1] * c['price']
+    spread = close * rng.uniform(0.003, 0.02, len(days))
+    history = pd.DataFrame({
+        'Open': close + rng.normal(0, 0.3, len(days)) * spread, 'High': close + spread, 'Low': close - spread,
+        'Close': close, 'Volume': rng.integers(2_000_000, 30_000_000, len(days)), 'Dividends': 0.0, 'Stock Splits': 0.0,
+    }, index=days.tz_localize('America/New_York').rename('Date')).round(4)
+
+    eps = net[0] / c['shares']
+    info = {
+        'symbol': symbol, 'longName': c['name'], 'shortName': c['name'], 'sector': c['sector'], 'industry': c['industry'],
+        'longBusinessSummary': c['summary'], 'currency': 'USD', 'currentPrice': c['price'], 'marketCap': c['price'] * c['shares'],
+        'sharesOutstanding': c['shares'], 'trailingEps': round(eps, 2), 'trailingPE': round(c['price'] / eps, 2),
+        'priceToBook': round(c['price'] * c['shares'] / c['equity'], 2), 'pegRatio': round(c['price'] / eps / (c['growth'] * 100), 2),
+        'returnOnEquity': round(net[0] / c['equity'], 4), 'operatingMargins': c['op_margin'],
+        'currentRatio': round(c['current_assets'] / c['current_liabilities'], 2), 'debtToEquity': round(c['debt'] / c['equity'] * 100, 2),
+        'totalDebt': c['debt'], 'totalCash': c['cash'], 'ebitda': income.loc['EBITDA'].iloc[0], 'dividendRate': round(net[0] * 0.3 / c['shares'], 2),
+        '_synthetic': True,
+    }
+
+    folder = os.path.join(ROOT, symbol)
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, 'info.json'), 'w', encoding='utf-8') as f: json.dump(info, f, indent=1)
+    write_frame(income, os.path.join(folder, 'income_stmt.json'))
+    write_frame(balance, os.path.join(folder, 'balance_sheet.json'))
+    write_frame(cashflow, os.path.join(folder, 'cashflow.json'))
+    for name, frame in zip(('income_stmt', 'balance_sheet', 'cashflow'), quarterly):
+        write_frame(frame, os.path.join(folder, f"quarterly_{name}.json"))
+    history.to_csv(os.path.join(folder, 'history.csv'))
+
+
+if __name__ == "__main__":
+    for symbol, company in COMPANIES.items(): build(symbol, company)
+    with open(os.path.join(ROOT, 'search.json'), 'w', encoding='utf-8') as f:
+        json.dump({c['name'].split()[0].lower(): [{'symbol': s, 'shortname': c['name'], 'exchange': 'NMS'}] for s, c in COMPANIES.items()}, f, indent=1)
+    with open(os.path.join(ROOT, 'boycott.json'), 'w', encoding='utf-8') as f:
+        json.dump({'generated_at': '2026-10-01T00:00:00+00:00', 'source': 'synthetic fixture', 'companies': [{'name': 'Initech Foods Company', 'aliases': ['Initech']}]}, f, indent=1)
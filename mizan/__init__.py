@@ -0,0 +1,26 @@
+from mizan.activity import KEYWORD_BLACKLIST, SECTOR_BLACKLIST, find_keywords, screen_activities, screen_activity
+from mizan.agent import MizanAgent, run_analysis, score_strategy
+from mizan.backtest import run_backtest
+from mizan.boycott import BoycottIndex, BoycottList
+from mizan.compliance import purification, shariah_timeline
+from mizan.cache import DATASET_TTL, DiskCache
+from mizan.charts import chart_series, lttb
+from mizan.client import HttpClient
+from mizan.fetch import fetch_all
+from mizan.indicators import IndicatorBank, default_indicators
+from mizan.monitor import WatchlistMonitor
+from mizan.peers import PeerIndex, default_peer_index
+from mizan.prices import PriceStore
+from mizan.rules import Rule, Strategy, load_strategies
+from mizan.screener import iter_screen, scan_ticker, score_frame, screen
+from mizan.snapshot import Fundamentals, FundamentalsTable
+from mizan.statements import field_matrix, latest_fields, statement_panel
+from mizan.symbols import SymbolIndex, search_remote, search_symbol
+from mizan.watchlist import WatchlistStore
+
+__all__ = [
+    "KEYWORD_BLACKLIST", "SECTOR_BLACKLIST", "find_keywords", "screen_activities", "screen_activity",
+    "MizanAgent", "run_analysis", "score_strategy",
+    "BoycottIndex", "BoycottList", "DATASET_TTL", "DiskCache", "Fundamentals", "FundamentalsTable", "HttpClient", "IndicatorBank", "PeerIndex", "PriceStore", "Rule", "Strategy", "SymbolIndex", "WatchlistMonitor", "WatchlistStore", "fetch_all",
+    "default_indicators", "default_peer_index", "iter_screen", "load_strategies", "purification", "run_backtest", "scan_ticker", "score_frame", "screen", "search_remote", "search_symbol",
+    "shariah_timeline", "statement_panel", "latest_fields", "field_matrix", "chart_series", "lttb"]
@@ -0,0 +1,5 @@
+import sys
+
+from mizan.cli import main
+
+sys.exit(main())
@@ -0,0 +1,64 @@
+import re
+
+import pandas as pd
+
+# =========================================================
+# 🚫 BLACKLIST
+# =========================================================
+SECTOR_BLACKLIST = ['Banks', 'Insurance', 'Capital Markets', 'Credit Services', 'Mortgage', 'Beverages - Wineries & Distilleries', 'Beverages - Brewers', 'Tobacco', 'Gambling', 'Casinos', 'Defense']
+KEYWORD_BLACKLIST = ['alcohol', 'liquor', 'wine', 'beer', 'brewery', 'pork', 'gambling', 'casino', 'betting', 'tobacco', 'interest', 'lending', 'banking', 'adult']
+
+# Compilés une fois à l'import : un seul passage sur le texte, quel que soit le nombre de mots-clés.
+# Secteurs = sous-chaîne (comme avant), mots-clés = mot entier, y compris collé à la ponctuation ("casino,").
+SECTOR_PATTERN = re.compile("|".join(re.escape(s) for s in sorted(SECTOR_BLACKLIST, key=len, reverse=True)), re.IGNORECASE)
+KEYWORD_PATTERN = re.compile(r"\b(?:" + "|".join(re.escape(k) for k in sorted(KEYWORD_BLACKLIST, key=len, reverse=True)) + r")\b", re.IGNORECASE)
+
+_SECTOR_CANON = {s.lower(): s for s in SECTOR_BLACKLIST}
+
+# Préfiltre batch : table de traduction octets -> mots en minuscules, puis intersection d'ensembles (C pur).
+# Seuls les textes qui contiennent un mot-clé passent ensuite par la regex pour récupérer les positions.
+_KEYWORD_TOKENS = frozenset(k.encode() for k in KEYWORD_BLACKLIST)
+_WORD_BYTES = bytes(c + 32 if 65 <= c <= 90 else c if (97 <= c <= 122 or 48 <= c <= 57) else 32 for c in range(256))
+
+
+def has_keyword(text):
+    return not _KEYWORD_TOKENS.isdisjoint(str(text or "").encode('utf-8').translate(_WORD_BYTES).split())
+
+
+def find_keywords(text):
+    # Tous les mots-clés trouvés avec leur position : [(mot, offset), ...]
+    return [(m.group(0).lower(), m.start()) for m in KEYWORD_PATTERN.finditer(str(text or ""))]
+
+
+def find_sectors(*labels):
+    hits = []
+    for label in labels:
+        for m in SECTOR_PATTERN.finditer(str(label or "")):
+            sector = _SECTOR_CANON[m.group(0).lower()]
+            if sector not in hits: hits.append(sector)
+    return hits
+
+
+def _verdict(sectors, keywords):
+    # Le secteur prime : les mots-clés ne sont regardés que si le secteur est propre
+    issues = [f"Sector: {s}" for s in sectors]
+    if not issues: issues = [f"Keyword: {k}" for k in dict.fromkeys(keywords)]
+    return (False, ", ".join(issues)) if issues else (True, "OK")
+
+
+def screen_activity(industry, sector, description):
+    return _verdict(find_sectors(industry, sector), [k for k, _ in find_keywords(description)])
+
+
+def screen_activities(frame):
+    # Version batch : DataFrame avec colonnes industry, sector, description -> activity_ok / activity_msg / keyword_hits
+    verdicts, counts = [], []
+    for industry, sector, description in zip(frame['industry'], frame['sector'], frame['description']):
+        keywords = [k for k, _ in find_keywords(description)] if has_keyword(description) else []
+        verdicts.append(_verdict(find_sectors(industry, sector), keywords))
+        counts.append(len(keywords))
+    return pd.DataFrame({
+        'activity_ok': [ok for ok, _ in verdicts],
+        'activity_msg': [msg for _, msg in verdicts],
+        'keyword_hits': counts,
+    }, index=frame.index)
@@ -0,0 +1,214 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from mizan.activity import screen_activities
+from mizan.agent import STRATEGIES, MizanAgent
+from mizan.compliance import shariah_inputs
+from mizan.metrics import incr, span
+from mizan.screener import shariah_columns
+from mizan.statements import FIELDS, STATEMENTS, statement_arrays
+
+# =========================================================
+# ⏪ BACKTEST POINT-IN-TIME (TICKERS x PÉRIODES)
+# =========================================================
+# Chaque clôture n'est utilisable qu'après un délai de publication. À chaque
+# date de rebalancement, on prend pour chaque ticker le dernier état publié
+# (merge_asof), on recalcule les métriques avec le prix du jour, puis on
+# applique les règles de la stratégie et le filtre Shariah sur tout le
+# panel d'un coup. Portefeuille équipondéré, tenu jusqu'au rebalancement suivant.
+# Limite : le profil (nom, secteur, industrie, description -> filtre d'activité)
+# et le statut boycott sont ceux d'aujourd'hui, appliqués à toutes les dates
+# (biais d'anticipation) ; Yahoo ne fournit pas leur historique. Le nombre
+# d'actions, lui, est celui de chaque clôture, sans repli sur le nombre actuel.
+PROFILE_CAVEAT = ("sector, industry, activity screen and boycott status come from today's profile and are applied to every date "
+                  "(look-ahead bias); only statements and prices are point-in-time")
+PUBLICATION_LAG_DAYS = 90
+FREQUENCIES = {'M': ('MS', 12), 'Q': ('QS', 4), 'A': ('YS', 1)}
+HISTORY_PERIOD = '10y'
+LOAD_WORKERS = 8
+
+
+def load_ticker(ticker, period=HISTORY_PERIOD, agent=None):
+    # Lecture (cache disque / PriceStore) des états, du profil et des prix : seule étape par ticker
+    agent = agent or MizanAgent(ticker)
+    agent.prefetch(('info',) + STATEMENTS, boycott=True)
+    info = agent.info
+    return {
+        'statements': {ds: getattr(agent, ds) for ds in STATEMENTS},
+        'profile': {'name': info.get('longName', ticker), 'sector': info.get('sector', 'Unknown'), 'industry': info.get('industry', 'Unknown'),
+                    'description': info.get('longBusinessSummary', ''), 'is_boycotted': agent.check_boycott_status()},
+        'history': agent.prices.get(ticker, period),
+    }
+
+
+def load_universe_data(tickers, period=HISTORY_PERIOD, workers=LOAD_WORKERS):
+    # Pool dédié (comme iter_screen) : load_ticker utilise lui-même le pool partagé de fetch_all
+    data = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(load_ticker, ticker, period): ticker for ticker in tickers}
+        for future in as_completed(futures):
+            try: data[futures[future]] = future.result()
+            except Exception as e: incr("errors_total", source="backtest.load", kind=type(e).__name__)
+    return data
+
+
+def fundamentals(data):
+    # Panel long (ticker, clôture), trié par ticker puis clôture
+    tickers, periods, blocks = [], [], []
+    for ticker, d in data.items():
+        dates, matrix = statement_arrays(d['statements'])
+        if not len(dates): continue
+        tickers.append(np.full(len(dates), ticker, dtype=object))
+        periods.append(dates)
+        blocks.append(matrix)
+    if not blocks: return pd.DataFrame()
+    fund = pd.DataFrame(np.vstack(blocks), columns=list(FIELDS))
+    fund.insert(0, 'period_end', np.concatenate(periods))
+    fund.insert(0, 'ticker', np.concatenate(tickers))
+    fund = fund.sort_values(['ticker', 'period_end'], kind='stable')
+    # Croissance vs la clôture précédente du même ticker (décalage par groupe, sans boucle)
+    previous = fund.groupby('ticker', sort=False)[['revenue', 'eps']].shift(1)
+    fund['revenue_prev'] = previous['revenue']
+    fund['eps_prev'] = previous['eps']
+    return fund.reset_index(drop=True)
+
+
+def price_matrix(data):
+    # Dates (sans fuseau) x tickers, cours de clôture ajustés
+    closes = {}
+    for ticker, d in data.items():
+        hist = d.get('history')
+        if hist is None or hist.empty: continue
+        index = hist.index.tz_localize(None) if hist.index.tz is not None else hist.index
+        # Jour de séance sans l'heure (datetime64[D] : plus rapide que normalize())
+        closes[ticker] = pd.Series(hist['Close'].to_numpy(), index=index.to_numpy().astype('datetime64[D]').astype('datetime64[ns]'))
+    if not closes: return pd.DataFrame()
+    prices = pd.DataFrame(closes).sort_index()
+    return prices[~prices.index.duplicated(keep='last')]
+
+
+def rebalance_dates(prices, start=None, end=None, freq='Q'):
+    start = pd.Timestamp(start) if start else prices.index[0]
+    end = pd.Timestamp(end) if end else prices.index[-1]
+    dates = pd.date_range(start, end, freq=FREQUENCIES[freq][0])
+    return dates[(dates >= prices.index[0]) & (dates <= prices.index[-1])]
+
+
+def derive_metrics(panel):
+    # Métriques des stratégies à partir des états point-in-time et du prix à la date de rebalancement
+    # Actions de la clôture uniquement : le nombre actuel appliqué au passé fausserait capitalisation et ratios
+    shares = panel['shares']
+    eps = panel['eps'].fillna(panel['net_income'] / shares)
+    revenue = panel['revenue']
+    equity = panel['equity'].where(panel['equity'] != 0)
+    out = pd.DataFrame(index=panel.index)
+    out['market_cap'] = panel['price'] * shares
+    out['per'] = (panel['price'] / eps).where(eps > 0)
+    eps_growth = (eps / panel['eps_prev'] - 1) * 100
+    out['peg'] = (out['per'] / eps_growth).where(eps_growth > 0)
+    out['revenue_growth'] = ((revenue / panel['revenue_prev'] - 1) * 100).fillna(0)
+    out['ops_margin'] = (panel['operating_income'] / revenue * 100).fillna(0)
+    out['roe'] = (panel['net_income'] / equity * 100).fillna(0)
+    out['current_ratio'] = panel['current_assets'] / panel['current_liabilities'].where(panel['current_liabilities'] != 0)
+    out['debt_to_equity'] = panel['total_debt'] / equity * 100
+    ebitda = panel['ebitda'].where(panel['ebitda'] != 0)
+    out['net_debt_ebitda'] = ((panel['total_debt'].fillna(0) - panel['cash'].fillna(0)) / ebitda).fillna(0)
+    fcf = panel['ocf'].fillna(0) + panel['capex'].fillna(0)
+    out['fcf_yield'] = (fcf / out['market_cap'].where(out['market_cap'] > 0) * 100).fillna(0)
+    interest = panel['interest_expense'].abs()
+    out['interest_coverage'] = np.where(interest > 0, panel['ebit'] / interest, 100.0)
+    # Entrées des ratios Shariah : mêmes définitions que l'historique de conformité
+    return pd.concat([out, shariah_inputs(panel)], axis=1)
+
+
+def point_in_time(fund, prices, dates, profiles):
+    # Grille (date, ticker) -> dernier état publié à cette date + prix du jour
+    known = set(fund['ticker'])
+    tickers = [t for t in prices.columns if t in known]
+    grid = pd.DataFrame({'date': np.repeat(dates.to_numpy(dtype='datetime64[ns]'), len(tickers)), 'ticker': np.tile(tickers, len(dates))})
+    panel = pd.merge_asof(grid.sort_values('date', kind='stable'), fund, left_on='date', right_on='available_at', by='ticker')
+    panel = panel[panel['period_end'].notna()].reset_index(drop=True)
+    # Prix à la date de rebalancement (dernière séance connue), lu par positions dans la matrice
+    at_dates = prices_at(prices, dates).to_numpy()
+    panel['price'] = at_dates[dates.get_indexer(panel['date']), prices.columns.get_indexer(panel['ticker'])]
+    panel = panel.join(profiles, on='ticker')
+    return panel[panel['price'].notna()].reset_index(drop=True)
+
+
+def prices_at(prices, dates):
+    return prices.reindex(prices.index.union(dates)).ffill().loc[dates]
+
+
+def prepare_universe(data):
+    # Tout ce qui ne dépend ni de la stratégie ni des dates : calculé une fois par univers
+    profiles = pd.DataFrame.from_dict({t: d['profile'] for t, d in data.items()}, orient='index')
+    # L'activité ne dépend que du profil : un passage par ticker, puis diffusion sur le panel
+    activity = screen_activities(profiles.assign(**{c: profiles[c].fillna('') for c in ('industry', 'sector', 'description')})) if not profiles.empty else None
+    return {'fundamentals': fundamentals(data), 'prices': price_matrix(data), 'profiles': profiles, 'activity': activity}
+
+
+def run_backtest(tickers, strategy, start=None, end=None, freq='Q', lag_days=PUBLICATION_LAG_DAYS, shariah=True, data=None, universe=None):
+    # data : résultat de load_universe_data ; universe : résultat de prepare_universe (réutilisable entre stratégies)
+    if universe is None:
+        if data is None:
+            with span("backtest.load"): data = load_universe_data(list(tickers))
+        with span("backtest.prepare"): universe = prepare_universe(data)
+    with span("backtest.run"):
+        fund, prices, profiles = universe['fundamentals'], universe['prices'], universe['profiles']
+        if fund.empty or prices.empty: return None
+        # Chaque clôture n'est connue qu'après le délai de publication
+        fund = fund.assign(available_at=fund['period_end'] + pd.Timedelta(days=lag_days)).sort_values('available_at', kind='stable')
+        # Pas de rebalancement avant la première clôture publiée : les périodes vides fausseraient les stats
+        dates = rebalance_dates(prices, max(pd.Timestamp(start or prices.index[0]), fund['available_at'].min()), end, freq)
+        panel = point_in_time(fund, prices, dates, profiles)
+        metrics = derive_metrics(panel)
+        frame = pd.concat([panel[['date', 'ticker', 'name', 'sector', 'industry', 'description', 'is_boycotted', 'period_end']], metrics], axis=1)
+
+        # Règles et filtre Shariah sur tout le panel (tickers x dates) en une passe
+        checks = STRATEGIES[strategy].masks(frame)
+        frame['score'] = checks.sum(axis=1)
+        frame['strategy_pass'] = checks.all(axis=1)
+        sh = shariah_columns(frame, activity=universe['activity'].reindex(frame['ticker']).set_index(frame.index))
+        frame['shariah_status'] = sh['shariah_status']
+        frame['selected'] = frame['strategy_pass'] & ((sh['shariah_status'] == "HALAL") if shariah else True)
+
+        # Rendements de chaque période de détention, en matrices dates x tickers
+        at_dates = prices_at(prices, dates)
+        fwd = (at_dates.shift(-1) / at_dates - 1).to_numpy()
+        selected = np.zeros(fwd.shape, dtype=bool)
+        selected[dates.get_indexer(frame['date']), prices.columns.get_indexer(frame['ticker'])] = frame['selected'].to_numpy()
+        valid = ~np.isnan(fwd)
+        held = selected & valid
+        count = held.sum(axis=1)
+        portfolio = np.where(held, fwd, 0.0).sum(axis=1) / np.maximum(count, 1)
+        # Référence : univers entier équipondéré sur la même période
+        benchmark = np.where(valid, fwd, 0.0).sum(axis=1) / np.maximum(valid.sum(axis=1), 1)
+
+    # La dernière date n'a pas de période de détention complète
+    periods = pd.DataFrame({'holdings': count, 'portfolio': portfolio, 'benchmark': benchmark}, index=dates).iloc[:-1]
+    periods['equity'] = (1 + periods['portfolio']).cumprod()
+    periods['benchmark_equity'] = (1 + periods['benchmark']).cumprod()
+    return {
+        'strategy': strategy, 'freq': freq, 'lag_days': lag_days, 'shariah': shariah,
+        'periods': periods, 'selections': frame[frame['selected']][['date', 'ticker', 'period_end', 'score']].reset_index(drop=True),
+        'panel': frame, 'stats': performance(periods, FREQUENCIES[freq][1]),
+    }
+
+
+def performance(periods, per_year):
+    if periods.empty: return {}
+    stats = {}
+    for name, returns in (('portfolio', periods['portfolio']), ('benchmark', periods['benchmark'])):
+        equity = (1 + returns).cumprod()
+        years = len(returns) / per_year
+        stats[name] = {
+            'total_return': float(equity.iloc[-1] - 1),
+            'cagr': float(equity.iloc[-1] ** (1 / years) - 1) if years > 0 and equity.iloc[-1] > 0 else None,
+            'volatility': float(returns.std(ddof=0) * np.sqrt(per_year)),
+            'max_drawdown': float((equity / equity.cummax() - 1).min()),
+            'hit_rate': float((returns > 0).mean()),
+        }
+    stats['avg_holdings'] = float(periods['holdings'].mean())
+    return stats
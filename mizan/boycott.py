@@ -0,0 +1,183 @@
+import csv
+import difflib
+import json
+import os
+import re
+import sys
+import threading
+import time
+import unicodedata
+from datetime import datetime, timezone
+from functools import lru_cache
+
+from mizan import metrics
+from mizan.client import Unavailable, default_client
+
+# =========================================================
+# 🚫 LISTE BOYCOTT LOCALE (INDEX NORMALISÉ)
+# =========================================================
+# Instantané importable (JSON ou CSV) chargé en mémoire : recherche exacte,
+# par alias puis approchée, sans appel réseau pendant l'analyse.
+LIVE_URL = "https://api.boycottisraeli.biz/v1/search/{name}"
+LIVE_TIMEOUT = 2.0
+DEFAULT_PATH = os.environ.get("MIZAN_BOYCOTT_PATH", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "boycott.json"))
+REFRESH_INTERVAL = 15 * 60
+FUZZY_CUTOFF = 0.9
+
+# Formes juridiques ignorées pour comparer "Apple Inc." et "Apple"
+LEGAL_SUFFIXES = {'inc', 'incorporated', 'corp', 'corporation', 'co', 'company', 'ltd', 'limited', 'plc', 'llc', 'lp',
+                  'sa', 'ag', 'nv', 'se', 'spa', 'ab', 'asa', 'oyj', 'holdings', 'holding', 'group', 'the', 'class', 'a', 'b'}
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(name):
+    name = unicodedata.normalize('NFKD', str(name)).encode('ascii', 'ignore').decode().lower()
+    name = name.replace('&', ' and ').replace('.', '').split(' - ')[0]
+    tokens = [tok for tok in _NON_ALNUM.split(name) if tok and tok not in LEGAL_SUFFIXES]
+    return " ".join(tokens)
+
+
+class BoycottIndex:
+    def __init__(self, companies=(), generated_at=None, source=None):
+        # companies : [{"name": ..., "aliases": [...]}, ...]
+        self.generated_at = generated_at
+        self.source = source
+        self.size = 0
+        self._exact = {}
+        self._alias = {}
+        self._buckets = {}
+        for company in companies:
+            name = company['name'] if isinstance(company, dict) else str(company)
+            aliases = company.get('aliases', []) if isinstance(company, dict) else []
+            key = normalize(name)
+            if not key: continue
+            self.size += 1
+            self._exact[key] = name
+            for alias in aliases:
+                alias_key = normalize(alias)
+                if alias_key: self._alias.setdefault(alias_key, name)
+            for k in [key] + [normalize(a) for a in aliases]:
+                if k: self._buckets.setdefault(k.split()[0], []).append((k, name))
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_PATH):
+        companies, generated_at, source = read_snapshot(path)
+        return cls(companies, generated_at=generated_at, source=source)
+
+    def __len__(self): return self.size
+
+    @property
+    def loaded(self): return self.size > 0
+
+    @property
+    def age(self):
+        # Âge de l'instantané en secondes (None si inconnu) : une liste périmée doit rester visible
+        return None if self.generated_at is None else max(0.0, time.time() - self.generated_at)
+
+    def match(self, name):
+        # Retourne (nom listé, type de correspondance, score) ou None
+        key = normalize(name)
+        if not key: return None
+        if key in self._exact: return self._exact[key], 'exact', 1.0
+        if key in self._alias: return self._alias[key], 'alias', 1.0
+        # Approché : seulement parmi les entrées qui partagent le premier mot
+        best = None
+        for candidate, listed in self._buckets.get(key.split()[0], ()):
+            score = difflib.SequenceMatcher(None, key, candidate).ratio()
+            if score >= FUZZY_CUTOFF and (best is None or score > best[2]): best = (listed, 'fuzzy', score)
+        return best
+
+    def is_listed(self, name): return self.match(name) is not None
+
+
+def read_snapshot(path):
+    # JSON {"generated_at", "source", "companies"} ou CSV (colonnes name, aliases séparés par '|')
+    if path.endswith('.csv'):
+        with open(path, newline='', encoding='utf-8') as f:
+            companies = [{"name": row['name'], "aliases": [a.strip() for a in (row.get('aliases') or '').split('|') if a.strip()]} for row in csv.DictReader(f)]
+        return companies, os.path.getmtime(path), path
+    with open(path, encoding='utf-8') as f:
+        snapshot = json.load(f)
+    return snapshot.get('companies', []), _timestamp(snapshot.get('generated_at')), snapshot.get('source', path)
+
+
+def _timestamp(value):
+    if value is None or isinstance(value, (int, float)): return value
+    return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+
+
+class BoycottList:
+    # Conteneur rechargé en arrière-plan : les lecteurs voient toujours un index complet (échange atomique)
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self.index = BoycottIndex()
+        self._mtime = None
+        self._thread = None
+        self.reload()
+
+    def reload(self):
+        try: mtime = os.path.getmtime(self.path)
+        except OSError: return False
+        if mtime == self._mtime: return False
+        try: self.index = BoycottIndex.from_file(self.path)
+        except (OSError, ValueError, KeyError): return False
+        self._mtime = mtime
+        return True
+
+    def start_refresh(self, interval=REFRESH_INTERVAL):
+        if self._thread is not None: return
+        def loop():
+            while True:
+                time.sleep(interval)
+                self.reload()
+        self._thread = threading.Thread(target=loop, name="mizan-boycott-refresh", daemon=True)
+        self._thread.start()
+
+    def match(self, name): return self.index.match(name)
+    def is_listed(self, name): return self.index.is_listed(name)
+
+    @property
+    def loaded(self): return self.index.loaded
+
+    @property
+    def age(self): return self.index.age
+
+
+@lru_cache(maxsize=None)
+def default_boycott_list():
+    # Liste partagée, rechargée en arrière-plan quand le fichier d'instantané change
+    replay = os.environ.get("MIZAN_REPLAY")
+    boycott = BoycottList(os.path.join(replay, "boycott.json") if replay and "MIZAN_BOYCOTT_PATH" not in os.environ else DEFAULT_PATH)
+    boycott.start_refresh()
+    return boycott
+
+
+def lookup_live(name, client=None):
+    # Recherche en ligne, utilisée seulement quand aucun instantané local n'est chargé.
+    # True / False, ou None (inconnu) quand le service ne répond pas : jamais un faux "non listé"
+    clean_name = name.replace(" Inc.", "").replace(" Corporation", "").split(" - ")[0].strip()
+    try:
+        r = (client or default_client()).get(LIVE_URL.format(name=clean_name), timeout=LIVE_TIMEOUT)
+        if r.status_code == 404: return False
+        if r.status_code != 200: raise Unavailable(f"HTTP {r.status_code}")
+        return len(r.json()) > 0
+    except (Unavailable, ValueError) as e:
+        metrics.incr("errors_total", source="fetch.boycott_live", kind=type(e).__name__)
+        return None
+
+
+def import_snapshot(src, dest=DEFAULT_PATH, source=None):
+    # Écrit un instantané JSON horodaté ; le remplacement atomique est repris par BoycottList.reload()
+    companies, _, _ = read_snapshot(src)
+    snapshot = {"generated_at": datetime.now(timezone.utc).isoformat(), "source": source or os.path.basename(src), "companies": companies}
+    tmp = dest + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f: json.dump(snapshot, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, dest)
+    return len(companies)
+
+
+if __name__ == "__main__":
+    # python -m mizan.boycott export.csv [data/boycott.json]
+    if len(sys.argv) < 2: sys.exit("usage: python -m mizan.boycott SOURCE [DEST]")
+    n = import_snapshot(sys.argv[1], *sys.argv[2:3])
+    print(f"{n} companies imported")
@@ -0,0 +1,136 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+
+from mizan import metrics
+
+# =========================================================
+# 💾 CACHE DISQUE (SQLITE) PAR TICKER / DATASET
+# =========================================================
+# Durées de validité (secondes) : les états annuels bougent chaque trimestre,
+# `info` chaque jour, l'historique de prix en intraday.
+DATASET_TTL = {
+    'info': 24 * 3600,
+    'income_stmt': 7 * 24 * 3600,
+    'balance_sheet': 7 * 24 * 3600,
+    'cashflow': 7 * 24 * 3600,
+    'quarterly_income_stmt': 7 * 24 * 3600,
+    'quarterly_balance_sheet': 7 * 24 * 3600,
+    'quarterly_cashflow': 7 * 24 * 3600,
+    'history': 15 * 60,
+    'intraday': 5 * 60,
+    'chart': 6 * 3600,
+    'boycott_live': 3600,
+}
+DEFAULT_TTL = 3600
+DEFAULT_PATH = os.environ.get("MIZAN_CACHE_PATH", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "mizan.sqlite"))
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_MISSING = object()
+
+
+class DiskCache:
+    def __init__(self, path=DEFAULT_PATH, max_bytes=DEFAULT_MAX_BYTES, ttl=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = dict(DATASET_TTL, **(ttl or {}))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Une seule connexion partagée entre les sessions Streamlit (threads)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS entries (
+            ticker TEXT NOT NULL, dataset TEXT NOT NULL, payload BLOB NOT NULL, size INTEGER NOT NULL,
+            stored_at REAL NOT NULL, accessed_at REAL NOT NULL, PRIMARY KEY (ticker, dataset))""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+        # Taille totale tenue à jour en mémoire : pas de SUM() sur toute la table à chaque écriture
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    # 'history:3mo' hérite du TTL de 'history'
+    def ttl_for(self, dataset): return self.ttl.get(dataset, self.ttl.get(dataset.split(':')[0], DEFAULT_TTL))
+
+    def get(self, ticker, dataset, default=None):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT payload, stored_at FROM entries WHERE ticker=? AND dataset=?", (ticker.upper(), dataset)).fetchone()
+            metrics.incr("cache_lookups_total", cache="disk", dataset=dataset.split(':')[0])
+            if row is None or now - row[1] > self.ttl_for(dataset):
+                self.misses += 1
+                metrics.incr("cache_misses_total", cache="disk", dataset=dataset.split(':')[0])
+                return default
+            self._conn.execute("UPDATE entries SET accessed_at=? WHERE ticker=? AND dataset=?", (now, ticker.upper(), dataset))
+            self.hits += 1
+        try: return pickle.loads(row[0])
+        except Exception: return default
+
+    def set(self, ticker, dataset, value):
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM entries WHERE ticker=? AND dataset=?", (ticker.upper(), dataset)).fetchone()
+            self._conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)", (ticker.upper(), dataset, payload, len(payload), now, now))
+            self._bytes += len(payload) - (old[0] if old else 0)
+            if self._bytes > self.max_bytes: self._evict()
+
+    def peek(self, ticker, dataset):
+        # Lecture sans contrôle de TTL : (valeur, horodatage) ou (None, None). Sert aux mises à jour incrémentales.
+        with self._lock:
+            row = self._conn.execute("SELECT payload, stored_at FROM entries WHERE ticker=? AND dataset=?", (ticker.upper(), dataset)).fetchone()
+        if row is None: return None, None
+        try: return pickle.loads(row[0]), row[1]
+        except Exception: return None, None
+
+    def is_fresh(self, dataset, stored_at):
+        return stored_at is not None and time.time() - stored_at <= self.ttl_for(dataset)
+
+    def get_or_fetch(self, ticker, dataset, fetch):
+        value = self.get(ticker, dataset, _MISSING)
+        if value is _MISSING:
+            value = fetch()
+            self.set(ticker, dataset, value)
+        return value
+
+    def invalidate(self, ticker, dataset=None):
+        with self._lock:
+            if dataset is None: self._conn.execute("DELETE FROM entries WHERE ticker=?", (ticker.upper(),))
+            else: self._conn.execute("DELETE FROM entries WHERE ticker=? AND dataset=?", (ticker.upper(), dataset))
+            self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._bytes = 0
+
+    def _evict(self):
+        # Éviction LRU : on supprime les entrées les moins récemment lues jusqu'à repasser sous la limite
+        for ticker, dataset, size in self._conn.execute("SELECT ticker, dataset, size FROM entries ORDER BY accessed_at").fetchall():
+            self._conn.execute("DELETE FROM entries WHERE ticker=? AND dataset=?", (ticker, dataset))
+            self.evictions += 1
+            self._bytes -= size
+            if self._bytes <= self.max_bytes: break
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries, "bytes": size, "max_bytes": self.max_bytes,
+        }
+
+
+# Instance partagée par tout le process (sessions Streamlit, threads de la CLI)
+@lru_cache(maxsize=None)
+def default_cache():
+    # En rejeu (fixtures), cache en mémoire : on ne mélange jamais données enregistrées et données réelles
+    cache = DiskCache(":memory:" if os.environ.get("MIZAN_REPLAY") else DEFAULT_PATH)
+    metrics.default_registry().gauge("disk_cache", cache.stats)
+    return cache
@@ -0,0 +1,114 @@
+import time
+from datetime import date
+
+import numpy as np
+
+from mizan import yahoo
+from mizan.cache import default_cache
+from mizan.metrics import span
+from mizan.prices import default_price_store
+
+# =========================================================
+# 📈 SÉRIES DU GRAPHIQUE DE PRIX (SOUS-ÉCHANTILLONNAGE LTTB)
+# =========================================================
+# Le graphique n'affiche jamais plus de points que de pixels : quelle que soit
+# la plage (journée, 5 ans, historique complet), la série est réduite par LTTB
+# (Largest Triangle Three Buckets), qui garde les pics et les creux visibles.
+# La charge envoyée au navigateur et le temps de rendu restent constants.
+CHART_POINTS = 1000
+TREND_WINDOW = 50
+# Plage -> (période Yahoo, intervalle des barres). Plages intrajournalières : cache à part, TTL court.
+# Plages longues (5 ans, historique complet) : cache à part aussi, pour ne pas élargir la fenêtre du PriceStore
+# partagé (chaque analyse, scan et surveillance fusionnerait ensuite des décennies de barres).
+RANGES = {'1d': ('1d', '5m'), '5d': ('5d', '30m'), '1y': ('1y', '1d'), '5y': ('5y', '1d'), 'max': ('max', '1d')}
+INTRADAY = {'1d', '5d'}
+LONG = {'5y', 'max'}
+DEFAULT_RANGE = '1y'
+INTRADAY_DATASET = 'intraday'
+LONG_DATASET = 'chart'
+INTRADAY_TTL = 5 * 60
+# Largeur de seau jusqu'à laquelle LTTB passe par une table de transitions ; au-delà, boucle seau par seau
+TABLE_WIDTH = 12
+
+
+def lttb(x, y, n):
+    # Indices des n points retenus (premier et dernier compris). Un point par seau : celui qui forme le plus
+    # grand triangle avec le point retenu au seau précédent et la moyenne du seau suivant.
+    size = len(y)
+    if n >= size or n < 3: return np.arange(size)
+    edges = np.linspace(1, size - 1, n - 1).astype(np.int64)
+    # Moyennes de tous les seaux en une passe (sommes cumulées), le dernier point servant de seau final
+    cx, cy = np.cumsum(x), np.cumsum(y)
+    counts = np.diff(edges)
+    mean_x = np.append((cx[edges[1:] - 1] - cx[edges[:-1] - 1]) / counts, x[-1])[1:]
+    mean_y = np.append((cy[edges[1:] - 1] - cy[edges[:-1] - 1]) / counts, y[-1])[1:]
+    # L'aire est affine en (ax, ay), le point retenu au seau précédent : |ax * p + ay * q + r|, p, q, r calculés d'avance
+    bucket = np.repeat(np.arange(n - 2), counts)
+    body = slice(1, size - 1)
+    p = y[body] - mean_y[bucket]
+    q = mean_x[bucket] - x[body]
+    r = x[body] * mean_y[bucket] - mean_x[bucket] * y[body]
+    out = np.empty(n, dtype=np.int64)
+    out[0], out[-1] = 0, size - 1
+    width = int(counts.max())
+    if width <= TABLE_WIDTH:
+        # Seaux étroits (série à peine plus longue que l'écran) : pour chaque candidat du seau précédent, le meilleur
+        # point du seau est calculé d'un bloc ; il ne reste qu'à suivre la chaîne.
+        slots = np.minimum(edges[:-1, None] + np.arange(width), size - 2)
+        valid = np.arange(width) < counts[:, None]
+        prev = np.vstack([np.zeros((1, width), dtype=np.int64), slots[:-1]])
+        k = slots - 1
+        area = np.abs(x[prev][:, :, None] * p[k][:, None, :] + y[prev][:, :, None] * q[k][:, None, :] + r[k][:, None, :])
+        area[~np.broadcast_to(valid[:, None, :], area.shape)] = -1
+        best, slots, slot = np.argmax(area, axis=2).tolist(), slots.tolist(), 0
+        for i in range(n - 2):
+            slot = best[i][slot]
+            out[i + 1] = slots[i][slot]
+        return out
+    a = 0
+    for i in range(n - 2):
+        lo, hi = edges[i] - 1, edges[i + 1] - 1
+        a = lo + 1 + int(np.argmax(np.abs(x[a] * p[lo:hi] + y[a] * q[lo:hi] + r[lo:hi])))
+        out[i + 1] = a
+    return out
+
+
+def downsample(frame, column='Close', points=CHART_POINTS):
+    # Lignes retenues par LTTB sur `column` ; les autres colonnes (MA50...) suivent les mêmes dates
+    frame = frame[frame[column].notna()]
+    if len(frame) <= points: return frame
+    # Temps en secondes relatives : l'aire des triangles reste à une échelle raisonnable
+    x = (frame.index.asi8 - frame.index.asi8[0]).astype(float) / 1e9
+    return frame.iloc[lttb(x, frame[column].to_numpy(dtype=float), points)]
+
+
+def cached_history(ticker, period, interval, dataset, cache=None):
+    # Barres hors du PriceStore, en cache disque sous `dataset` (TTL du dataset)
+    cache = cache or default_cache()
+    def fetch():
+        with span(f"fetch.{dataset}"): return yahoo.history(ticker, period=period, interval=interval)
+    return cache.get_or_fetch(ticker, f"{dataset}:{period}:{interval}", fetch)
+
+
+def intraday(ticker, period, interval, cache=None):
+    # Barres intrajournalières : en cache disque quelques minutes
+    return cached_history(ticker, period, interval, INTRADAY_DATASET, cache)
+
+
+def as_of(chart_range, now=None):
+    # Clé de fraîcheur d'une figure : le jour pour les plages journalières, la tranche de 5 minutes en intrajournalier
+    now = time.time() if now is None else now
+    return f"{date.fromtimestamp(now).isoformat()}/{int(now // INTRADAY_TTL)}" if chart_range in INTRADAY else date.fromtimestamp(now).isoformat()
+
+
+def chart_series(ticker, chart_range=DEFAULT_RANGE, points=CHART_POINTS, prices=None, cache=None):
+    # Close (+ MA50 sur les plages journalières, calculée sur la série complète) réduits à `points` lignes au plus
+    period, interval = RANGES[chart_range]
+    with span("chart.series", range=chart_range):
+        if chart_range in INTRADAY: hist = intraday(ticker, period, interval, cache)
+        elif chart_range in LONG: hist = cached_history(ticker, period, interval, LONG_DATASET, cache)
+        else: hist = (prices or default_price_store()).get(ticker, period)
+        if hist is None or hist.empty: return None
+        frame = hist[['Close']].copy()
+        if chart_range not in INTRADAY: frame['MA50'] = frame['Close'].rolling(window=TREND_WINDOW).mean()
+        return downsample(frame, 'Close', points)
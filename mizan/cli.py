@@ -0,0 +1,228 @@
+import argparse
+import csv
+import json
+import sys
+import time
+
+from mizan import metrics
+from mizan.agent import STRATEGY_METRICS
+from mizan.backtest import FREQUENCIES, PROFILE_CAVEAT, PUBLICATION_LAG_DAYS, run_backtest
+from mizan.compliance import purification, shariah_timeline
+from mizan.monitor import BATCH_SIZE as MONITOR_BATCH, INTERVAL, WatchlistMonitor
+from mizan.peers import build as build_peers, default_peer_index
+from mizan.screener import BATCH_SIZE, iter_screen, parse_tickers, scan_columns, to_rows
+from mizan.symbols import search_remote, search_symbol
+
+# =========================================================
+# 🖥️ CLI : python -m mizan scan tickers.txt --strategy Graham --out results.parquet
+#          python -m mizan backtest tickers.txt --strategy Lynch --freq Q --out periods.csv
+#          python -m mizan monitor --interval 60
+#          python -m mizan peers tickers.txt --show ACME
+# =========================================================
+PARQUET_BATCH = 100
+
+
+def read_tickers(path):
+    f = sys.stdin if path == '-' else open(path, encoding='utf-8')
+    try: return parse_tickers(f)
+    finally:
+        if f is not sys.stdin: f.close()
+
+
+class RowWriter:
+    # Écrit chaque ligne dès qu'elle arrive : CSV / JSONL ligne par ligne, Parquet par petits row groups
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = columns
+        self._rows = []
+        self._parquet = None
+        if path is None or path == '-':
+            self._file, self.fmt = sys.stdout, 'jsonl'
+        elif path.endswith('.parquet'):
+            # pyarrow est dans requirements.txt, mais reste une dépendance lourde : message clair plutôt qu'une trace
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError: raise SystemExit("writing .parquet requires pyarrow (pip install pyarrow), or use .csv / .jsonl") from None
+            self._pa = pa
+            self._schema = pa.schema([(c, _arrow_type(pa, c)) for c in columns])
+            self._parquet = pq.ParquetWriter(path, self._schema)
+            self._file, self.fmt = None, 'parquet'
+        else:
+            self._file = open(path, 'w', newline='', encoding='utf-8')
+            self.fmt = 'csv' if path.endswith('.csv') else 'jsonl'
+            if self.fmt == 'csv':
+                self._csv = csv.DictWriter(self._file, fieldnames=columns, extrasaction='ignore')
+                self._csv.writeheader()
+
+    def write(self, row):
+        row = {c: row.get(c) for c in self.columns}
+        if self.fmt == 'parquet':
+            self._rows.append(row)
+            if len(self._rows) >= PARQUET_BATCH: self._flush_parquet()
+            return
+        if self.fmt == 'csv': self._csv.writerow(row)
+        else: self._file.write(json.dumps(row, default=str) + "\n")
+        self._file.flush()
+
+    def _flush_parquet(self):
+        if self._rows: self._parquet.write_table(self._pa.Table.from_pylist(self._rows, schema=self._schema))
+        self._rows = []
+
+    def close(self):
+        if self.fmt == 'parquet':
+            self._flush_parquet()
+            self._parquet.close()
+        elif self._file is not sys.stdout: self._file.close()
+
+
+def _arrow_type(pa, column):
+    if column.endswith('_pass'): return pa.bool_()
+    if column in ('score', 'checks'): return pa.int64()
+    if any(column in metrics for metrics in STRATEGY_METRICS.values()): return pa.float64()
+    return pa.string()
+
+
+def cmd_scan(args):
+    tickers = read_tickers(args.tickers)
+    columns = scan_columns(args.strategy)
+    writer = RowWriter(args.out, columns)
+    done = 0
+    try:
+        # Chaque ticker est écrit dès qu'il est terminé ; ceux terminés en même temps sont notés en colonnes ensemble
+        for batch in iter_screen(tickers, args.strategy, workers=args.workers, batch_size=args.batch, stream=True):
+            for row in to_rows(batch, columns):
+                writer.write(row)
+                done += 1
+                if not args.quiet: print(f"[{done}/{len(tickers)}] {row['ticker']} {row.get('shariah_status') or 'ERROR'}", file=sys.stderr)
+    finally:
+        writer.close()
+        if args.metrics: write_metrics(args.metrics)
+    return 0
+
+
+def write_metrics(path):
+    # Latences par étape et compteurs du scan : texte Prometheus (.prom) ou JSON
+    registry = metrics.default_registry()
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(registry.to_prometheus() if path.endswith('.prom') else registry.to_json())
+
+
+def cmd_backtest(args):
+    result = run_backtest(read_tickers(args.tickers), args.strategy, start=args.start, end=args.end, freq=args.freq,
+                          lag_days=args.lag, shariah=not args.no_shariah)
+    if args.metrics: write_metrics(args.metrics)
+    if result is None:
+        print("no usable statements or prices for this universe", file=sys.stderr)
+        return 1
+    print(f"note: {PROFILE_CAVEAT}", file=sys.stderr)
+    # Une ligne par période de détention ; les statistiques résumées vont sur stdout
+    if args.out: result['periods'].to_csv(args.out, index_label='date')
+    if args.selections: result['selections'].to_csv(args.selections, index=False)
+    print(json.dumps(result['stats'], indent=2))
+    return 0
+
+
+def cmd_shariah(args):
+    # Historique de conformité d'un ticker (CSV sur stdout), et montants à purifier si --shares est donné
+    timeline = shariah_timeline(args.ticker.upper())
+    if args.freq: timeline = timeline[timeline['freq'] == args.freq]
+    if args.shares:
+        purified = purification(timeline, args.shares, args.freq or 'A')
+        purified.to_csv(sys.stdout, index=False)
+        print(f"total purification: {purified['purification'].sum():.4f}", file=sys.stderr)
+    else: timeline.to_csv(sys.stdout, index=False)
+    return 0
+
+
+def cmd_monitor(args):
+    # Worker de surveillance des watchlists : un cycle toutes les --interval secondes, alertes dans la file SQLite
+    monitor = WatchlistMonitor(interval=args.interval, batch_size=args.batch)
+    while True:
+        start = time.monotonic()
+        alerts = monitor.run_once()
+        for owner, ticker, kind, price, level in alerts: print(f"{owner}\t{ticker}\t{kind}\t{price:.2f}\t{level:.2f}", flush=True)
+        if not args.quiet: print(f"cycle {monitor.cycles}: {len(monitor.seen)} tickers, {len(alerts)} alerts, {time.monotonic() - start:.1f}s", file=sys.stderr)
+        if args.once: return 0
+        time.sleep(max(0.0, args.interval - (time.monotonic() - start)))
+
+
+def cmd_peers(args):
+    # Amorce / met à jour l'index des pairs sur un univers ; --show affiche le contexte d'un ticker (JSON)
+    index = default_peer_index()
+    if args.tickers:
+        start = time.monotonic()
+        n = build_peers(read_tickers(args.tickers), index, workers=args.workers)
+        print(f"{n} snapshots indexed in {time.monotonic() - start:.1f}s ({index.stats()['groups']} groups)", file=sys.stderr)
+    if args.show:
+        peer = index.peers(args.show)
+        if peer is None:
+            print(f"{args.show.upper()}: not indexed or fewer than {index.min_peers} peers", file=sys.stderr)
+            return 1
+        print(json.dumps(peer, indent=1))
+    return 0
+
+
+def cmd_search(args):
+    for quote in search_symbol(args.query, remote=None if args.offline else search_remote):
+        print(f"{quote['symbol']:<12} {quote.get('exchange', ''):<6} {quote.get('shortname', '')}")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="mizan", description="Mizan screening engine (headless)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    scan = sub.add_parser("scan", help="screen a list of tickers, one result row per ticker as soon as it completes")
+    scan.add_argument("tickers", help="file with one ticker per line ('-' for stdin)")
+    scan.add_argument("--strategy", choices=sorted(STRATEGY_METRICS), default="Mizan")
+    scan.add_argument("--out", help="output file (.parquet, .csv or .jsonl); JSON lines on stdout by default")
+    scan.add_argument("--workers", type=int, default=8, help="tickers analysed in parallel")
+    scan.add_argument("--batch", type=int, default=BATCH_SIZE, help="most rows scored together (finished rows are written without waiting for a full batch)")
+    scan.add_argument("--quiet", action="store_true", help="no progress on stderr")
+    scan.add_argument("--metrics", help="write stage latencies and error counters at the end (.prom or .json)")
+    scan.set_defaults(func=cmd_scan)
+
+    backtest = sub.add_parser("backtest", help="replay a strategy over past rebalancing dates with point-in-time statements",
+                              epilog=f"note: {PROFILE_CAVEAT}")
+    backtest.add_argument("tickers", help="file with one ticker per line ('-' for stdin)")
+    backtest.add_argument("--strategy", choices=sorted(STRATEGY_METRICS), default="Mizan")
+    backtest.add_argument("--start", help="first rebalancing date (YYYY-MM-DD)")
+    backtest.add_argument("--end", help="last rebalancing date (YYYY-MM-DD)")
+    backtest.add_argument("--freq", choices=sorted(FREQUENCIES), default="Q", help="rebalancing frequency: monthly, quarterly or annual")
+    backtest.add_argument("--lag", type=int, default=PUBLICATION_LAG_DAYS, help="days between a fiscal period end and its publication")
+    backtest.add_argument("--no-shariah", action="store_true", help="do not require a HALAL verdict")
+    backtest.add_argument("--out", help="CSV of per-period returns and equity curves")
+    backtest.add_argument("--selections", help="CSV of the tickers held at each rebalancing date")
+    backtest.add_argument("--metrics", help="write stage latencies at the end (.prom or .json)")
+    backtest.set_defaults(func=cmd_backtest)
+
+    shariah = sub.add_parser("shariah", help="Shariah compliance history over every annual and quarterly statement")
+    shariah.add_argument("ticker")
+    shariah.add_argument("--freq", choices=["A", "Q"], help="only annual or quarterly statements")
+    shariah.add_argument("--shares", type=float, help="shares held: print the dividend purification per period instead")
+    shariah.set_defaults(func=cmd_shariah)
+
+    monitor = sub.add_parser("monitor", help="re-evaluate trend breaks and TP1/TP2 for every watched ticker, alerts go to the UI queue")
+    monitor.add_argument("--interval", type=float, default=INTERVAL, help="seconds between two cycles")
+    monitor.add_argument("--batch", type=int, default=MONITOR_BATCH, help="tickers per batched download")
+    monitor.add_argument("--once", action="store_true", help="run a single cycle and exit")
+    monitor.add_argument("--quiet", action="store_true", help="no cycle summary on stderr")
+    monitor.set_defaults(func=cmd_monitor)
+
+    peers = sub.add_parser("peers", help="index sector/industry peer statistics for a universe, or show a ticker's percentile ranks")
+    peers.add_argument("tickers", nargs="?", help="file with one ticker per line ('-' for stdin)")
+    peers.add_argument("--show", help="print the peer context of this ticker")
+    peers.add_argument("--workers", type=int, default=8, help="tickers collected in parallel")
+    peers.set_defaults(func=cmd_peers)
+
+    search = sub.add_parser("search", help="search the symbol directory")
+    search.add_argument("query")
+    search.add_argument("--offline", action="store_true", help="local directory only, no Yahoo fallback")
+    search.set_defaults(func=cmd_search)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
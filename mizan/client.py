@@ -0,0 +1,155 @@
+import random
+import threading
+import time
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from mizan import metrics
+
+# =========================================================
+# 🔌 CLIENT HTTP SORTANT PARTAGÉ (POOL, DÉBIT, REPRISES, DISJONCTEUR)
+# =========================================================
+# Une session requests par process : les connexions keep-alive sont
+# réutilisées entre sessions Streamlit (pas de TCP/TLS par appel). Par hôte :
+# un seau à jetons, des reprises espacées avec gigue sur les erreurs
+# transitoires, et un disjoncteur qui fait échouer immédiatement les appels
+# quand l'hôte est tombé, jusqu'à un appel d'essai après refroidissement.
+# Un échec lève Unavailable : l'appelant renvoie "inconnu", jamais un faux négatif.
+POOL_SIZE = 32
+DEFAULT_TIMEOUT = 5.0
+RETRIES = 2
+BACKOFF = 0.2
+RETRY_STATUS = {429, 500, 502, 503, 504}
+# Débit par hôte : (requêtes par seconde, rafale)
+HOST_LIMITS = {'query2.finance.yahoo.com': (5.0, 10), 'api.boycottisraeli.biz': (2.0, 5)}
+DEFAULT_LIMIT = (10.0, 20)
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 30.0
+USER_AGENT = 'Mozilla/5.0'
+
+
+class Unavailable(Exception):
+    # Hôte injoignable, disjoncteur ouvert ou débit épuisé : le résultat est inconnu
+    pass
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout):
+        # Attend un jeton au plus `timeout` secondes ; False si le débit reste épuisé plus longtemps
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if now + wait > deadline: return False
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    # Fermé -> ouvert après `threshold` échecs consécutifs ; après `cooldown`, un seul appel d'essai passe (semi-ouvert)
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None: return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.cooldown else "open"
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None: return True
+            if self._probing or time.monotonic() - self.opened_at < self.cooldown: return False
+            self._probing = True
+            return True
+
+    def record(self, ok):
+        # Retourne True quand l'appel (re)ouvre le disjoncteur
+        with self._lock:
+            self._probing = False
+            if ok:
+                self.failures, self.opened_at = 0, None
+                return False
+            self.failures += 1
+            if self.failures < self.threshold and self.opened_at is None: return False
+            self.opened_at = time.monotonic()
+            return True
+
+
+class HttpClient:
+    def __init__(self, limits=None, retries=RETRIES, backoff=BACKOFF, pool_size=POOL_SIZE):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers['User-Agent'] = USER_AGENT
+        self.limits = dict(HOST_LIMITS, **(limits or {}))
+        self.retries = retries
+        self.backoff = backoff
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _host(self, host):
+        with self._lock:
+            if host not in self._hosts: self._hosts[host] = (TokenBucket(*self.limits.get(host, DEFAULT_LIMIT)), CircuitBreaker())
+            return self._hosts[host]
+
+    def get(self, url, timeout=DEFAULT_TIMEOUT, **kwargs):
+        # Réponse HTTP (tout statut non transitoire, 404 compris) ; Unavailable si l'hôte ne répond pas utilement
+        host = urlsplit(url).hostname
+        bucket, breaker = self._host(host)
+        for attempt in range(self.retries + 1):
+            if not breaker.allow():
+                metrics.incr("http_short_circuits_total", host=host)
+                raise Unavailable(f"{host}: circuit open")
+            if not bucket.acquire(timeout):
+                metrics.incr("http_rate_limited_total", host=host)
+                raise Unavailable(f"{host}: rate limited")
+            try:
+                with metrics.span("http", host=host): response = self.session.get(url, timeout=timeout, **kwargs)
+                error = f"HTTP {response.status_code}" if response.status_code in RETRY_STATUS else None
+                metrics.incr("http_requests_total", host=host, status=response.status_code)
+            except requests.RequestException as e:
+                # Toute erreur requests (connexion, délai, redirections, flux tronqué, URL invalide...) est un échec enregistré :
+                # sinon l'appel d'essai d'un disjoncteur semi-ouvert ne se conclut jamais et l'hôte reste coupé
+                error = type(e).__name__
+                metrics.incr("http_requests_total", host=host, status=error)
+            if breaker.record(error is None): metrics.incr("http_circuit_opened_total", host=host)
+            if error is None: return response
+            if attempt < self.retries:
+                metrics.incr("http_retries_total", host=host)
+                # Backoff exponentiel avec gigue : les sessions en échec ne réessaient pas toutes en même temps
+                time.sleep(self.backoff * 2 ** attempt * random.uniform(0.5, 1.5))
+        raise Unavailable(f"{host}: {error}")
+
+    def stats(self):
+        # Par hôte (étiquette host des jauges) : disjoncteur ouvert, échecs consécutifs, jetons disponibles
+        with self._lock: hosts = dict(self._hosts)
+        return {host: {"circuit_open": int(breaker.state != "closed"), "failures": breaker.failures, "tokens": round(bucket.tokens, 2)}
+                for host, (bucket, breaker) in hosts.items()}
+
+
+@lru_cache(maxsize=None)
+def default_client():
+    client = HttpClient()
+    metrics.default_registry().gauge("http", client.stats, label="host")
+    return client
@@ -0,0 +1,162 @@
+import numpy as np
+import pandas as pd
+
+from mizan.agent import MizanAgent
+from mizan.metrics import incr, span
+from mizan.screener import shariah_columns
+from mizan.statements import STATEMENTS, statement_panel
+
+# =========================================================
+# 🕰️ HISTORIQUE DE CONFORMITÉ SHARIAH & PURIFICATION
+# =========================================================
+# Les ratios AAOIFI sont calculés sur toutes les clôtures disponibles (annuelles
+# et trimestrielles), en colonnes. Chaque clôture est mise en cache une fois
+# calculée sur des entrées complètes : un nouvel affichage ne recalcule que les
+# publications nouvelles ou révisées, et l'historique continue de s'allonger
+# quand Yahoo ne renvoie plus les anciennes.
+# Le filtre d'activité et le boycott dépendent du profil actuel, pas des clôtures.
+FREQUENCIES = {'A': '', 'Q': 'quarterly_'}
+TIMELINE_DATASET = 'shariah_timeline'
+PERIOD_DAYS = {'A': 365, 'Q': 91}
+# Colonnes mises en cache pour chaque clôture
+FILING_COLUMNS = ('haram_ratio', 'debt_ratio', 'illiquid_ratio', 'cash_ratio', 'liquid_ok', 'market_cap', 'total_revenue', 'interest_income',
+                  'dividend_per_share', 'purification_per_share', 'filing_failures')
+
+
+def shariah_inputs(panel):
+    # Panel d'états (statement_panel) -> entrées de shariah_columns, mêmes définitions que MizanAgent._collect_assets
+    out = pd.DataFrame(index=panel.index)
+    out['total_assets'] = panel['total_assets'].replace(0, np.nan).fillna(1)
+    out['current_assets'] = panel['current_assets'].fillna(0)
+    illiquid = panel[['ppe', 'goodwill', 'intangibles', 'inventory']].fillna(0).sum(axis=1)
+    out['illiquid_assets'] = illiquid.where((illiquid != 0) | (out['current_assets'] <= 0), out['total_assets'] - out['current_assets'])
+    out['interest_income'] = panel['interest_income'].fillna(0)
+    out['total_debt'] = panel['total_debt'].fillna(0)
+    out['total_revenue'] = panel['revenue']
+    return out
+
+
+def _naive(index): return index.tz_localize(None) if index.tz is not None else index
+
+
+def _asof(index, values, dates):
+    # Dernière valeur connue à chaque date (NaN avant le début de la série)
+    position = index.searchsorted(dates, side='right') - 1
+    return np.where(position >= 0, values[np.clip(position, 0, None)], np.nan)
+
+
+def filing_rows(panel, freq, history, shares_outstanding=None):
+    # Ratios de chaque clôture, en colonnes. Cours et dividendes lus dans l'historique de prix de la période.
+    frame = shariah_inputs(panel)
+    shares = panel['shares'].fillna(shares_outstanding if shares_outstanding else np.nan)
+    dates = pd.DatetimeIndex(panel.index)
+    if history is not None and not history.empty:
+        index = _naive(history.index)
+        price = _asof(index, history['Close'].to_numpy(dtype=float), dates)
+        # Dividendes versés pendant la période close : différence de la somme cumulée aux deux bornes
+        paid = history['Dividends'].to_numpy(dtype=float).cumsum() if 'Dividends' in history else np.zeros(len(history))
+        start = dates - pd.Timedelta(days=PERIOD_DAYS[freq])
+        received = np.nan_to_num(_asof(index, paid, dates)) - np.nan_to_num(_asof(index, paid, start))
+    else:
+        price = np.full(len(dates), np.nan)
+        received = np.zeros(len(dates))
+    frame['market_cap'] = price * shares.to_numpy()
+    frame['name'] = ""
+    frame['is_boycotted'] = False
+    # Activité et boycott sont appliqués plus tard (profil actuel) : ici seuls les critères financiers
+    activity = pd.DataFrame({'activity_ok': True, 'activity_msg': ""}, index=frame.index)
+    ratios = shariah_columns(frame, activity=activity)
+    out = ratios[['haram_ratio', 'debt_ratio', 'illiquid_ratio', 'liquid_ok']].copy()
+    out['cash_ratio'] = frame['current_assets'] / frame['market_cap'] * 100
+    out['market_cap'] = frame['market_cap']
+    out['total_revenue'] = frame['total_revenue']
+    out['interest_income'] = frame['interest_income']
+    # Dividende par action : versements réels de l'historique, sinon dividendes du tableau de flux / actions
+    from_statements = (panel['dividends_paid'].abs() / shares).fillna(0).to_numpy()
+    out['dividend_per_share'] = np.where(received > 0, received, from_statements)
+    out['purification_per_share'] = out['dividend_per_share'] * out['haram_ratio'] / 100
+    out['filing_failures'] = ratios['shariah_details']
+    return out
+
+
+def _panels(agent):
+    # Un panel par fréquence : toutes les colonnes des états annuels puis trimestriels
+    return {freq: statement_panel({ds: getattr(agent, prefix + ds) for ds in STATEMENTS}) for freq, prefix in FREQUENCIES.items()}
+
+
+def _key(freq, period_end): return f"{freq}:{pd.Timestamp(period_end).date().isoformat()}"
+
+
+def _complete(panel, rows):
+    # Seules les clôtures calculées sur des entrées réelles (actions de la période, actif, cours) sont mises en cache
+    return panel['shares'].notna().to_numpy() & panel['total_assets'].notna().to_numpy() & np.isfinite(rows['market_cap'].to_numpy(dtype=float))
+
+
+def _history(agent, start):
+    # Fenêtre déjà stockée si elle remonte assez loin ; sinon un téléchargement ponctuel depuis `start`,
+    # qui n'élargit pas la fenêtre conservée par le PriceStore pour ce ticker
+    stored = agent.history('max')
+    if stored is not None and not stored.empty and _naive(stored.index)[0] <= start: return stored
+    with span("fetch.history_timeline"): return agent.prices.fetch(agent.ticker, start=start.strftime('%Y-%m-%d'))
+
+
+def shariah_timeline(ticker, agent=None, profile=None):
+    # Une ligne par clôture (fréquence, date), la plus ancienne en premier.
+    # profile : (activity_ok, activity_msg, is_boycotted) d'une analyse déjà faite ; sans lui, info et boycott sont chargés ici.
+    # Chaque clôture en cache porte l'empreinte des colonnes d'états dont elle est issue : une publication révisée est recalculée.
+    agent = agent or MizanAgent(ticker)
+    with span("shariah.timeline"):
+        quarterly = tuple(FREQUENCIES['Q'] + ds for ds in STATEMENTS)
+        if profile is None: agent.prefetch(('info',) + STATEMENTS + quarterly, boycott=True)
+        else: agent.prefetch(STATEMENTS + quarterly)
+        cached, _ = agent.cache.peek(ticker, TIMELINE_DATASET)
+        filings, shown = dict(cached or {}), {}
+        fresh = {}
+        for freq, panel in _panels(agent).items():
+            sources = pd.util.hash_pandas_object(panel, index=False).to_numpy() if not panel.empty else []
+            stale = [filings.get(_key(freq, p), {}).get('source') != int(h) for p, h in zip(panel.index, sources)]
+            if any(stale): fresh[freq] = (panel[stale], np.asarray(sources)[stale])
+        if fresh:
+            start = min(pd.Timestamp(panel.index.min()) - pd.Timedelta(days=PERIOD_DAYS[freq]) for freq, (panel, _) in fresh.items())
+            history = _history(agent, start)
+            for freq, (panel, sources) in fresh.items():
+                incr("shariah_filings_computed_total", value=len(panel), freq=freq)
+                shares = agent.info.get('sharesOutstanding') if panel['shares'].isna().any() else None
+                rows = filing_rows(panel, freq, history, shares)
+                for period_end, row, source, complete in zip(panel.index, rows.to_dict('records'), sources, _complete(panel, rows)):
+                    key = _key(freq, period_end)
+                    if complete: filings[key] = dict(row, source=int(source))
+                    else:
+                        filings.pop(key, None)
+                        shown[key] = row
+            agent.cache.set(ticker, TIMELINE_DATASET, filings)
+        if profile is None: activity, is_boycotted = agent.check_business_activity(), agent.check_boycott_status()
+        else: activity, is_boycotted = profile[:2], profile[2]
+        return assemble(dict(filings, **shown), activity, is_boycotted)
+
+
+def assemble(filings, activity, is_boycotted):
+    # Filings en cache -> tableau chronologique, avec le verdict complet (critères financiers + profil actuel)
+    if not filings: return pd.DataFrame(columns=['freq', 'period_end', *FILING_COLUMNS, 'status', 'details'])
+    keys = sorted(filings, key=lambda k: (k[2:], k[0]))
+    timeline = pd.DataFrame([filings[k] for k in keys], columns=FILING_COLUMNS)
+    timeline.insert(0, 'period_end', pd.to_datetime([k[2:] for k in keys]))
+    timeline.insert(0, 'freq', [k[0] for k in keys])
+    activity_ok, _ = activity
+    profile = [f for f, failed in (("Activity", not activity_ok), ("Boycott Listed", bool(is_boycotted))) if failed]
+    failures = timeline['filing_failures'].fillna("").map(lambda f: ", ".join(profile + ([f] if f else [])))
+    # Boycott inconnu (None) : UNKNOWN pour les clôtures sans autre échec
+    unknown = is_boycotted is None
+    timeline['status'] = np.where(failures != "", "HARAM", "UNKNOWN" if unknown else "HALAL")
+    timeline['details'] = failures.map(lambda f: ", ".join(([f] if f else []) + ["Boycott Unknown"])) if unknown else failures
+    return timeline.drop(columns='filing_failures')
+
+
+def purification(timeline, shares, freq='A'):
+    # Montant à purifier pour une ligne de `shares` actions : dividende de chaque période x part de revenus impurs.
+    # Une seule fréquence à la fois : trimestres et exercices couvrent les mêmes dividendes.
+    out = timeline.loc[timeline['freq'] == freq, ['period_end', 'dividend_per_share', 'haram_ratio', 'purification_per_share']].copy()
+    out['shares'] = shares
+    out['dividends'] = out['dividend_per_share'] * shares
+    out['purification'] = out['purification_per_share'] * shares
+    return out
@@ -0,0 +1,74 @@
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+
+from mizan.metrics import incr
+
+# =========================================================
+# ⚡ ÉTAGE DE FETCH CONCURRENT
+# =========================================================
+# Pool borné partagé par toutes les sessions : une analyse dure le temps de
+# l'appel le plus lent, pas la somme de tous les appels.
+MAX_WORKERS = int(os.environ.get("MIZAN_FETCH_WORKERS", "16"))
+DEFAULT_TIMEOUT = 10.0
+
+_POOL = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="mizan-fetch")
+
+
+def submit(fn, *args):
+    # Tâche isolée dans le même pool (ex. un dataset lancé par MizanAgent et attendu plus tard)
+    return _POOL.submit(fn, *args)
+
+
+def fetch_all(tasks, timeouts=None, default_timeout=DEFAULT_TIMEOUT):
+    # tasks : {nom: callable}. Retourne (résultats, erreurs) ; un appel en échec
+    # ou hors délai n'empêche pas les autres d'aboutir.
+    timeouts = timeouts or {}
+    start = time.monotonic()
+    futures = {name: _POOL.submit(fn) for name, fn in tasks.items()}
+    results, errors = {}, {}
+    for name, future in futures.items():
+        deadline = start + timeouts.get(name, default_timeout)
+        try:
+            results[name] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except TimeoutError:
+            errors[name] = "timeout"
+        except Exception as e:
+            errors[name] = f"{type(e).__name__}: {e}"
+    return results, errors
+
+
+# =========================================================
+# 🔗 SINGLE-FLIGHT (COALESCENCE DES APPELS CONCURRENTS)
+# =========================================================
+# Plusieurs sessions qui demandent la même clé en même temps (ex. même ticker
+# dans l'actualité) partagent un seul appel en vol : le premier l'exécute, les
+# suivants attendent et reçoivent son résultat (ou son exception).
+class SingleFlight:
+    def __init__(self, name):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, **labels):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader: call = self._calls[key] = Future()
+        if not leader:
+            # Appel évité : compté pour mesurer le quota économisé
+            incr("singleflight_shared_total", flight=self.name, **labels)
+            return call.result()
+        try:
+            value = fn()
+            call.set_result(value)
+            return value
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        finally:
+            with self._lock: del self._calls[key]
+
+    def in_flight(self):
+        with self._lock: return len(self._calls)
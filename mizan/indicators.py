@@ -0,0 +1,209 @@
+import threading
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from mizan.metrics import span
+from mizan.prices import REWRITE_TOLERANCE, default_price_store
+
+# =========================================================
+# 📉 INDICATEURS TECHNIQUES INCRÉMENTAUX (PLAN DE SORTIE)
+# =========================================================
+# État en colonnes (un tableau numpy par grandeur, une ligne par ticker) :
+# chaque nouvelle barre coûte O(1) par ticker, et une même barre est appliquée
+# à des milliers de tickers en une opération vectorielle. L'état est amorcé
+# depuis l'historique en cache (PriceStore), puis ne consomme que les barres
+# plus récentes que la dernière vue.
+# La dernière barre d'une série peut être en cours de séance : elle n'est pas
+# intégrée à l'état, mais évaluée à part (preview), comme un cours en direct.
+# Si l'historique a été réajusté (split, dividende), la ligne du ticker est
+# remise à zéro puis réamorcée sur toute la série.
+SMA_WINDOWS = (20, 50, 200)
+EMA_SPANS = (12, 26)
+ATR_WINDOW = 14
+CROSS = (20, 50)
+TREND_WINDOW = 50
+SEED_PERIOD = '1y'
+NEVER = np.iinfo(np.int64).min
+UNIT_NS = {'s': 10 ** 9, 'ms': 10 ** 6, 'us': 10 ** 3, 'ns': 1}
+
+
+def _ns(index):
+    # Horodatages en ns UTC (asi8 d'un index localisé est déjà en UTC), sans copie de l'index
+    return index.asi8 * UNIT_NS[index.unit]
+
+
+class IndicatorBank:
+    def __init__(self, sma=SMA_WINDOWS, ema=EMA_SPANS, atr=ATR_WINDOW, cross=CROSS):
+        self.sma = tuple(sma)
+        self.ema = tuple(ema)
+        self.atr_window = atr
+        self.cross = cross
+        # Un seul tampon circulaire, assez long pour la plus grande fenêtre
+        self.depth = max(self.sma)
+        self.tickers = []
+        self.rows = {}
+        self._lock = threading.Lock()
+        self._alloc(0)
+
+    def _alloc(self, n):
+        self.buffer = np.full((n, self.depth), np.nan)
+        self.pos = np.zeros(n, dtype=np.int64)
+        self.bars = np.zeros(n, dtype=np.int64)
+        self.last_ts = np.full(n, NEVER)
+        self.sums = {w: np.zeros(n) for w in self.sma}
+        self.emas = {s: np.full(n, np.nan) for s in self.ema}
+        self.close = np.full(n, np.nan)
+        self.atr = np.full(n, np.nan)
+        self.peak = np.full(n, np.nan)
+        self.cross_sign = np.zeros(n, dtype=np.int8)
+        self.last_cross = np.zeros(n, dtype=np.int8)
+        self.last_cross_ts = np.full(n, NEVER)
+
+    def _grow(self, n):
+        # Ajout de tickers : les tableaux sont agrandis (capacité doublée), l'état existant est conservé
+        old = len(self.pos)
+        if n <= old: return
+        size = max(n, 2 * old)
+        def pad(a, fill):
+            out = np.full((size,) + a.shape[1:], fill, dtype=a.dtype)
+            out[:old] = a
+            return out
+        self.buffer = pad(self.buffer, np.nan)
+        self.pos, self.bars = pad(self.pos, 0), pad(self.bars, 0)
+        self.last_ts, self.last_cross_ts = pad(self.last_ts, NEVER), pad(self.last_cross_ts, NEVER)
+        self.sums = {w: pad(a, 0.0) for w, a in self.sums.items()}
+        self.emas = {s: pad(a, np.nan) for s, a in self.emas.items()}
+        self.close, self.atr, self.peak = pad(self.close, np.nan), pad(self.atr, np.nan), pad(self.peak, np.nan)
+        self.cross_sign, self.last_cross = pad(self.cross_sign, 0), pad(self.last_cross, 0)
+
+    def _reset(self, row):
+        self.buffer[row] = np.nan
+        self.pos[row] = self.bars[row] = 0
+        self.last_ts[row] = self.last_cross_ts[row] = NEVER
+        for a in self.sums.values(): a[row] = 0.0
+        for a in self.emas.values(): a[row] = np.nan
+        self.close[row] = self.atr[row] = self.peak[row] = np.nan
+        self.cross_sign[row] = self.last_cross[row] = 0
+
+    def _rows(self, tickers):
+        new = [t for t in dict.fromkeys(tickers) if t not in self.rows]
+        for t in new:
+            self.rows[t] = len(self.tickers)
+            self.tickers.append(t)
+        self._grow(len(self.tickers))
+        return np.array([self.rows[t] for t in tickers], dtype=np.int64)
+
+    def _sma(self, r, w):
+        return np.where(self.bars[r] >= w, self.sums[w][r] / w, np.nan)
+
+    def update(self, r, ts, close, high=None, low=None):
+        # Une barre pour les lignes r (tableaux alignés) : O(1) par ticker, vectorisé sur r
+        high = close if high is None else np.where(np.isnan(high), close, high)
+        low = close if low is None else np.where(np.isnan(low), close, low)
+        pos = self.pos[r]
+        # Valeurs qui sortent de chaque fenêtre, lues avant d'écraser le tampon
+        for w in self.sma:
+            leaving = self.buffer[r, (pos - w) % self.depth]
+            self.sums[w][r] += close - np.where(self.bars[r] >= w, leaving, 0.0)
+        self.buffer[r, pos] = close
+        self.pos[r] = (pos + 1) % self.depth
+        for s in self.ema:
+            ema = self.emas[s][r]
+            self.emas[s][r] = np.where(np.isnan(ema), close, ema + 2.0 / (s + 1) * (close - ema))
+        # ATR de Wilder : moyenne simple sur les premières barres, puis lissage 1/n
+        prev = self.close[r]
+        tr = np.where(np.isnan(prev), high - low, np.maximum(high - low, np.maximum(np.abs(high - prev), np.abs(low - prev))))
+        atr = self.atr[r]
+        bars = self.bars[r] + 1
+        self.atr[r] = np.where(np.isnan(atr), tr, atr + (tr - atr) / np.minimum(bars, self.atr_window))
+        self.peak[r] = np.fmax(self.peak[r], close)
+        self.close[r] = close
+        self.bars[r] = bars
+        self.last_ts[r] = ts
+        # Croisement de moyennes : changement de signe de (rapide - lente), une fois les deux fenêtres pleines
+        fast, slow = self._sma(r, self.cross[0]), self._sma(r, self.cross[1])
+        sign = np.where(np.isnan(slow), 0, np.sign(fast - slow)).astype(np.int8)
+        before = self.cross_sign[r]
+        crossed = (sign != 0) & (before != 0) & (sign != before)
+        self.last_cross[r] = np.where(crossed, sign, self.last_cross[r])
+        self.last_cross_ts[r] = np.where(crossed, ts, self.last_cross_ts[r])
+        self.cross_sign[r] = np.where(sign != 0, sign, before)
+
+    def ingest(self, histories, include_last=False):
+        # histories : {ticker: DataFrame OHLC}. Seules les barres postérieures à la dernière vue sont appliquées,
+        # pas de temps par pas de temps (tous les tickers d'un même horodatage en une opération).
+        # Retourne {ticker: dernière clôture non intégrée} (include_last=False) à passer à snapshot(prices=...).
+        with self._lock:
+            rows, stamps, bars, pending = [], [], [], {}
+            for ticker, hist in histories.items():
+                if hist is None or hist.empty: continue
+                row = self._rows([ticker])[0]
+                # Accès numpy direct (index en entiers, colonnes par position) : l'ingestion tourne sur des milliers de séries
+                columns = list(hist.columns)
+                values = hist.to_numpy(dtype=float)
+                close = values[:, columns.index('Close')]
+                end = len(hist) if include_last else len(hist) - 1
+                if not include_last: pending[ticker] = float(close[-1])
+                ts = _ns(hist.index)
+                start = np.searchsorted(ts, self.last_ts[row], side='right')
+                # Historique réécrit : la clôture intégrée ne correspond plus à celle du même horodatage
+                if start and ts[start - 1] == self.last_ts[row] and not np.isclose(close[start - 1], self.close[row], rtol=REWRITE_TOLERANCE):
+                    self._reset(row)
+                    start = 0
+                if start >= end: continue
+                rows.append(np.full(end - start, row))
+                stamps.append(ts[start:end])
+                # High/Low absents -> clôture
+                bars.append(np.column_stack([close[start:end]] + [values[start:end, columns.index(c)] if c in columns else close[start:end] for c in ('High', 'Low')]))
+            if rows:
+                order = np.argsort(np.concatenate(stamps), kind='stable')
+                rows, stamps, bars = np.concatenate(rows)[order], np.concatenate(stamps)[order], np.concatenate(bars)[order]
+                bounds = np.flatnonzero(np.diff(stamps)) + 1
+                for step in np.split(np.arange(len(rows)), bounds):
+                    self.update(rows[step], stamps[step[0]], bars[step, 0], bars[step, 1], bars[step, 2])
+            return pending
+
+    def snapshot(self, tickers=None, prices=None):
+        # Indicateurs par ticker. prices : {ticker: cours} évalué comme barre provisoire (non intégrée à l'état).
+        with self._lock:
+            tickers = list(self.tickers if tickers is None else [t for t in tickers if t in self.rows])
+            r = np.array([self.rows[t] for t in tickers], dtype=np.int64)
+            close = self.close[r]
+            quoted = np.array([(prices or {}).get(t, np.nan) for t in tickers], dtype=float)
+            provisional = ~np.isnan(quoted)
+            live = np.where(provisional, quoted, close)
+            out = {'close': live, 'bars': self.bars[r]}
+            for w in self.sma:
+                # Moyenne mobile incluant la barre provisoire : la plus ancienne barre de la fenêtre en sort
+                leaving = self.buffer[r, (self.pos[r] - w) % self.depth]
+                full = self.bars[r] + 1 >= w
+                with_live = np.where(full, (self.sums[w][r] - np.where(self.bars[r] >= w, leaving, 0.0) + live) / w, np.nan)
+                out[f'sma_{w}'] = np.where(provisional, with_live, self._sma(r, w))
+            for s in self.ema:
+                ema = self.emas[s][r]
+                out[f'ema_{s}'] = np.where(provisional, ema + 2.0 / (s + 1) * (live - ema), ema)
+            out[f'atr_{self.atr_window}'] = self.atr[r]
+            peak = np.fmax(self.peak[r], live)
+            out['peak'] = peak
+            out['drawdown'] = (live / peak - 1) * 100
+            out['cross'] = self.last_cross[r]
+            cross_at = self.last_cross_ts[r].astype('datetime64[ns]')
+            cross_at[self.last_cross[r] == 0] = np.datetime64('NaT')
+            out['cross_at'] = pd.DatetimeIndex(cross_at).tz_localize('UTC')
+            out['trend_broken'] = live < out[f'sma_{TREND_WINDOW}'] if TREND_WINDOW in self.sma else np.zeros(len(r), dtype=bool)
+            return pd.DataFrame(out, index=pd.Index(tickers, name='ticker'))
+
+    def refresh(self, tickers, prices=None, period=SEED_PERIOD):
+        # Amorce / met à jour depuis le PriceStore (cache disque + barres récentes), puis évalue la dernière barre comme provisoire
+        prices = prices or default_price_store()
+        with span("indicators.refresh"):
+            pending = self.ingest({t: prices.get(t, period) for t in tickers})
+            return self.snapshot(tickers, pending)
+
+
+@lru_cache(maxsize=None)
+def default_indicators():
+    # Banque partagée par le process : l'état des tickers déjà vus n'est jamais recalculé
+    return IndicatorBank()
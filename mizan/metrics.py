@@ -0,0 +1,218 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# =========================================================
+# 📊 MÉTRIQUES : LATENCE PAR ÉTAPE, ERREURS, HITS DE CACHE
+# =========================================================
+# Chaque étape (fetch.info, boycott, page.chart...) garde ses N dernières durées
+# pour les percentiles, plus un total cumulé pour Prometheus. Les compteurs sont
+# étiquetés : errors_total{source="info",kind="timeout"}.
+WINDOW = 2048
+QUANTILES = (0.5, 0.95, 0.99)
+LOG_PATH = os.environ.get("MIZAN_METRICS_LOG")
+PORT_ENV = "MIZAN_METRICS_PORT"
+
+
+def _quantile(values, q):
+    # Percentile au rang le plus proche : assez précis pour repérer un p95, sans numpy
+    if not values: return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _labels(labels): return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+# Noms acceptés par Prometheus : un seul nom invalide fait rejeter toute la page /metrics
+NAME = re.compile(r"[a-zA-Z_:][a-zA-Z0-9_:]*")
+LABEL = re.compile(r"[a-zA-Z_][a-zA-Z0-9_]*")
+
+
+def _check(name, labels=()):
+    if not NAME.fullmatch(name): raise ValueError(f"invalid metric name: {name!r}")
+    for label in labels:
+        if not LABEL.fullmatch(label): raise ValueError(f"invalid label name for {name}: {label!r}")
+
+
+def _escape(value): return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _sanitize(key): return re.sub(r"[^a-zA-Z0-9_:]", "_", str(key))
+
+
+class Registry:
+    def __init__(self, window=WINDOW, log_path=LOG_PATH):
+        self.window = window
+        self.log_path = log_path
+        self._lock = threading.Lock()
+        self._recent = {}
+        self._totals = {}
+        self._counters = {}
+        self._gauges = {}
+
+    @contextmanager
+    def span(self, stage, **labels):
+        # Durée enregistrée même en cas d'exception ; l'exception est comptée puis relancée
+        start = time.perf_counter()
+        ok = True
+        try:
+            yield
+        except BaseException as e:
+            ok = False
+            self.incr("errors_total", source=stage, kind=type(e).__name__)
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - start, ok=ok, **labels)
+
+    def observe(self, stage, seconds, ok=True, **labels):
+        with self._lock:
+            recent = self._recent.get(stage)
+            if recent is None: recent = self._recent[stage] = deque(maxlen=self.window)
+            recent.append(seconds)
+            count, total = self._totals.get(stage, (0, 0.0))
+            self._totals[stage] = (count + 1, total + seconds)
+        if self.log_path: self._log({"stage": stage, "seconds": round(seconds, 6), "ok": ok, **labels})
+
+    def incr(self, name, value=1, **labels):
+        key = (name, _labels(labels))
+        # Vérifié à la création du compteur seulement : les incréments suivants ne paient qu'un accès dict
+        if key not in self._counters: _check(name, labels)
+        with self._lock: self._counters[key] = self._counters.get(key, 0) + value
+
+    def count(self, name, **labels):
+        # Somme des compteurs `name` dont les étiquettes contiennent `labels`
+        wanted = set(_labels(labels))
+        with self._lock: return sum(v for (n, l), v in self._counters.items() if n == name and wanted <= set(l))
+
+    def gauge(self, name, fn, label=None):
+        # fn() -> {clé: valeur numérique}, lu à l'export (ex. DiskCache.stats).
+        # label : fn() -> {valeur d'étiquette: {clé: valeur}}, exporté en mizan_<name>_<clé>{label="..."} (ex. une ligne par hôte)
+        _check(name, () if label is None else (label,))
+        self._gauges[name] = (fn, label)
+
+    def _log(self, record):
+        line = json.dumps(dict(record, ts=round(time.time(), 3)), default=str)
+        with self._lock:
+            with open(self.log_path, 'a', encoding='utf-8') as f: f.write(line + "\n")
+
+    def stages(self):
+        with self._lock:
+            recent = {stage: list(values) for stage, values in self._recent.items()}
+            totals = dict(self._totals)
+        out = {}
+        for stage, values in sorted(recent.items()):
+            count, total = totals[stage]
+            row = {"count": count, "mean": total / count, "max": max(values)}
+            for q in QUANTILES: row[f"p{int(q * 100)}"] = _quantile(values, q)
+            out[stage] = row
+        return out
+
+    def counters(self):
+        with self._lock: items = sorted(self._counters.items())
+        return [{"name": name, "labels": dict(labels), "value": value} for (name, labels), value in items]
+
+    def cache_rates(self):
+        # Taux de hit par cache / dataset, à partir de cache_lookups_total et cache_misses_total
+        rates = {}
+        with self._lock: items = list(self._counters.items())
+        for (name, labels), value in items:
+            if name not in ("cache_lookups_total", "cache_misses_total"): continue
+            row = rates.setdefault(":".join(v for _, v in labels), {"lookups": 0, "misses": 0})
+            row["lookups" if name == "cache_lookups_total" else "misses"] += value
+        for row in rates.values(): row["hit_rate"] = 1 - row["misses"] / row["lookups"] if row["lookups"] else 0.0
+        return dict(sorted(rates.items()))
+
+    def gauges(self):
+        out = {}
+        for name, (fn, label) in list(self._gauges.items()):
+            try:
+                values = fn()
+                if label is None: out[name] = {k: v for k, v in values.items() if isinstance(v, (int, float))}
+                else: out[name] = {key: {k: v for k, v in row.items() if isinstance(v, (int, float))} for key, row in values.items()}
+            except Exception: continue
+        return out
+
+    def snapshot(self):
+        return {"stages": self.stages(), "counters": self.counters(), "caches": self.cache_rates(), "gauges": self.gauges()}
+
+    def to_json(self): return json.dumps(self.snapshot(), indent=1)
+
+    def to_prometheus(self):
+        # Format texte d'exposition Prometheus : latences en summary, compteurs, jauges.
+        # Noms de compteurs et de jauges vérifiés à l'enregistrement ; clés de jauges (calculées à l'export) assainies,
+        # valeurs d'étiquettes échappées.
+        lines = ["# TYPE mizan_stage_seconds summary"]
+        for stage, row in self.stages().items():
+            stage = _escape(stage)
+            for q in QUANTILES:
+                lines.append(f'mizan_stage_seconds{{stage="{stage}",quantile="{q}"}} {row[f"p{int(q * 100)}"]:.6f}')
+            lines.append(f'mizan_stage_seconds_count{{stage="{stage}"}} {row["count"]}')
+            lines.append(f'mizan_stage_seconds_sum{{stage="{stage}"}} {row["mean"] * row["count"]:.6f}')
+        seen = set()
+        for c in self.counters():
+            if c["name"] not in seen:
+                lines.append(f"# TYPE mizan_{c['name']} counter")
+                seen.add(c["name"])
+            labels = ",".join(f'{k}="{_escape(v)}"' for k, v in c["labels"].items())
+            lines.append(f"mizan_{c['name']}{{{labels}}} {c['value']}")
+        labels = {name: label for name, (_, label) in list(self._gauges.items())}
+        for name, values in self.gauges().items():
+            label = labels.get(name)
+            if label is None:
+                for key, value in values.items():
+                    lines.append(f"# TYPE mizan_{name}_{_sanitize(key)} gauge")
+                    lines.append(f"mizan_{name}_{_sanitize(key)} {value}")
+                continue
+            # Jauges étiquetées : une famille par clé, une ligne par valeur d'étiquette
+            for key in dict.fromkeys(k for row in values.values() for k in row):
+                lines.append(f"# TYPE mizan_{name}_{_sanitize(key)} gauge")
+                lines.extend(f'mizan_{name}_{_sanitize(key)}{{{label}="{_escape(value)}"}} {row[key]}' for value, row in values.items() if key in row)
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._recent.clear()
+            self._totals.clear()
+            self._counters.clear()
+
+
+# Registre partagé par tout le process (sessions Streamlit, threads de la CLI)
+@lru_cache(maxsize=None)
+def default_registry(): return Registry()
+
+
+def span(stage, **labels): return default_registry().span(stage, **labels)
+def observe(stage, seconds, **labels): default_registry().observe(stage, seconds, **labels)
+def incr(name, value=1, **labels): default_registry().incr(name, value, **labels)
+
+
+def serve(port, registry=None, host="0.0.0.0"):
+    # Endpoint texte pour le scraping : /metrics (Prometheus) et /metrics.json, dans un thread démon
+    registry = registry or default_registry()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith("/metrics.json"): body, ctype = registry.to_json(), "application/json"
+            elif self.path.startswith("/metrics"): body, ctype = registry.to_prometheus(), "text/plain; version=0.0.4"
+            else:
+                self.send_error(404)
+                return
+            payload = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args): pass
+
+    server = ThreadingHTTPServer((host, int(port)), Handler)
+    threading.Thread(target=server.serve_forever, name="mizan-metrics", daemon=True).start()
+    return server
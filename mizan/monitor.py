@@ -0,0 +1,149 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+
+import numpy as np
+
+from mizan import metrics
+from mizan.agent import MizanAgent, datasets_for, exit_targets
+from mizan.cache import default_cache
+from mizan.indicators import SEED_PERIOD, TREND_WINDOW, default_indicators
+from mizan.metrics import incr, span
+from mizan.prices import default_price_store
+from mizan.watchlist import default_watchlists
+
+# =========================================================
+# 🔔 MONITEUR DE WATCHLISTS (CASSURE DE TENDANCE, TP1 / TP2)
+# =========================================================
+# Un seul worker réévalue le plan de sortie de tous les tickers suivis : cours
+# et historiques téléchargés par lots (un appel par lot, appels espacés),
+# indicateurs mis à jour avec les seules nouvelles barres (IndicatorBank),
+# signaux réévalués seulement pour les tickers dont le cours a bougé. Un signal
+# qui s'allume est poussé dans la file d'alertes (SQLite des watchlists), que
+# l'UI lit pour chaque propriétaire.
+INTERVAL = 60
+BATCH_SIZE = 200
+REQUEST_INTERVAL = 1.0
+QUOTE_MAX_AGE = 60
+TARGET_METRICS = ('eps', 'rps')
+TARGET_TTL = 24 * 3600
+TARGET_WORKERS = 8
+# Objectifs calculés par cycle au plus (un appel info par ticker) : un premier cycle sur des milliers de tickers reste dans l'intervalle
+TARGET_BUDGET = 500
+SIGNALS = ('trend_break', 'tp1', 'tp2')
+BITS = 1 << np.arange(len(SIGNALS))
+
+
+class WatchlistMonitor:
+    def __init__(self, watchlists=None, prices=None, bank=None, cache=None, interval=INTERVAL, batch_size=BATCH_SIZE,
+                 request_interval=REQUEST_INTERVAL, target_workers=TARGET_WORKERS, target_budget=TARGET_BUDGET):
+        self.watchlists = watchlists or default_watchlists()
+        self.prices = prices or default_price_store()
+        self.bank = bank or default_indicators()
+        self.cache = cache or default_cache()
+        self.interval = interval
+        self.batch_size = batch_size
+        self.request_interval = request_interval
+        self.target_workers = target_workers
+        self.target_budget = target_budget
+        self.targets = {}
+        self.seen = {}
+        self.signals = None
+        self.cycles = 0
+        self._last_request = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _pace(self):
+        # Téléchargements groupés espacés d'au moins request_interval secondes (quota Yahoo)
+        delay = self._last_request + self.request_interval - time.monotonic()
+        if delay > 0: time.sleep(delay)
+        self._last_request = time.monotonic()
+
+    def _histories(self, tickers):
+        out = {}
+        for i in range(0, len(tickers), self.batch_size):
+            out.update(self.prices.get_many(tickers[i:i + self.batch_size], SEED_PERIOD, max_age=QUOTE_MAX_AGE, pace=self._pace))
+        return out
+
+    def _targets_for(self, ticker):
+        agent = MizanAgent(ticker, cache=self.cache, prices=self.prices)
+        agent.prefetch(datasets_for(TARGET_METRICS))
+        _, tp1, tp2 = exit_targets(agent.collect_data(TARGET_METRICS))
+        return tp1, tp2
+
+    def _refresh_targets(self, tickers):
+        # TP1 / TP2 ne dépendent que des fondamentaux (cache disque, TTL d'un jour) : recalculés une fois par jour
+        now = time.time()
+        due = [t for t in tickers if now - self.targets.get(t, (0, 0, 0))[2] > TARGET_TTL][:self.target_budget]
+        if not due: return set()
+        with span("monitor.targets"), ThreadPoolExecutor(max_workers=self.target_workers) as pool:
+            futures = {pool.submit(self._targets_for, t): t for t in due}
+            for future in as_completed(futures):
+                try: tp1, tp2 = future.result()
+                except Exception as e:
+                    incr("errors_total", source="monitor.targets", kind=type(e).__name__)
+                    tp1, tp2 = 0, 0
+                self.targets[futures[future]] = (tp1, tp2, now)
+        return set(due)
+
+    def run_once(self):
+        # Un cycle complet ; retourne les alertes émises [(propriétaire, ticker, signal, cours, niveau)]
+        with span("monitor.cycle"):
+            watched = self.watchlists.watched()
+            tickers = list(watched)
+            if self.signals is None: self.signals = self.watchlists.signal_states()
+            histories = self._histories(tickers)
+            retargeted = self._refresh_targets(tickers)
+            pending = self.bank.ingest(histories)
+            moved = [t for t, price in pending.items() if self.seen.get(t) != price or t in retargeted]
+            incr("monitor_evaluations_total", value=len(moved))
+            alerts = self._evaluate(moved, pending, watched) if moved else []
+            self.cycles += 1
+        return alerts
+
+    def _evaluate(self, tickers, pending, watched):
+        # Signaux en colonnes pour tous les tickers qui ont bougé ; seuls ceux qui s'allument donnent une alerte
+        snap = self.bank.snapshot(tickers, pending)
+        names = list(snap.index)
+        price = snap['close'].to_numpy(dtype=float)
+        targets = np.array([self.targets.get(t, (0, 0, 0))[:2] for t in names], dtype=float).reshape(-1, 2)
+        levels = np.column_stack([snap[f'sma_{TREND_WINDOW}'].to_numpy(dtype=float), targets])
+        active = np.column_stack([snap['trend_broken'].to_numpy(dtype=bool), (targets > 0) & (price[:, None] >= targets)])
+        bits = active.astype(np.int64).dot(BITS)
+        before = np.array([self.signals.get(t, 0) for t in names], dtype=np.int64)
+        raised = active & ((before[:, None] & BITS) == 0)
+        rows = [(owner, names[i], SIGNALS[k], float(price[i]), float(levels[i, k])) for i, k in zip(*np.nonzero(raised)) for owner in watched.get(names[i], ())]
+        if rows: self.watchlists.push_alerts(rows)
+        changed = [(names[i], int(bits[i]), float(price[i])) for i in np.flatnonzero(bits != before)]
+        if changed: self.watchlists.save_signal_states(changed)
+        self.signals.update((t, b) for t, b, _ in changed)
+        self.seen.update(zip(names, price.tolist()))
+        incr("monitor_alerts_total", value=len(rows))
+        return rows
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="mizan-monitor", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self): self._stop.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            start = time.monotonic()
+            try: self.run_once()
+            except Exception as e: incr("errors_total", source="monitor", kind=type(e).__name__)
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - start)))
+
+    def stats(self): return {"cycles": self.cycles, "tickers": len(self.seen), "targets": len(self.targets)}
+
+
+@lru_cache(maxsize=None)
+def default_monitor():
+    monitor = WatchlistMonitor()
+    metrics.default_registry().gauge("monitor", monitor.stats)
+    return monitor
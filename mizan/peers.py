@@ -0,0 +1,185 @@
+import os
+import sqlite3
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+
+import numpy as np
+
+from mizan import metrics
+from mizan.agent import STRATEGIES, MizanAgent, datasets_for
+from mizan.metrics import incr, span
+from mizan.snapshot import NUMERIC_FIELDS, Fundamentals
+
+# =========================================================
+# 👥 INDEX DES PAIRS (QUANTILES PAR SECTEUR / INDUSTRIE)
+# =========================================================
+# Les seuils des stratégies sont absolus (marge > 15 %, PER < 25) : une
+# utility et un éditeur de logiciels sont jugés pareil. L'index garde le
+# dernier instantané de chaque ticker vu (screener, analyse, CLI) et, par
+# industrie et par secteur, les quantiles de chaque métrique et le rang
+# centile de chaque membre. Un nouvel instantané ne fait recalculer que ses
+# groupes, au premier accès ; la lecture d'un ticker est un accès dict.
+DEFAULT_PATH = os.environ.get("MIZAN_PEERS_PATH", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "peers.sqlite"))
+LEVELS = ('industry', 'sector')
+# En dessous, le groupe est trop petit pour situer un ticker : on remonte de l'industrie au secteur
+MIN_PEERS = 5
+QUANTILES = (10, 25, 50, 75, 90)
+PEER_METRICS = tuple(m for m in NUMERIC_FIELDS if m != 'current_price')
+PEER_COLUMN = {m: j for j, m in enumerate(PEER_METRICS)}
+# Domaine de validité des règles (ex. PER > 0) : un PER négatif n'est pas « moins cher » que ses pairs
+VALID = {r.metric: r.valid for s in STRATEGIES.values() for r in s.rules if r.valid}
+DEFAULT_WORKERS = 8
+
+
+def percentile_ranks(values):
+    # values : membres x métriques (NaN = absent). Rang centile moyen (ex aequo au milieu), NaN si la valeur manque
+    out = np.full(values.shape, np.nan)
+    for j in range(values.shape[1]):
+        column = values[:, j]
+        present = ~np.isnan(column)
+        ordered = np.sort(column[present])
+        if not len(ordered): continue
+        below = np.searchsorted(ordered, column[present], side='left')
+        upto = np.searchsorted(ordered, column[present], side='right')
+        out[present, j] = (below + upto) / 2 / len(ordered) * 100
+    return out
+
+
+def composite(ranks, strategy):
+    # Score 0-100 d'un ticker face à ses pairs sur les métriques de la stratégie, orienté par la règle
+    # ("> seuil" : plus haut = mieux ; "< seuil" : plus bas = mieux). None si aucune métrique n'est classée.
+    scores = []
+    for rule in STRATEGIES[strategy].rules:
+        rank = ranks.get(rule.metric)
+        if rank is None or np.isnan(rank): continue
+        scores.append(rank if rule.op(1, 0) else 100 - rank)
+    return float(np.mean(scores)) if scores else None
+
+
+class PeerIndex:
+    def __init__(self, path=DEFAULT_PATH, min_peers=MIN_PEERS):
+        self.path = path
+        self.min_peers = min_peers
+        self.rows = {}
+        self.members = {}
+        self.groups = {}
+        self.ranks = {}
+        self._dirty = set()
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS peer_rows (
+            ticker TEXT PRIMARY KEY, sector TEXT, industry TEXT, metrics BLOB NOT NULL, updated_at REAL NOT NULL)""")
+        # Amorçage depuis les instantanés déjà vus ; une liste de métriques modifiée depuis invalide les anciennes lignes
+        for ticker, sector, industry, blob in self._conn.execute("SELECT ticker, sector, industry, metrics FROM peer_rows"):
+            values = np.frombuffer(blob, dtype=np.float64)
+            if len(values) == len(PEER_METRICS): self._put(ticker, {'sector': sector, 'industry': industry}, values.copy())
+
+    def _put(self, ticker, labels, values):
+        # Ligne en mémoire et appartenance aux groupes ; les groupes quittés ou rejoints sont à recalculer
+        old = self.rows.get(ticker)
+        for level in LEVELS:
+            before, after = old and (level, old[0][level]), labels[level] and (level, labels[level])
+            if before != after and before: self.members[before].discard(ticker)
+            if after: self.members.setdefault(after, set()).add(ticker)
+            self._dirty.update(g for g in (before, after) if g)
+        self.rows[ticker] = (labels, values)
+
+    def update(self, records):
+        # Instantanés (Fundamentals) : une valeur absente garde la dernière valeur connue. Tickers sans profil ignorés.
+        now, changed = time.time(), []
+        with self._lock:
+            for record in records:
+                if record.name is None: continue
+                ticker = record.ticker.upper()
+                values = np.array([getattr(record, m) for m in PEER_METRICS], dtype=np.float64)
+                # Défauts de l'agent (0, 1...) pour une entrée manquante : pas des mesures, ils fausseraient centiles et quantiles
+                if record.defaulted: values[[PEER_COLUMN[m] for m in record.defaulted.split(", ") if m in PEER_COLUMN]] = np.nan
+                old = self.rows.get(ticker)
+                if old is not None: values = np.where(np.isnan(values), old[1], values)
+                # Profil par défaut de l'agent ("Unknown") : pas un groupe de pairs
+                labels = {level: getattr(record, level) if getattr(record, level) not in (None, "", "Unknown") else None for level in LEVELS}
+                if not any(labels.values()): continue
+                self._put(ticker, labels, values)
+                changed.append((ticker, labels['sector'], labels['industry'], values.tobytes(), now))
+            if changed:
+                # Une seule transaction par lot (sinon un commit, donc un fsync, par ligne)
+                self._conn.execute("BEGIN")
+                self._conn.executemany("INSERT OR REPLACE INTO peer_rows VALUES (?, ?, ?, ?, ?)", changed)
+                self._conn.execute("COMMIT")
+        incr("peer_updates_total", value=len(changed))
+        return len(changed)
+
+    def _refresh(self, group):
+        # Quantiles et rangs d'un groupe, en bloc (membres x métriques)
+        members = sorted(self.members.get(group, ()))
+        if not members:
+            self.groups.pop(group, None)
+            return
+        values = np.vstack([self.rows[t][1] for t in members])
+        for j, m in enumerate(PEER_METRICS):
+            if m in VALID: values[:, j] = np.where(VALID[m][0](values[:, j], VALID[m][1]), values[:, j], np.nan)
+        ranks = percentile_ranks(values)
+        with warnings.catch_warnings():
+            # Métrique absente de tout le groupe : quantiles NaN
+            warnings.simplefilter("ignore", RuntimeWarning)
+            quantiles = np.nanpercentile(values, QUANTILES, axis=0)
+        self.groups[group] = {'count': len(members), 'counts': (~np.isnan(values)).sum(axis=0), 'quantiles': quantiles}
+        for i, t in enumerate(members): self.ranks[(group[0], t)] = ranks[i]
+
+    def _fresh(self):
+        if not self._dirty: return
+        with span("peers.refresh"):
+            for group in self._dirty: self._refresh(group)
+        incr("peer_group_refreshes_total", value=len(self._dirty))
+        self._dirty.clear()
+
+    def peers(self, ticker):
+        # Contexte du ticker face à son industrie (ou à son secteur si l'industrie a moins de min_peers membres) :
+        # {'level', 'group', 'count', 'ranks': {métrique: centile}, 'quantiles': {métrique: [p10..p90]}} ; None si inconnu
+        ticker = ticker.upper()
+        with self._lock:
+            self._fresh()
+            row = self.rows.get(ticker)
+            if row is None: return None
+            for level in LEVELS:
+                group = (level, row[0][level])
+                stats = self.groups.get(group)
+                if stats is None or stats['count'] < self.min_peers: continue
+                ranks = self.ranks[(level, ticker)]
+                return {'level': level, 'group': group[1], 'count': stats['count'],
+                        'ranks': {m: float(ranks[j]) for j, m in enumerate(PEER_METRICS) if not np.isnan(ranks[j])},
+                        'quantiles': {m: stats['quantiles'][:, j].tolist() for j, m in enumerate(PEER_METRICS) if stats['counts'][j]}}
+        return None
+
+    def stats(self):
+        with self._lock: return {"tickers": len(self.rows), "groups": len(self.members), "dirty": len(self._dirty)}
+
+
+def collect_snapshot(ticker):
+    # Instantané complet d'un ticker pour l'index (datasets en cache disque, sinon Yahoo)
+    agent = MizanAgent(ticker)
+    with span("prefetch"): agent.prefetch(datasets_for(PEER_METRICS + ('name', 'sector', 'industry')), boycott=True)
+    return Fundamentals.from_agent(agent, PEER_METRICS + ('name', 'sector', 'industry'))
+
+
+def build(tickers, index=None, workers=DEFAULT_WORKERS):
+    # Amorce l'index sur un univers (collecte concurrente, un seul lot écrit à la fin)
+    index = index or default_peer_index()
+    records = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for future in as_completed([pool.submit(collect_snapshot, t) for t in tickers]):
+            try: records.append(future.result())
+            except Exception as e: incr("errors_total", source="peers.collect", kind=type(e).__name__)
+    return index.update(records)
+
+
+@lru_cache(maxsize=None)
+def default_peer_index():
+    index = PeerIndex(":memory:" if os.environ.get("MIZAN_REPLAY") else DEFAULT_PATH)
+    metrics.default_registry().gauge("peers", index.stats)
+    return index
@@ -0,0 +1,149 @@
+import threading
+import time
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from mizan import metrics, yahoo
+from mizan.cache import default_cache
+
+# =========================================================
+# 📈 STORE D'HISTORIQUE DE PRIX (UNE SÉRIE PAR TICKER)
+# =========================================================
+# On télécharge une seule fois la fenêtre la plus longue, puis seulement les
+# barres plus récentes que la dernière date stockée. Toutes les fenêtres
+# dérivées (momentum 3M, MA50 sur 1 an...) sont servies par découpage.
+PERIODS = ['1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'max']
+PERIOD_OFFSETS = {
+    '1d': pd.DateOffset(days=1), '5d': pd.DateOffset(days=5), '1mo': pd.DateOffset(months=1), '3mo': pd.DateOffset(months=3),
+    '6mo': pd.DateOffset(months=6), '1y': pd.DateOffset(years=1), '2y': pd.DateOffset(years=2),
+    '5y': pd.DateOffset(years=5), '10y': pd.DateOffset(years=10),
+}
+DATASET = 'history'
+DEFAULT_WINDOW = '1y'
+# Écart relatif toléré sur les barres communes avant de considérer la série stockée comme réajustée
+REWRITE_TOLERANCE = 1e-4
+
+
+def window(hist, period):
+    # Sous-fenêtre [dernière barre - période, dernière barre] d'une série stockée
+    if hist is None or hist.empty or period == 'max': return hist
+    # Index trié : recherche dichotomique plutôt qu'un masque booléen sur toute la série
+    return hist.iloc[hist.index.searchsorted(hist.index[-1] - PERIOD_OFFSETS[period]):]
+
+
+def longest(*periods): return max(periods, key=PERIODS.index)
+
+
+def rewritten(hist, new):
+    # Yahoo réajuste tout l'historique après un split ou un dividende : les barres déjà stockées ne sont plus
+    # comparables au delta. Détecté par un événement dans le delta ou par un écart sur les barres communes
+    # (Open, figé dès l'ouverture ; Close hors dernière barre stockée, qui peut ne pas être clôturée).
+    for column in ('Stock Splits', 'Dividends'):
+        if column in new and new[column].fillna(0).ne(0).any(): return True
+    common = hist.index.intersection(new.index)
+    if common.empty: return False
+    old, fresh = hist.loc[common], new.loc[common]
+    checks = [('Open', common)] + [('Close', common[common < hist.index[-1]])]
+    for column, dates in checks:
+        if column not in hist or column not in new or dates.empty: continue
+        a, b = old.loc[dates, column].to_numpy(dtype=float), fresh.loc[dates, column].to_numpy(dtype=float)
+        if not np.allclose(a, b, rtol=REWRITE_TOLERANCE, equal_nan=True): return True
+    return False
+
+
+class PriceStore:
+    def __init__(self, cache, fetch, window=DEFAULT_WINDOW, download=None):
+        # fetch(ticker, period=None, start=None) -> DataFrame OHLCV (ex. yf.Ticker(t).history)
+        # download(tickers, period=None, start=None) -> {ticker: DataFrame} : un appel pour tout un lot (get_many)
+        self.cache = cache
+        self.fetch = fetch
+        self.download = download
+        self.window = window
+        self.full_fetches = 0
+        self.delta_fetches = 0
+        self._locks = {}
+
+    def get(self, ticker, period=None):
+        period = period or self.window
+        with self._locks.setdefault(ticker.upper(), threading.Lock()):
+            entry, stored_at = self.cache.peek(ticker, DATASET)
+            if entry is None or entry['bars'].empty or longest(entry['window'], period) != entry['window']:
+                entry = self._full(ticker, longest(self.window, period))
+            elif not self.cache.is_fresh(DATASET, stored_at):
+                entry = self._delta(ticker, entry)
+        return window(entry['bars'], period)
+
+    def _full(self, ticker, period):
+        with metrics.span("fetch.history"): bars = self.fetch(ticker, period=period)
+        entry = {'window': period, 'bars': bars}
+        self.full_fetches += 1
+        self.cache.set(ticker, DATASET, entry)
+        return entry
+
+    def _delta(self, ticker, entry):
+        # La dernière barre est re-téléchargée : en séance elle n'est pas encore clôturée
+        with metrics.span("fetch.history_delta"): new = self.fetch(ticker, start=entry['bars'].index[-1].strftime('%Y-%m-%d'))
+        self.delta_fetches += 1
+        return self._merge(ticker, entry, new)
+
+    def get_many(self, tickers, period=None, max_age=None, pace=None):
+        # get() pour un lot : {ticker: barres}. Les séries absentes ou trop courtes sont téléchargées en un appel,
+        # les séries périmées en un autre (depuis la plus ancienne dernière barre du lot).
+        # max_age : fraîcheur exigée en secondes, plus stricte que le TTL (surveillance continue des cours)
+        # pace : appelé avant chaque téléchargement groupé (limitation de débit de l'appelant)
+        period = period or self.window
+        entries, full, stale = {}, [], []
+        now = time.time()
+        for ticker in dict.fromkeys(t.upper() for t in tickers):
+            entry, stored_at = self.cache.peek(ticker, DATASET)
+            if entry is None or entry['bars'].empty or longest(entry['window'], period) != entry['window']:
+                full.append(ticker)
+                continue
+            entries[ticker] = entry
+            if not (self.cache.is_fresh(DATASET, stored_at) if max_age is None else now - stored_at <= max_age): stale.append(ticker)
+        if full:
+            needed = longest(self.window, period)
+            if pace is not None: pace()
+            with metrics.span("fetch.history_batch"): bars = self._download(full, period=needed)
+            self.full_fetches += len(full)
+            for ticker in full:
+                hist = bars.get(ticker)
+                entries[ticker] = {'window': needed, 'bars': hist if hist is not None else pd.DataFrame()}
+                if not entries[ticker]['bars'].empty: self.cache.set(ticker, DATASET, entries[ticker])
+        if stale:
+            start = min(entries[t]['bars'].index[-1] for t in stale)
+            if pace is not None: pace()
+            with metrics.span("fetch.history_delta_batch"): bars = self._download(stale, start=start.strftime('%Y-%m-%d'))
+            self.delta_fetches += len(stale)
+            for ticker in stale: entries[ticker] = self._merge(ticker, entries[ticker], bars.get(ticker))
+        return {t: window(entry['bars'], period) for t, entry in entries.items()}
+
+    def _download(self, tickers, **kwargs):
+        if self.download is not None: return self.download(tickers, **kwargs)
+        return {t: self.fetch(t, **kwargs) for t in tickers}
+
+    def _merge(self, ticker, entry, new):
+        hist = entry['bars']
+        if new is not None and not new.empty:
+            # Un téléchargement groupé peut renvoyer un autre fuseau (places mélangées) : on garde celui de la série
+            if hist.index.tz is not None and new.index.tz is not None: new = new.tz_convert(hist.index.tz)
+            if rewritten(hist, new):
+                metrics.incr("prices_rewrites_total")
+                return self._full(ticker, entry['window'])
+            hist = pd.concat([hist[hist.index < new.index[0]], new])
+            # On garde la taille de la fenêtre stockée bornée
+            if entry['window'] != 'max': hist = window(hist, entry['window'])
+        entry = {'window': entry['window'], 'bars': hist}
+        self.cache.set(ticker, DATASET, entry)
+        return entry
+
+    def stats(self): return {"full_fetches": self.full_fetches, "delta_fetches": self.delta_fetches}
+
+
+@lru_cache(maxsize=None)
+def default_price_store():
+    store = PriceStore(default_cache(), yahoo.history, download=yahoo.download)
+    metrics.default_registry().gauge("price_store", store.stats)
+    return store
@@ -0,0 +1,131 @@
+import json
+import os
+import sys
+import threading
+import zlib
+from io import StringIO
+
+import pandas as pd
+
+from mizan.prices import window
+
+# =========================================================
+# 📼 REJEU HORS LIGNE (FIXTURES ENREGISTRÉES)
+# =========================================================
+# fixtures/<TICKER>/info.json, income_stmt.json, balance_sheet.json, cashflow.json (+ quarterly_*.json), history.csv
+# fixtures/search.json ({requête: [quotes]}) et fixtures/boycott.json (instantané BoycottList).
+# Le fournisseur imite l'interface de yf.Ticker utilisée par MizanAgent et PriceStore.
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures")
+STATEMENTS = ('income_stmt', 'balance_sheet', 'cashflow', 'quarterly_income_stmt', 'quarterly_balance_sheet', 'quarterly_cashflow')
+
+
+def write_frame(df, path):
+    df.to_json(path, orient='split', date_format='iso', indent=1)
+
+
+def read_frame(path):
+    with open(path, encoding='utf-8') as f:
+        df = pd.read_json(StringIO(f.read()), orient='split')
+    df.columns = pd.to_datetime(df.columns)
+    return df
+
+
+class ReplayTicker:
+    def __init__(self, provider, symbol, source):
+        self.ticker = symbol
+        self._provider = provider
+        self._source = source
+
+    @property
+    def info(self):
+        info = dict(self._provider.load(self._source, 'info'))
+        if info and self.ticker != self._source: info['symbol'] = self.ticker
+        return info
+
+    @property
+    def income_stmt(self): return self._provider.load(self._source, 'income_stmt').copy()
+    @property
+    def financials(self): return self.income_stmt
+    @property
+    def balance_sheet(self): return self._provider.load(self._source, 'balance_sheet').copy()
+    @property
+    def cashflow(self): return self._provider.load(self._source, 'cashflow').copy()
+    @property
+    def quarterly_income_stmt(self): return self._provider.load(self._source, 'quarterly_income_stmt').copy()
+    @property
+    def quarterly_balance_sheet(self): return self._provider.load(self._source, 'quarterly_balance_sheet').copy()
+    @property
+    def quarterly_cashflow(self): return self._provider.load(self._source, 'quarterly_cashflow').copy()
+
+    def history(self, period=None, start=None, **kwargs):
+        hist = self._provider.load(self._source, 'history')
+        if start is not None: return hist[hist.index >= pd.Timestamp(start, tz=hist.index.tz)].copy()
+        return window(hist, period or '1mo').copy()
+
+
+class ReplayProvider:
+    def __init__(self, root=FIXTURES_DIR, alias_unknown=False):
+        # alias_unknown : un ticker sans fixture rejoue une fixture existante (univers synthétiques de benchmark)
+        self.root = root
+        self.alias_unknown = alias_unknown
+        self.tickers = sorted(d for d in os.listdir(root) if os.path.isdir(os.path.join(root, d)) and not d.startswith(('.', '_')))
+        self.calls = 0
+        self._frames = {}
+        self._lock = threading.Lock()
+        try:
+            with open(os.path.join(root, 'search.json'), encoding='utf-8') as f: self._search = json.load(f)
+        except OSError: self._search = {}
+
+    def source_for(self, symbol):
+        symbol = symbol.upper()
+        if symbol in self.tickers: return symbol
+        if self.alias_unknown and self.tickers: return self.tickers[zlib.crc32(symbol.encode()) % len(self.tickers)]
+        return None
+
+    def load(self, source, dataset):
+        # Chaque fichier est lu une seule fois ; les appelants reçoivent des copies
+        self.calls += 1
+        key = (source, dataset)
+        if key not in self._frames:
+            with self._lock:
+                if key not in self._frames: self._frames[key] = self._read(source, dataset)
+        return self._frames[key]
+
+    def _read(self, source, dataset):
+        empty = {} if dataset == 'info' else pd.DataFrame()
+        if source is None: return empty
+        path = os.path.join(self.root, source, dataset + ('.csv' if dataset == 'history' else '.json'))
+        if not os.path.exists(path): return empty
+        if dataset == 'info':
+            with open(path, encoding='utf-8') as f: return json.load(f)
+        if dataset == 'history':
+            hist = pd.read_csv(path, index_col=0)
+            hist.index = pd.to_datetime(hist.index, utc=True).tz_convert('America/New_York')
+            return hist
+        return read_frame(path)
+
+    def ticker(self, symbol): return ReplayTicker(self, symbol.upper(), self.source_for(symbol))
+    def history(self, symbol, **kwargs): return self.ticker(symbol).history(**kwargs)
+    def download(self, symbols, **kwargs): return {s.upper(): self.history(s, **kwargs) for s in symbols}
+
+    def search(self, query):
+        self.calls += 1
+        return self._search.get(query.strip().lower(), [])
+
+
+def record(symbols, root=FIXTURES_DIR, period='5y'):
+    # Enregistre des fixtures depuis Yahoo (réseau requis) : python -m mizan.replay AAPL MSFT
+    import yfinance as yf
+    for symbol in symbols:
+        stock = yf.Ticker(symbol)
+        folder = os.path.join(root, symbol.upper())
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, 'info.json'), 'w', encoding='utf-8') as f: json.dump(stock.info, f, indent=1, default=str)
+        for name in STATEMENTS: write_frame(getattr(stock, name), os.path.join(folder, f"{name}.json"))
+        stock.history(period=period).to_csv(os.path.join(folder, 'history.csv'))
+        print(f"recorded {symbol.upper()}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2: sys.exit("usage: python -m mizan.replay TICKER [TICKER ...]")
+    record(sys.argv[1:])
@@ -0,0 +1,120 @@
+import json
+import math
+import operator
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# =========================================================
+# 📐 MOTEUR DE RÈGLES DÉCLARATIVES (STRATÉGIES)
+# =========================================================
+# Une stratégie = liste de règles {metric, op, threshold} lues depuis
+# data/strategies.json. Chaque règle se compile en deux évaluateurs :
+# scalaire (un dict de métriques, pour la page d'analyse) et vectoriel
+# (masque booléen sur un DataFrame, pour le screener).
+DEFAULT_PATH = os.environ.get("MIZAN_STRATEGIES_PATH", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "strategies.json"))
+OPS = {'>': operator.gt, '>=': operator.ge, '<': operator.lt, '<=': operator.le, '==': operator.eq, '!=': operator.ne}
+NA = "N/A"
+
+
+def _missing(value): return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def numeric(frame, column, default=np.nan):
+    # Colonne numérique (None -> NaN) ; colonne absente -> valeur par défaut
+    if column not in frame: return pd.Series(default, index=frame.index, dtype=float)
+    return pd.to_numeric(frame[column], errors='coerce').astype(float)
+
+
+def _op(name):
+    if name not in OPS: raise ValueError(f"unknown operator {name!r} (expected one of {', '.join(OPS)})")
+    return OPS[name]
+
+
+class Rule:
+    # Champs : key (libellé / traduction), metric, op, threshold, target (texte de la cible), format, help,
+    # when (seuils conditionnels, premier cas vrai gagnant), valid (hors de ce domaine -> N/A),
+    # default (valeur si la métrique manque), na ("fail" ou "pass" quand la valeur est N/A).
+    def __init__(self, spec):
+        self.spec = spec
+        self.key = spec['key']
+        self.metric = spec['metric']
+        self.op = _op(spec['op'])
+        self.threshold = float(spec['threshold'])
+        self.target = spec.get('target', f"{spec['op']} {spec['threshold']}")
+        self.format = spec.get('format', "{:.2f}")
+        self.help = spec.get('help', "")
+        self.default = spec.get('default')
+        self.na_pass = spec.get('na', 'fail') == 'pass'
+        valid = spec.get('valid')
+        self.valid = (_op(valid['op']), float(valid['value'])) if valid else None
+        self.cases = [(c['metric'], _op(c['op']), float(c['value']), float(c['threshold']), c.get('target', self.target)) for c in spec.get('when', ())]
+
+    @property
+    def metrics(self): return (self.metric,) + tuple(c[0] for c in self.cases)
+
+    def _value(self, d):
+        value = d.get(self.metric)
+        if _missing(value): value = self.default
+        if _missing(value) or (self.valid and not self.valid[0](value, self.valid[1])): return None
+        return value
+
+    def _threshold(self, d):
+        for metric, op, value, threshold, target in self.cases:
+            v = d.get(metric)
+            if not _missing(v) and op(v, value): return threshold, target
+        return self.threshold, self.target
+
+    def evaluate(self, d):
+        value = self._value(d)
+        threshold, target = self._threshold(d)
+        passed = self.na_pass if value is None else bool(self.op(value, threshold))
+        return {"k": self.key, "v": NA if value is None else self.format.format(value), "t": target, "pass": passed, "h": self.help}
+
+    def mask(self, frame):
+        values = numeric(frame, self.metric)
+        if self.default is not None: values = values.fillna(self.default)
+        valid = values.notna()
+        if self.valid: valid &= self.valid[0](values, self.valid[1])
+        thresholds = np.full(len(frame), self.threshold)
+        # Parcours inversé : le premier cas vrai de la spec écrase les suivants
+        for metric, op, value, threshold, _ in reversed(self.cases):
+            thresholds = np.where(op(numeric(frame, metric), value), threshold, thresholds)
+        passed = valid & self.op(values, thresholds)
+        return passed | ~valid if self.na_pass else passed
+
+
+class Strategy:
+    def __init__(self, spec):
+        self.spec = spec
+        self.key = spec['key']
+        self.rules = [Rule(r) for r in spec['rules']]
+
+    def name(self, lang='en'):
+        names = self.spec.get('name') or {}
+        return names.get(lang) or names.get('en') or self.key
+
+    @property
+    def metrics(self):
+        # Métriques lues par les règles, dans l'ordre de la spec
+        return tuple(dict.fromkeys(m for rule in self.rules for m in rule.metrics))
+
+    @property
+    def check_keys(self): return [rule.key for rule in self.rules]
+
+    def evaluate(self, d): return [rule.evaluate(d) for rule in self.rules]
+
+    def masks(self, frame):
+        return pd.DataFrame({rule.key: rule.mask(frame) for rule in self.rules}, index=frame.index)
+
+
+def load_strategies(path=DEFAULT_PATH):
+    # {clé: Strategy}, dans l'ordre du fichier ; une spec invalide échoue au chargement, pas à l'analyse
+    with open(path, encoding='utf-8') as f: specs = json.load(f)['strategies']
+    return {spec['key']: Strategy(spec) for spec in specs}
+
+
+@lru_cache(maxsize=None)
+def default_strategies(): return load_strategies()
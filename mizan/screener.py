@@ -0,0 +1,151 @@
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from mizan.activity import screen_activities
+from mizan.agent import SHARIAH_METRICS, STRATEGIES, STRATEGY_METRICS, MizanAgent, datasets_for
+from mizan.metrics import span
+from mizan.peers import default_peer_index
+from mizan.rules import numeric
+from mizan.snapshot import Fundamentals, FundamentalsTable
+
+# =========================================================
+# 🧮 SCREENER D'UNIVERS (COLLECTE CONCURRENTE, SCORING VECTORISÉ)
+# =========================================================
+# La collecte reste par ticker (I/O, pool borné) ; les règles de stratégie et
+# les ratios Shariah sont ensuite appliqués en colonnes sur tout un lot.
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+UNIVERSE_DIR = os.path.join(DATA_DIR, "universes")
+DIRECTORY_UNIVERSE = "directory"
+BATCH_SIZE = 25
+DEFAULT_WORKERS = 8
+
+SHARIAH_FAILURES = ("Activity", "Boycott Listed", "Interest > 5%", "Debt > 33%", "Real Assets < 20%", "Cash > Cap")
+
+
+def parse_tickers(lines):
+    # Un ticker par ligne (première colonne si CSV) ; lignes vides, commentaires '#' et en-têtes ignorés
+    tickers = [line.split(',')[0].strip().upper() for line in lines if line.strip() and not line.startswith('#')]
+    return [t for t in dict.fromkeys(tickers) if t not in ('TICKER', 'SYMBOL')]
+
+
+def list_universes():
+    # Listes fournies dans data/universes/*.txt, plus l'annuaire de symboles complet
+    names = sorted(f[:-4] for f in os.listdir(UNIVERSE_DIR) if f.endswith('.txt')) if os.path.isdir(UNIVERSE_DIR) else []
+    return names + [DIRECTORY_UNIVERSE]
+
+
+def load_universe(name):
+    path = os.path.join(DATA_DIR, "symbols.csv") if name == DIRECTORY_UNIVERSE else os.path.join(UNIVERSE_DIR, f"{name}.txt")
+    with open(path, encoding='utf-8') as f: return parse_tickers(f)
+
+
+def scan_columns(strategy):
+    # Colonnes stables d'une ligne de scan, même quand un ticker échoue
+    return (['ticker', 'name', 'sector', 'industry', 'strategy', 'score', 'checks', 'strategy_pass', 'shariah_status', 'shariah_details']
+            + [f"{k}_pass" for k in STRATEGIES[strategy].check_keys] + list(STRATEGY_METRICS[strategy]) + ['errors'])
+
+
+def collect_row(ticker, strategy):
+    # Données brutes d'un ticker (pas de verdict) : seulement les datasets de la stratégie et du filtre Shariah.
+    # Instantané compact : l'agent (yf.Ticker, info, états financiers) est libéré dès la sortie
+    metrics = STRATEGY_METRICS[strategy] + SHARIAH_METRICS
+    agent = MizanAgent(ticker)
+    with span("prefetch"): agent.prefetch(datasets_for(metrics), boycott=True)
+    return Fundamentals.from_agent(agent, metrics)
+
+
+def shariah_columns(frame, activity=None):
+    # Ratios AAOIFI en colonnes ; même verdict que MizanAgent.calculate_shariah_ratios.
+    # activity : résultat de screen_activities déjà aligné sur frame (ex. calculé une fois par ticker)
+    total_assets = numeric(frame, 'total_assets').replace(0, np.nan)
+    revenue = numeric(frame, 'total_revenue').replace(0, np.nan)
+    if activity is None:
+        activity = screen_activities(frame.assign(**{c: frame[c].fillna('') for c in ('industry', 'sector', 'description')}))
+    cols = {
+        'haram_ratio': (numeric(frame, 'interest_income') / revenue * 100).fillna(0),
+        'debt_ratio': numeric(frame, 'total_debt').fillna(0) / total_assets * 100,
+        'illiquid_ratio': numeric(frame, 'illiquid_assets').fillna(0) / total_assets * 100,
+        'liquid_ok': numeric(frame, 'current_assets').fillna(0) < numeric(frame, 'market_cap'),
+        'activity_ok': activity['activity_ok'], 'activity_msg': activity['activity_msg'],
+        'is_boycotted': frame['is_boycotted'].fillna(False).astype(bool),
+    }
+    failures = np.column_stack([
+        ~cols['activity_ok'], cols['is_boycotted'], cols['haram_ratio'] >= 5,
+        cols['debt_ratio'] >= 33, cols['illiquid_ratio'] <= 20, ~cols['liquid_ok'],
+    ])
+    # Produit booléen x libellés : concatène les échecs de chaque ligne sans boucle Python
+    details = failures.astype(object).dot(np.array([f + ", " for f in SHARIAH_FAILURES], dtype=object))
+    # Boycott non vérifié (None : recherche en ligne injoignable) : noté, et verdict UNKNOWN plutôt qu'un faux HALAL
+    unknown = frame['is_boycotted'].isna().to_numpy()
+    details = np.where(unknown, details + "Boycott Unknown, ", details)
+    cols['shariah_details'] = pd.Series(details, index=frame.index, dtype=object).str[:-2]
+    cols['shariah_status'] = pd.Series(np.where(failures.any(axis=1), "HARAM", np.where(unknown, "UNKNOWN", "HALAL")), index=frame.index, dtype=object)
+    # Ticker en échec complet ou sans données (inconnu, radié : ni capitalisation ni actif) : pas de verdict plutôt qu'un faux HARAM
+    failed = frame['name'].isna() | (numeric(frame, 'market_cap').isna() & numeric(frame, 'total_assets').isna())
+    if failed.any():
+        for c in ('shariah_status', 'shariah_details'): cols[c] = cols[c].mask(failed, None)
+    return pd.DataFrame(cols, index=frame.index)
+
+
+def score_frame(frame, strategy, shariah=None):
+    # Lignes brutes (collect_row) -> colonnes de scan_columns + ratios Shariah, calculées en bloc.
+    # shariah : résultat de shariah_columns déjà calculé (indépendant de la stratégie), à réutiliser.
+    # Règles de la stratégie compilées en masques booléens (NaN = critère non satisfait, sauf na: pass)
+    checks = STRATEGIES[strategy].masks(frame)
+    shariah = shariah_columns(frame) if shariah is None else shariah
+    cols = {
+        'ticker': frame['ticker'], 'name': frame['name'], 'sector': frame['sector'], 'industry': frame['industry'],
+        'strategy': strategy, 'score': checks.sum(axis=1).astype(int), 'checks': checks.shape[1], 'strategy_pass': checks.all(axis=1),
+        'shariah_status': shariah['shariah_status'], 'shariah_details': shariah['shariah_details'],
+    }
+    for k in checks: cols[f"{k}_pass"] = checks[k]
+    for m in STRATEGY_METRICS[strategy]: cols[m] = numeric(frame, m)
+    cols['errors'] = frame['errors'] if 'errors' in frame else ""
+    for c in ('haram_ratio', 'debt_ratio', 'illiquid_ratio'): cols[c] = shariah[c]
+    return pd.DataFrame(cols, index=frame.index)
+
+
+def iter_screen(tickers, strategy, workers=DEFAULT_WORKERS, batch_size=BATCH_SIZE, stream=False):
+    # Générateur de lots notés au fil de l'eau : l'UI et la CLI affichent les résultats sans attendre la fin.
+    # stream=True (CLI) : un lot part dès qu'aucun autre ticker terminé n'attend, un ticker lent ne retient pas les autres ;
+    # les tickers terminés ensemble restent notés en colonnes, jusqu'à batch_size. Sinon lots pleins (UI : un rendu par lot).
+    finished = queue.SimpleQueue()
+    rows = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for ticker in tickers: pool.submit(collect_row, ticker, strategy).add_done_callback(lambda f, t=ticker: finished.put((t, f)))
+        for _ in tickers:
+            ticker, future = finished.get()
+            try: rows.append(future.result())
+            except Exception as e: rows.append(Fundamentals(ticker=ticker, errors=f"{type(e).__name__}: {e}"))
+            if len(rows) >= batch_size or (stream and finished.empty()):
+                yield _score_rows(rows, strategy)
+                rows = []
+    if rows: yield _score_rows(rows, strategy)
+
+
+def _score_rows(rows, strategy):
+    # Instantanés -> colonnes typées ; le verdict d'activité est déjà calculé par ticker.
+    # Chaque lot alimente aussi l'index des pairs (seuls leurs groupes seront recalculés)
+    default_peer_index().update(rows)
+    frame = FundamentalsTable.from_records(rows).to_frame()
+    with span("screen.score"): return score_frame(frame, strategy, shariah_columns(frame, activity=frame[['activity_ok', 'activity_msg']]))
+
+
+def screen(tickers, strategy, workers=DEFAULT_WORKERS):
+    frames = list(iter_screen(tickers, strategy, workers))
+    return pd.concat(frames, ignore_index=True) if frames else _score_rows([], strategy)
+
+
+def to_rows(frame, columns=None):
+    # Lignes en types Python natifs (NaN -> None) pour JSON / Parquet
+    frame = frame[columns or scan_columns(frame['strategy'].iloc[0])] if len(frame) else frame
+    return [{k: (None if isinstance(v, float) and v != v else v) for k, v in row.items()} for row in frame.to_dict('records')]
+
+
+def scan_ticker(ticker, strategy):
+    # Ligne plate d'un seul ticker, même chemin que le screening par lots
+    with span("scan"): return to_rows(_score_rows([collect_row(ticker, strategy)], strategy))[0]
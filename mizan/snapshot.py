@@ -0,0 +1,129 @@
+import io
+import math
+
+import numpy as np
+import pandas as pd
+
+from mizan.agent import METRIC_GROUP
+
+# =========================================================
+# 🧊 INSTANTANÉ FONDAMENTAL COMPACT (UNE LIGNE TYPÉE PAR TICKER)
+# =========================================================
+# Un MizanAgent garde yf.Ticker, le dict info complet et les états financiers
+# pour produire une vingtaine de nombres. L'instantané ne garde que ces
+# valeurs, typées : Fundamentals (__slots__) pour un ticker, FundamentalsTable
+# (tableau structuré numpy, ~1 Ko par ticker) pour un univers, sérialisable en
+# un bloc d'octets sans pickle. Le verdict d'activité remplace la description
+# (son seul usage) ; les drapeaux sont codés 1 / 0 / -1 (inconnu).
+# Les largeurs de texte sont des minimums : une table les élargit à sa plus
+# longue valeur, pour ne jamais tronquer un nom, un message ou des erreurs.
+# defaulted : métriques retombées sur un défaut de l'agent (entrée manquante), ignorées par l'index des pairs.
+TEXT_FIELDS = {'ticker': 12, 'name': 48, 'sector': 32, 'industry': 40, 'currency': 4, 'activity_msg': 40, 'errors': 48, 'defaulted': 32}
+FLAG_FIELDS = ('activity_ok', 'is_boycotted')
+NUMERIC_FIELDS = tuple(m for m in METRIC_GROUP if m not in TEXT_FIELDS and m != 'description')
+UNKNOWN = -1
+NO_DATA = "no data"
+
+
+def _dtype(widths):
+    return np.dtype([(f, f'U{widths[f]}') for f in TEXT_FIELDS] + [(f, 'i1') for f in FLAG_FIELDS] + [(f, 'f8') for f in NUMERIC_FIELDS])
+
+
+def _widest(widths):
+    # Largeur par champ texte : celle de TEXT_FIELDS, ou plus si une valeur (ou une table) l'exige
+    widths = list(widths)
+    return {f: max([n] + [w[f] for w in widths]) for f, n in TEXT_FIELDS.items()}
+
+
+DTYPE = _dtype(TEXT_FIELDS)
+
+
+def _number(value):
+    try: return float(value) if value is not None else math.nan
+    except (TypeError, ValueError): return math.nan
+
+
+def _flag(value): return UNKNOWN if value is None else int(bool(value))
+
+
+class Fundamentals:
+    __slots__ = DTYPE.names
+
+    def __init__(self, **values):
+        # Texte : str ou None ; drapeaux : True / False / None ; nombres : float (NaN si absent)
+        for f in TEXT_FIELDS: setattr(self, f, values.get(f))
+        self.errors = self.errors or ""
+        for f in FLAG_FIELDS: setattr(self, f, values.get(f))
+        for f in NUMERIC_FIELDS: setattr(self, f, _number(values.get(f)))
+
+    @classmethod
+    def from_agent(cls, agent, metrics=None):
+        # Seules les métriques demandées sont collectées (les autres restent NaN) ; l'agent peut ensuite être libéré
+        data = agent.collect_data(metrics)
+        # Sans données, l'instantané reste vide (nom et nombres absents) : pas de verdict tiré des valeurs par défaut
+        if not agent.has_data(): return cls(ticker=agent.ticker, errors=", ".join(sorted(agent.errors) + [NO_DATA]))
+        activity_ok, activity_msg = agent.check_business_activity()
+        return cls(ticker=agent.ticker, activity_ok=activity_ok, activity_msg=activity_msg, is_boycotted=agent.check_boycott_status(),
+                   errors=", ".join(sorted(agent.errors)), defaulted=", ".join(sorted(agent.defaulted)) or None, **{f: data.get(f) for f in ('name', 'sector', 'industry', 'currency') + NUMERIC_FIELDS})
+
+    def to_row(self):
+        return tuple(str(getattr(self, f) or "") for f in TEXT_FIELDS) + tuple(_flag(getattr(self, f)) for f in FLAG_FIELDS) + tuple(getattr(self, f) for f in NUMERIC_FIELDS)
+
+    def to_dict(self): return {f: getattr(self, f) for f in self.__slots__}
+
+    def __getstate__(self): return self.to_row()
+
+    def __setstate__(self, row):
+        for f, value in zip(self.__slots__, row):
+            if f in FLAG_FIELDS: value = None if value == UNKNOWN else bool(value)
+            elif f in TEXT_FIELDS and f != 'errors': value = value or None
+            setattr(self, f, value)
+
+    def __repr__(self): return f"Fundamentals({self.ticker!r}, name={self.name!r})"
+
+
+class FundamentalsTable:
+    def __init__(self, array=None):
+        self.array = np.zeros(0, dtype=DTYPE) if array is None else array
+        self._rows = None
+
+    @classmethod
+    def from_records(cls, records):
+        rows = [r.to_row() for r in records]
+        widths = _widest({f: len(row[i]) for i, f in enumerate(TEXT_FIELDS)} for row in rows)
+        return cls(np.array(rows, dtype=_dtype(widths)))
+
+    @classmethod
+    def concat(cls, tables):
+        if not tables: return cls()
+        dtype = _dtype(_widest({f: t.array.dtype[f].itemsize // 4 for f in TEXT_FIELDS} for t in tables))
+        return cls(np.concatenate([t.array.astype(dtype) for t in tables]))
+
+    def __len__(self): return len(self.array)
+
+    @property
+    def nbytes(self): return self.array.nbytes
+
+    def record(self, ticker):
+        if self._rows is None: self._rows = {t: i for i, t in enumerate(self.array['ticker'])}
+        record = Fundamentals.__new__(Fundamentals)
+        record.__setstate__(self.array[self._rows[ticker.upper()]].tolist())
+        return record
+
+    def to_frame(self):
+        # Une colonne par champ : texte vide -> None (sauf errors), drapeaux -> bool (activité) / True-False-None (boycott)
+        a = self.array
+        cols = {f: pd.Series(a[f], dtype=object).replace("", None) if f != 'errors' else pd.Series(a[f], dtype=object) for f in TEXT_FIELDS}
+        cols['activity_ok'] = a['activity_ok'] == 1
+        cols['is_boycotted'] = pd.Series(np.where(a['is_boycotted'] == UNKNOWN, None, a['is_boycotted'] == 1), dtype=object)
+        for f in NUMERIC_FIELDS: cols[f] = a[f]
+        return pd.DataFrame(cols)
+
+    def to_bytes(self):
+        # Format .npy (dtype structuré, sans pickle) : échange entre processus ou mise en cache
+        buffer = io.BytesIO()
+        np.save(buffer, self.array, allow_pickle=False)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, payload): return cls(np.load(io.BytesIO(payload), allow_pickle=False))
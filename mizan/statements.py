@@ -0,0 +1,143 @@
+import numpy as np
+import pandas as pd
+
+# =========================================================
+# 🗂️ ÉTATS FINANCIERS MULTI-PÉRIODES (CHAMPS CANONIQUES)
+# =========================================================
+# Les états Yahoo ont une ligne par poste et une colonne par clôture. Ici on
+# les retourne en un tableau période x champ canonique, toutes colonnes
+# comprises (pas seulement .iloc[0]) : base du backtest et de l'historique Shariah.
+# Les mêmes champs servent à l'analyse d'un ticker (latest_fields, dernière
+# clôture) et aux univers (field_matrix, tickers x champs) : un poste absent
+# vaut NaN, jamais 0.
+# Pour chaque champ : (dataset, libellés Yahoo par ordre de préférence).
+FIELDS = {
+    'revenue': ('income_stmt', ['Total Revenue', 'Operating Revenue']),
+    'operating_income': ('income_stmt', ['Operating Income', 'Total Operating Income As Reported']),
+    'ebit': ('income_stmt', ['EBIT', 'Ebit', 'Operating Income', 'Earnings Before Interest and Taxes']),
+    'ebitda': ('income_stmt', ['EBITDA', 'Normalized EBITDA']),
+    'net_income': ('income_stmt', ['Net Income', 'Net Income Common Stockholders']),
+    'eps': ('income_stmt', ['Diluted EPS', 'Basic EPS']),
+    'shares': ('income_stmt', ['Diluted Average Shares', 'Basic Average Shares']),
+    'interest_expense': ('income_stmt', ['Interest Expense', 'Interest Expense Non Operating']),
+    'interest_income': ('income_stmt', ['Interest Income', 'Interest Income Non Operating', 'Total Interest Income']),
+    'total_assets': ('balance_sheet', ['Total Assets']),
+    'current_assets': ('balance_sheet', ['Current Assets', 'Total Current Assets']),
+    'current_liabilities': ('balance_sheet', ['Current Liabilities', 'Total Current Liabilities']),
+    'equity': ('balance_sheet', ['Stockholders Equity', 'Common Stock Equity']),
+    'total_debt': ('balance_sheet', ['Total Debt']),
+    'cash': ('balance_sheet', ['Cash And Cash Equivalents', 'Cash Cash Equivalents And Short Term Investments']),
+    'ppe': ('balance_sheet', ['Net PPE', 'Net Property, Plant And Equipment']),
+    'goodwill': ('balance_sheet', ['Goodwill']),
+    'intangibles': ('balance_sheet', ['Intangible Assets', 'Other Intangible Assets']),
+    'inventory': ('balance_sheet', ['Inventory']),
+    'ocf': ('cashflow', ['Operating Cash Flow', 'Total Cash From Operating Activities']),
+    'capex': ('cashflow', ['Capital Expenditure', 'Net PPE Purchase And Sale']),
+    'dividends_paid': ('cashflow', ['Cash Dividends Paid', 'Common Stock Dividend Paid']),
+}
+STATEMENTS = ('income_stmt', 'balance_sheet', 'cashflow')
+
+
+def _values(frame):
+    # Matrice float (libellés x périodes) ; None -> NaN, texte -> NaN
+    try: return np.asarray(frame.to_numpy(), dtype=float)
+    except (TypeError, ValueError): return frame.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+
+
+def _plan(fields):
+    # Alias -> champ canonique, calculé une fois par schéma : par état, (libellés candidats, [(colonne du champ, positions de ses alias)])
+    names, plan = list(fields), {}
+    for dataset in dict.fromkeys(ds for ds, _ in fields.values()):
+        labels = list(dict.fromkeys(label for ds, candidates in fields.values() if ds == dataset for label in candidates))
+        position = {label: i for i, label in enumerate(labels)}
+        plan[dataset] = (labels, [(names.index(f), [position[label] for label in candidates]) for f, (ds, candidates) in fields.items() if ds == dataset])
+    return plan
+
+
+PLAN = _plan(FIELDS)
+
+
+def _plan_for(fields): return PLAN if fields is FIELDS else _plan(fields)
+
+
+def _first(block, picks):
+    # block : alias x colonnes. Premier alias renseigné par champ et par colonne (équivalent vectoriel de la boucle "for item in items_list")
+    columns = np.arange(block.shape[1])
+    out = np.empty((block.shape[1], len(picks)))
+    for k, (_, positions) in enumerate(picks):
+        rows = block[positions]
+        out[:, k] = rows[np.argmax(~np.isnan(rows), axis=0), columns]
+    return out
+
+
+def _positions(frame, labels):
+    # Ligne de chaque libellé candidat (première occurrence), -1 si absent. Un dict plutôt que l'index pandas :
+    # les états sortent du cache désérialisés, et construire la table de hachage de leur index coûte plus que la lecture.
+    rows = {}
+    for i, label in enumerate(frame.index): rows.setdefault(label, i)
+    return [rows.get(label, -1) for label in labels]
+
+
+def _reindex(frame, labels):
+    # Une seule réindexation : lignes des libellés candidats prises en bloc (NaN si absent)
+    # Ligne NaN ajoutée en dernier : un libellé absent (position -1) y pointe
+    values = np.vstack([_values(frame), np.full((1, frame.shape[1]), np.nan)])
+    return values[_positions(frame, labels)]
+
+
+def _periods(frame):
+    periods = frame.columns if isinstance(frame.columns, pd.DatetimeIndex) else pd.to_datetime(frame.columns)
+    return periods.to_numpy(dtype='datetime64[ns]')
+
+
+def _dataset_block(frame, labels, picks):
+    # Un seul passage par état. Retourne (clôtures, matrice clôtures x champs de l'état).
+    if frame is None or frame.empty: return np.array([], dtype='datetime64[ns]'), np.empty((0, len(picks)))
+    return _periods(frame), _first(_reindex(frame, labels), picks)
+
+
+def statement_arrays(statements, fields=FIELDS):
+    # statements : {dataset: DataFrame Yahoo}. Retourne (clôtures croissantes, matrice clôtures x champs, NaN quand absent).
+    blocks = [([j for j, _ in picks], _dataset_block(statements.get(dataset), labels, picks)) for dataset, (labels, picks) in _plan_for(fields).items()]
+    periods = np.unique(np.concatenate([dates for _, (dates, _) in blocks])) if blocks else np.array([], dtype='datetime64[ns]')
+    matrix = np.full((len(periods), len(fields)), np.nan)
+    for columns, (dates, values) in blocks:
+        if len(dates): matrix[np.ix_(np.searchsorted(periods, dates), columns)] = values
+    return periods, matrix
+
+
+def _newest(frame, labels):
+    # Valeurs des libellés candidats à la clôture la plus récente (Yahoo la met en premier, sans le garantir) ; None si l'état est vide
+    if frame is None or frame.empty: return None
+    column = np.append(_values(frame)[:, int(np.argmax(_periods(frame)))], np.nan)
+    return column[_positions(frame, labels)]
+
+
+def _latest_matrix(statements, fields):
+    # statements : [{dataset: DataFrame Yahoo}]. Par état, un bloc alias x tickers, puis premier alias renseigné
+    # pour tous les tickers à la fois. Les états absents d'un ticker ne sont pas lus : leurs champs restent NaN.
+    matrix = np.full((len(statements), len(fields)), np.nan)
+    for dataset, (labels, picks) in _plan_for(fields).items():
+        columns = [(i, _newest(s.get(dataset), labels)) for i, s in enumerate(statements)]
+        columns = [(i, c) for i, c in columns if c is not None]
+        if not columns: continue
+        block = np.full((len(labels), len(statements)), np.nan)
+        block[:, [i for i, _ in columns]] = np.column_stack([c for _, c in columns])
+        matrix[:, [j for j, _ in picks]] = _first(block, picks)
+    return matrix
+
+
+def field_matrix(statements, fields=FIELDS):
+    # statements : {ticker: {dataset: DataFrame Yahoo}}. Matrice tickers x champs (dernière clôture de chaque état, NaN quand absent).
+    matrix = _latest_matrix(list(statements.values()), fields)
+    return pd.DataFrame(matrix, index=pd.Index(list(statements), name='ticker'), columns=list(fields))
+
+
+def latest_fields(statements, fields=FIELDS):
+    # Un seul ticker : {champ: valeur de la dernière clôture}, NaN quand absent (un zéro publié reste 0)
+    return dict(zip(fields, _latest_matrix([statements], fields)[0].tolist()))
+
+
+def statement_panel(statements, fields=FIELDS):
+    periods, matrix = statement_arrays(statements, fields)
+    return pd.DataFrame(matrix, index=pd.DatetimeIndex(periods, name='period_end'), columns=list(fields))
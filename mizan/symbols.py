@@ -0,0 +1,94 @@
+import bisect
+import csv
+import difflib
+import os
+import unicodedata
+from functools import lru_cache
+
+from mizan import metrics, yahoo
+
+# =========================================================
+# 🔎 ANNUAIRE LOCAL DE SYMBOLES (PRÉFIXE + APPROCHÉ)
+# =========================================================
+DEFAULT_PATH = os.environ.get("MIZAN_SYMBOLS_PATH", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "symbols.csv"))
+REMOTE_TIMEOUT = 3
+FUZZY_CUTOFF = 0.75
+
+
+def _norm(text):
+    text = unicodedata.normalize('NFKD', str(text)).encode('ascii', 'ignore').decode().lower()
+    return " ".join("".join(c if c.isalnum() or c == '.' else " " for c in text).split())
+
+
+class SymbolIndex:
+    def __init__(self, rows=()):
+        # rows : dicts {symbol, shortname, exchange, aliases}. Index immuable une fois construit (lectures sans verrou).
+        self.quotes = []
+        keys = []
+        for row in rows:
+            quote = {'symbol': row['symbol'].upper(), 'shortname': row.get('shortname') or row['symbol'], 'exchange': row.get('exchange', '')}
+            i = len(self.quotes)
+            self.quotes.append(quote)
+            keys.append((_norm(quote['symbol']), 0, i))
+            # Chaque mot du nom et des alias est aussi une clé de préfixe ("coca" et "cola" trouvent KO)
+            names = [quote['shortname']] + [a for a in str(row.get('aliases') or '').split('|') if a]
+            for name in names:
+                words = _norm(name).split()
+                for j in range(len(words)): keys.append((" ".join(words[j:]), 1 if j == 0 else 2, i))
+        keys.sort()
+        self._keys = [k for k, _, _ in keys]
+        self._entries = [(rank, i) for _, rank, i in keys]
+        self._by_key = {}
+        for k, _, i in keys:
+            self._by_key.setdefault(k, i)
+            self._by_key.setdefault(k.split()[0], i)
+        self._names = sorted(self._by_key)
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_PATH):
+        with open(path, newline='', encoding='utf-8') as f:
+            return cls(list(csv.DictReader(f)))
+
+    def __len__(self): return len(self.quotes)
+
+    def search(self, query, limit=10):
+        q = _norm(query)
+        if not q: return []
+        # Préfixe : tranche [q, q + ￿) de la liste triée des clés
+        lo = bisect.bisect_left(self._keys, q)
+        hi = bisect.bisect_left(self._keys, q + "￿", lo)
+        best = {}
+        for pos in range(lo, hi):
+            rank, i = self._entries[pos]
+            if rank == 0 and self._keys[pos] == q: rank = -1  # symbole exact en tête
+            if rank < best.get(i, 99): best[i] = rank
+        if not best:
+            # Approché (fautes de frappe), limité aux clés qui partagent la première lettre
+            start = bisect.bisect_left(self._names, q[0])
+            end = bisect.bisect_left(self._names, q[0] + "￿", start)
+            matches = difflib.get_close_matches(q, self._names[start:end], n=limit, cutoff=FUZZY_CUTOFF)
+            for n, name in enumerate(matches): best.setdefault(self._by_key[name], 3 + n / len(matches))
+        ordered = sorted(best, key=lambda i: (best[i], len(self.quotes[i]['symbol']), self.quotes[i]['symbol']))
+        return [self.quotes[i] for i in ordered[:limit]]
+
+
+def search_remote(query, timeout=REMOTE_TIMEOUT):
+    # Recherche Yahoo (repli quand l'annuaire local ne connaît pas le titre)
+    # Un échec ne fait que priver du repli : l'annuaire local reste la réponse, l'erreur est comptée
+    try:
+        return [q for q in yahoo.search(query, timeout) if 'symbol' in q]
+    except Exception as e:
+        metrics.incr("errors_total", source="fetch.search", kind=type(e).__name__)
+        return []
+
+
+@lru_cache(maxsize=None)
+def default_symbol_index():
+    return SymbolIndex.from_file()
+
+
+def search_symbol(query, remote=search_remote):
+    # Annuaire local d'abord ; `remote` (ou None) sert de repli pour les titres inconnus
+    results = default_symbol_index().search(query)
+    if results or remote is None: return results
+    return remote(query.strip().lower())
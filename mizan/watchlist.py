@@ -0,0 +1,105 @@
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+
+# =========================================================
+# ⭐ WATCHLISTS SAUVEGARDÉES (SQLITE LOCAL)
+# =========================================================
+# Une watchlist = (propriétaire, nom) -> liste ordonnée de tickers. Le
+# propriétaire est l'email Supabase de la session, ou "local" hors connexion.
+DEFAULT_PATH = os.environ.get("MIZAN_WATCHLIST_PATH", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "watchlists.sqlite"))
+LOCAL_OWNER = "local"
+
+
+class WatchlistStore:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS watchlist_items (
+            owner TEXT NOT NULL, name TEXT NOT NULL, ticker TEXT NOT NULL, position INTEGER NOT NULL,
+            added_at REAL NOT NULL, PRIMARY KEY (owner, name, ticker))""")
+        # File d'alertes du moniteur (mizan.monitor), lue par l'UI ; état des signaux pour ne notifier que les changements
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS alerts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, owner TEXT NOT NULL, ticker TEXT NOT NULL, kind TEXT NOT NULL,
+            price REAL, level REAL, created_at REAL NOT NULL, read INTEGER NOT NULL DEFAULT 0)""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS alerts_owner ON alerts (owner, read, id)")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS signal_state (
+            ticker TEXT PRIMARY KEY, signals INTEGER NOT NULL, price REAL, updated_at REAL NOT NULL)""")
+
+    def names(self, owner=LOCAL_OWNER):
+        with self._lock:
+            return [r[0] for r in self._conn.execute("SELECT DISTINCT name FROM watchlist_items WHERE owner=? ORDER BY name", (owner,))]
+
+    def tickers(self, name, owner=LOCAL_OWNER):
+        with self._lock:
+            return [r[0] for r in self._conn.execute("SELECT ticker FROM watchlist_items WHERE owner=? AND name=? ORDER BY position", (owner, name))]
+
+    def save(self, name, tickers, owner=LOCAL_OWNER):
+        # Remplace le contenu de la watchlist (ordre conservé, doublons retirés)
+        now = time.time()
+        rows = [(owner, name, t.upper(), i, now) for i, t in enumerate(dict.fromkeys(t.upper() for t in tickers))]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute("DELETE FROM watchlist_items WHERE owner=? AND name=?", (owner, name))
+            self._conn.executemany("INSERT INTO watchlist_items VALUES (?, ?, ?, ?, ?)", rows)
+            self._conn.execute("COMMIT")
+
+    def add(self, name, ticker, owner=LOCAL_OWNER):
+        with self._lock:
+            position = self._conn.execute("SELECT COALESCE(MAX(position) + 1, 0) FROM watchlist_items WHERE owner=? AND name=?", (owner, name)).fetchone()[0]
+            self._conn.execute("INSERT OR IGNORE INTO watchlist_items VALUES (?, ?, ?, ?, ?)", (owner, name, ticker.upper(), position, time.time()))
+
+    def remove(self, name, ticker, owner=LOCAL_OWNER):
+        with self._lock: self._conn.execute("DELETE FROM watchlist_items WHERE owner=? AND name=? AND ticker=?", (owner, name, ticker.upper()))
+
+    def delete(self, name, owner=LOCAL_OWNER):
+        with self._lock: self._conn.execute("DELETE FROM watchlist_items WHERE owner=? AND name=?", (owner, name))
+
+    def watched(self):
+        # Tous les tickers suivis, toutes watchlists confondues -> {ticker: [propriétaires]}
+        out = {}
+        with self._lock:
+            for ticker, owner in self._conn.execute("SELECT DISTINCT ticker, owner FROM watchlist_items ORDER BY ticker, owner"):
+                out.setdefault(ticker, []).append(owner)
+        return out
+
+    def push_alerts(self, rows):
+        # rows : [(owner, ticker, kind, price, level)]
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany("INSERT INTO alerts (owner, ticker, kind, price, level, created_at) VALUES (?, ?, ?, ?, ?, ?)", [r + (now,) for r in rows])
+            self._conn.execute("COMMIT")
+
+    def alerts(self, owner=LOCAL_OWNER, unread=True, limit=50):
+        query = "SELECT id, ticker, kind, price, level, created_at, read FROM alerts WHERE owner=?" + (" AND read=0" if unread else "") + " ORDER BY id DESC LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(query, (owner, limit)).fetchall()
+        return [dict(zip(('id', 'ticker', 'kind', 'price', 'level', 'created_at', 'read'), r)) for r in rows]
+
+    def mark_read(self, owner=LOCAL_OWNER, ids=None):
+        with self._lock:
+            if ids is None: self._conn.execute("UPDATE alerts SET read=1 WHERE owner=?", (owner,))
+            else: self._conn.executemany("UPDATE alerts SET read=1 WHERE owner=? AND id=?", [(owner, i) for i in ids])
+
+    def signal_states(self):
+        with self._lock:
+            return {r[0]: r[1] for r in self._conn.execute("SELECT ticker, signals FROM signal_state")}
+
+    def save_signal_states(self, rows):
+        # rows : [(ticker, signaux en bits, cours)]
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany("INSERT OR REPLACE INTO signal_state VALUES (?, ?, ?, ?)", [r + (now,) for r in rows])
+            self._conn.execute("COMMIT")
+
+
+@lru_cache(maxsize=None)
+def default_watchlists():
+    return WatchlistStore(":memory:" if os.environ.get("MIZAN_REPLAY") else DEFAULT_PATH)
@@ -0,0 +1,59 @@
+import os
+
+from mizan.client import default_client
+
+# =========================================================
+# 🌐 ACCÈS YAHOO FINANCE (IMPORT DIFFÉRÉ, FOURNISSEUR REMPLAÇABLE)
+# =========================================================
+# yfinance n'est importé qu'au premier appel réseau : `import mizan` reste rapide
+# pour la CLI et les workers qui ne lisent que le cache. Un fournisseur de
+# rejeu (mizan.replay) peut remplacer Yahoo pour travailler hors ligne :
+# use_provider(ReplayProvider(...)) ou variable d'environnement MIZAN_REPLAY=<dossier>.
+SEARCH_URL = "https://query2.finance.yahoo.com/v1/finance/search"
+REPLAY_ENV = "MIZAN_REPLAY"
+
+_provider = None
+
+
+def use_provider(provider):
+    global _provider
+    _provider = provider
+
+
+def provider():
+    global _provider
+    if _provider is None and os.environ.get(REPLAY_ENV):
+        from mizan.replay import ReplayProvider
+        _provider = ReplayProvider(os.environ[REPLAY_ENV])
+    return _provider
+
+
+def ticker(symbol):
+    if provider() is not None: return provider().ticker(symbol)
+    import yfinance as yf
+    return yf.Ticker(symbol)
+
+
+def history(symbol, **kwargs):
+    return ticker(symbol).history(**kwargs)
+
+
+def download(symbols, **kwargs):
+    # Historique de plusieurs tickers en un appel -> {ticker: DataFrame}, même format que history() (ajusté, dividendes, fuseau de la place)
+    symbols = [s.upper() for s in symbols]
+    if provider() is not None:
+        if hasattr(provider(), 'download'): return provider().download(symbols, **kwargs)
+        return {s: history(s, **kwargs) for s in symbols}
+    import yfinance as yf
+    frame = yf.download(symbols, group_by='ticker', auto_adjust=True, actions=True, ignore_tz=False, progress=False, **kwargs)
+    if frame is None or frame.empty: return {}
+    if frame.columns.nlevels == 1: return {symbols[0]: frame}
+    return {s: frame[s].dropna(how='all') for s in frame.columns.get_level_values(0).unique()}
+
+
+def search(query, timeout):
+    if provider() is not None: return provider().search(query)
+    # Client partagé : connexion réutilisée, débit borné par hôte, Unavailable si Yahoo ne répond pas
+    r = default_client().get(SEARCH_URL, params={'q': query}, timeout=timeout)
+    r.raise_for_status()
+    return r.json().get('quotes', [])
@@ -0,0 +1,85 @@
+import streamlit as st
+import pandas as pd
+from mizan import metrics
+from mizan.agent import STRATEGIES
+from mizan.screener import DEFAULT_WORKERS, iter_screen, list_universes, load_universe, parse_tickers
+from mizan.watchlist import LOCAL_OWNER, default_watchlists
+from theme import apply_theme
+
+# =========================================================
+# 🎨 CONFIGURATION & DESIGN SYSTEM (PARTAGÉ AVEC APP.PY : theme.py)
+# =========================================================
+st.set_page_config(page_title="Screener | Mizan Investments", page_icon="⚖️", layout="wide")
+
+apply_theme("screener")
+
+# =========================================================
+# 💾 STATE
+# =========================================================
+if 'screen_results' not in st.session_state: st.session_state.screen_results = None
+user = st.session_state.get('user')
+owner = user.email if user is not None else LOCAL_OWNER
+watchlists = default_watchlists()
+
+# =========================================================
+# 📝 CONTENU
+# =========================================================
+st.markdown("# 🧮 Screener d'univers")
+st.markdown("Appliquez une stratégie et le filtre Shariah à toute une liste de valeurs. Les résultats s'affichent au fil de l'eau.")
+st.markdown("---")
+
+c1, c2, c3 = st.columns([2, 1, 1])
+with c1:
+    source = st.radio("Univers", ["Indice", "Fichier CSV", "Watchlist", "Saisie libre"], horizontal=True)
+    tickers = []
+    if source == "Indice":
+        universe = st.selectbox("Liste", list_universes(), format_func=lambda n: "Annuaire complet" if n == "directory" else n.upper())
+        tickers = load_universe(universe)
+    elif source == "Fichier CSV":
+        upload = st.file_uploader("Un ticker par ligne (première colonne)", type=["csv", "txt"])
+        if upload is not None: tickers = parse_tickers(upload.getvalue().decode('utf-8', 'ignore').splitlines())
+    elif source == "Watchlist":
+        names = watchlists.names(owner)
+        if names: tickers = watchlists.tickers(st.selectbox("Watchlist", names), owner)
+        else: st.caption("Aucune watchlist enregistrée.")
+    else:
+        tickers = parse_tickers(st.text_area("Tickers", placeholder="AAPL\nMSFT\nKO").splitlines())
+with c2:
+    strategy = st.selectbox("Stratégie", list(STRATEGIES), format_func=lambda k: STRATEGIES[k].name("fr"))
+    workers = st.slider("Requêtes en parallèle", 1, 32, DEFAULT_WORKERS)
+with c3:
+    st.metric("Tickers", len(tickers))
+    halal_only = st.checkbox("Seulement HALAL")
+
+with st.expander("💾 Enregistrer cet univers comme watchlist"):
+    wl_name = st.text_input("Nom de la watchlist")
+    if st.button("Enregistrer", disabled=not (wl_name and tickers)):
+        watchlists.save(wl_name, tickers, owner)
+        st.success(f"Watchlist « {wl_name} » enregistrée ({len(tickers)} tickers).")
+
+def show(table, frame):
+    if halal_only: frame = frame[frame['shariah_status'] == "HALAL"]
+    table.dataframe(frame.sort_values(['strategy_pass', 'score'], ascending=False), hide_index=True, use_container_width=True)
+
+if st.button("Lancer le screening", type="primary", disabled=not tickers):
+    progress = st.progress(0.0, text="Collecte des données...")
+    table = st.empty()
+    frames = []
+    done = 0
+    # Chaque lot noté (en colonnes) est ajouté au tableau dès qu'il arrive
+    with metrics.span("page.screen"):
+        for batch in iter_screen(tickers, strategy, workers=workers):
+            frames.append(batch)
+            done += len(batch)
+            results = pd.concat(frames, ignore_index=True)
+            progress.progress(done / len(tickers), text=f"{done}/{len(tickers)} tickers")
+            show(table, results)
+    progress.empty()
+    st.session_state.screen_results = results if frames else None
+elif st.session_state.screen_results is not None:
+    show(st.empty(), st.session_state.screen_results)
+
+if st.session_state.screen_results is not None:
+    results = st.session_state.screen_results
+    st.caption(f"{int(results['strategy_pass'].sum())} valeurs passent la stratégie, {int((results['shariah_status'] == 'HALAL').sum())} sont HALAL.")
+    st.download_button("Télécharger (CSV)", results.to_csv(index=False), file_name=f"mizan-screen-{results['strategy'].iloc[0].lower()}.csv", mime="text/csv")
@@ -0,0 +1,7 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Rejeu des fixtures : aucun appel Yahoo, caches SQLite en mémoire (à fixer avant le premier import de mizan)
+os.environ["MIZAN_REPLAY"] = os.path.join(ROOT, "fixtures")
+sys.path.insert(0, ROOT)
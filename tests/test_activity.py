@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+
+from mizan.activity import find_keywords, find_sectors, has_keyword, screen_activities, screen_activity
+
+TEXTS = [
+    "Operates casinos and hotels.",
+    "Leading casino, resort and betting operator.",
+    "Sells craft BEER; also wine.",
+    "Provides interest-free financing.",
+    "Makes winery equipment and pineapple juice.",
+    "Holds an interest in Adult Education Inc.",
+    "Café chain serving pâtisseries.",
+    "Tobacco_free products",
+    "",
+    None,
+]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Leading casino, resort and betting operator.", [("casino", 8), ("betting", 27)]),
+    ("Sells craft BEER; also wine.", [("beer", 12), ("wine", 23)]),
+    # Mot entier seulement : ni "casinos", ni "winery", ni "pineapple"
+    ("Operates casinos and hotels.", []),
+    ("Makes winery equipment and pineapple juice.", []),
+    (None, []),
+])
+def test_find_keywords_whole_words_with_offsets(text, expected):
+    assert find_keywords(text) == expected
+
+
+def test_find_sectors_substring_and_canonical_case():
+    assert find_sectors("Banks - Regional", "Financial Services") == ["Banks"]
+    assert find_sectors("beverages - brewers", None) == ["Beverages - Brewers"]
+    assert find_sectors("Software", "Technology") == []
+
+
+def test_sector_takes_precedence_over_keywords():
+    assert screen_activity("Gambling", "Consumer Cyclical", "casino and betting") == (False, "Sector: Gambling")
+    assert screen_activity("Software", "Technology", "Online betting, betting and casino") == (False, "Keyword: betting, Keyword: casino")
+    assert screen_activity("Software", "Technology", "Cloud software") == (True, "OK")
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_prefilter_never_hides_a_match(text):
+    # Le préfiltre peut laisser passer un texte sans mot-clé, jamais l'inverse
+    if find_keywords(text): assert has_keyword(text)
+
+
+def test_batch_matches_scalar():
+    frame = pd.DataFrame({'industry': ["Software", "Banks - Diversified", None] + ["Software"] * (len(TEXTS) - 3),
+                          'sector': ["Technology"] * len(TEXTS), 'description': TEXTS}, index=[f"T{i}" for i in range(len(TEXTS))])
+    out = screen_activities(frame)
+    assert list(out.index) == list(frame.index)
+    for ticker, row in frame.iterrows():
+        assert tuple(out.loc[ticker, ['activity_ok', 'activity_msg']]) == screen_activity(row['industry'], row['sector'], row['description'])
+    assert out['keyword_hits'].tolist()[:3] == [0, 2, 2]
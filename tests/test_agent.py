@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+from mizan import yahoo
+from mizan.agent import STRATEGIES, MizanAgent, datasets_for, run_analysis
+from mizan.boycott import BoycottList
+from mizan.cache import DiskCache
+from mizan.prices import PriceStore
+from mizan.replay import FIXTURES_DIR, ReplayProvider
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    # Fournisseur de rejeu propre au test : ses appels sont comptés
+    provider = ReplayProvider(FIXTURES_DIR)
+    monkeypatch.setattr(yahoo, "_provider", provider)
+    return provider
+
+
+def agent_for(ticker, cache, provider):
+    return MizanAgent(ticker, cache=cache, prices=PriceStore(cache, provider.history), boycott=BoycottList(os.path.join(FIXTURES_DIR, "boycott.json")))
+
+
+def passes(agent, strategy):
+    return [c['k'] for c in agent.evaluate_strategy(strategy) if c['pass']]
+
+
+@pytest.mark.parametrize("ticker, status, details", [
+    ('ACME', 'HALAL', []),
+    ('GLBX', 'HARAM', ['Activity', 'Interest > 5%', 'Real Assets < 20%', 'Cash > Cap']),
+    ('INIT', 'HARAM', ['Boycott Listed', 'Debt > 33%']),
+])
+def test_shariah_verdicts(provider, ticker, status, details):
+    agent = agent_for(ticker, DiskCache(":memory:"), provider)
+    analysis = run_analysis(ticker, agent=agent)
+    assert analysis['errors'] == {}
+    assert analysis['shariah']['status'] == status and analysis['shariah']['details'] == details
+    assert analysis['shariah']['is_boycotted'] is (ticker == 'INIT')
+    assert len(analysis['history']) > 200 and 'MA50' in analysis['history']
+
+
+@pytest.mark.parametrize("ticker, strategy, expected", [
+    ('ACME', 'Mizan', ['fcf_yield', 'margin', 'solvency']),
+    ('ACME', 'Graham', ['current_ratio', 'debt_equity', 'interest_cov', 'roe']),
+    ('ACME', 'Lynch', ['growth', 'debt_equity']),
+    ('GLBX', 'Mizan', ['fcf_yield', 'per', 'margin']),
+    ('INIT', 'Graham', ['interest_cov', 'roe']),
+])
+def test_strategy_checks(provider, ticker, strategy, expected):
+    assert passes(agent_for(ticker, DiskCache(":memory:"), provider), strategy) == expected
+
+
+def test_unknown_ticker_has_no_data(provider):
+    agent = agent_for('NOPE', DiskCache(":memory:"), provider)
+    assert not agent.has_data()
+    assert agent.collect_data(['current_price'])['current_price'] == 0
+
+
+def test_second_agent_is_served_by_the_disk_cache(provider):
+    cache = DiskCache(":memory:")
+    run_analysis('ACME', agent=agent_for('ACME', cache, provider))
+    calls = provider.calls
+    again = run_analysis('ACME', agent=agent_for('ACME', cache, provider))
+    assert again['shariah']['status'] == 'HALAL'
+    assert provider.calls == calls
+
+
+def test_only_requested_datasets_are_loaded(provider):
+    agent = agent_for('ACME', DiskCache(":memory:"), provider)
+    agent.prefetch(datasets_for(['name', 'current_price']))
+    assert set(agent._futures) | set(agent._datasets) == {'info'}
+    assert agent.collect_data(['name'])['name']
+
+
+def test_every_strategy_has_its_datasets():
+    for strategy in STRATEGIES.values(): assert datasets_for(strategy.metrics)
+
+
+def test_replay_aliases_unknown_tickers():
+    provider = ReplayProvider(FIXTURES_DIR, alias_unknown=True)
+    source = provider.source_for('T00042')
+    assert source in provider.tickers and provider.source_for('t00042') == source
+    assert provider.ticker('T00042').info['symbol'] == 'T00042'
+    assert ReplayProvider(FIXTURES_DIR).ticker('T00042').info == {}
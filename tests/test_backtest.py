@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from mizan import backtest
+from mizan.backtest import load_ticker, performance, prepare_universe, prices_at, run_backtest
+from mizan.rules import Strategy
+
+TICKERS = ('ACME', 'GLBX', 'INIT')
+# Stratégie de test à une règle : ACME et GLBX passent, INIT non (marge 14 %)
+MARGIN = Strategy({'key': 'Margin', 'rules': [{'key': 'margin', 'metric': 'ops_margin', 'op': '>', 'threshold': 15}]})
+
+
+@pytest.fixture(scope="module")
+def universe():
+    return prepare_universe({t: load_ticker(t) for t in TICKERS})
+
+
+@pytest.fixture
+def margin(monkeypatch):
+    monkeypatch.setitem(backtest.STRATEGIES, 'Margin', MARGIN)
+    return 'Margin'
+
+
+@pytest.mark.parametrize("lag", [0, 90, 400])
+def test_only_published_filings_are_used(universe, margin, lag):
+    panel = run_backtest(None, margin, freq='M', lag_days=lag, universe=universe)['panel']
+    published = panel['period_end'] + pd.Timedelta(days=lag)
+    assert len(panel) and (panel['date'] >= published).all()
+    # Et c'est bien la dernière clôture publiée à cette date
+    fund = universe['fundamentals']
+    for date, ticker, period_end in panel[['date', 'ticker', 'period_end']].itertuples(index=False):
+        known = fund.loc[(fund['ticker'] == ticker) & (fund['period_end'] + pd.Timedelta(days=lag) <= date), 'period_end']
+        assert period_end == known.max()
+
+
+def test_no_rebalance_before_first_publication(universe, margin):
+    result = run_backtest(None, margin, freq='Q', lag_days=90, universe=universe)
+    first = universe['fundamentals']['period_end'].min() + pd.Timedelta(days=90)
+    assert result['periods'].index[0] >= first and result['periods']['holdings'].iloc[0] > 0
+
+
+def test_shariah_filter_and_equal_weights(universe, margin):
+    halal = run_backtest(None, margin, freq='Q', universe=universe)
+    assert set(halal['selections']['ticker']) == {'ACME'}
+    assert set(run_backtest(None, margin, freq='Q', shariah=False, universe=universe)['selections']['ticker']) == {'ACME', 'GLBX'}
+    # ACME seul en portefeuille : rendement de la période = rendement d'ACME ; référence = moyenne de l'univers
+    periods = halal['periods']
+    closes = prices_at(universe['prices'], periods.index.append(pd.DatetimeIndex([halal['panel']['date'].max()])))
+    forward = (closes.shift(-1) / closes - 1).iloc[:-1]
+    np.testing.assert_allclose(periods['portfolio'], forward['ACME'])
+    np.testing.assert_allclose(periods['benchmark'], forward.mean(axis=1))
+    assert (periods['holdings'] == 1).all()
+
+
+def test_prepared_universe_matches_raw_data(universe, margin):
+    data = {t: load_ticker(t) for t in TICKERS}
+    a = run_backtest(None, margin, data=data)['periods']
+    b = run_backtest(None, margin, universe=universe)['periods']
+    pd.testing.assert_frame_equal(a, b)
+
+
+def test_real_strategies_run_on_fixtures(universe):
+    for strategy in backtest.STRATEGIES:
+        result = run_backtest(None, strategy, freq='A', universe=universe)
+        assert result['stats']['benchmark']['total_return'] == pytest.approx(result['periods']['benchmark_equity'].iloc[-1] - 1)
+
+
+def test_performance_stats():
+    periods = pd.DataFrame({'portfolio': [0.1, -0.5, 0.2], 'benchmark': [0.0, 0.0, 0.0], 'holdings': [1, 2, 3]})
+    stats = performance(periods, 1)
+    assert stats['portfolio']['total_return'] == pytest.approx(1.1 * 0.5 * 1.2 - 1)
+    assert stats['portfolio']['max_drawdown'] == pytest.approx(-0.5)
+    assert stats['portfolio']['hit_rate'] == pytest.approx(2 / 3)
+    assert stats['portfolio']['cagr'] == pytest.approx((1.1 * 0.5 * 1.2) ** (1 / 3) - 1)
+    assert stats['benchmark']['volatility'] == 0 and stats['avg_holdings'] == 2
+    assert performance(periods.iloc[:0], 1) == {}
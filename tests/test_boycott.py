@@ -0,0 +1,79 @@
+import json
+import os
+
+import pytest
+
+from mizan import boycott
+from mizan.boycott import BoycottIndex, BoycottList, import_snapshot, lookup_live, normalize
+from mizan.client import Unavailable
+
+COMPANIES = [{"name": "Initech Foods Company", "aliases": ["Initech"]},
+             {"name": "Globex Corporation", "aliases": ["Globex Intl"]},
+             "Société Générale S.A."]
+
+
+@pytest.fixture
+def index(): return BoycottIndex(COMPANIES)
+
+
+@pytest.mark.parametrize("raw, key", [("Apple Inc.", "apple"), ("The Coca-Cola Co", "coca cola"),
+                                      ("Procter & Gamble", "procter and gamble"), ("Nestlé S.A. - ADR", "nestle")])
+def test_normalize(raw, key):
+    assert normalize(raw) == key
+
+
+@pytest.mark.parametrize("name, kind", [("Initech Foods Co.", "exact"), ("INITECH", "alias"),
+                                        ("Globex Intl Ltd", "alias"), ("Societe Generale", "exact")])
+def test_exact_and_alias_matches(index, name, kind):
+    listed, matched, score = index.match(name)
+    assert matched == kind and score == 1.0
+    assert listed in ("Initech Foods Company", "Globex Corporation", "Société Générale S.A.")
+
+
+def test_fuzzy_match_stays_within_first_word(index):
+    listed, kind, score = index.match("Initech Food Company")
+    assert (listed, kind) == ("Initech Foods Company", "fuzzy") and boycott.FUZZY_CUTOFF <= score < 1
+    # Orthographe aussi proche, mais premier mot différent : pas de rapprochement
+    assert index.match("Initeck Foods") is None
+    assert not index.is_listed("Acme Widgets Inc.")
+    assert index.match("Inc.") is None
+
+
+def test_snapshot_import_and_reload(tmp_path):
+    src = tmp_path / "export.csv"
+    src.write_text("name,aliases\nInitech Foods Company,Initech|INTC Foods\n", encoding="utf-8")
+    dest = str(tmp_path / "boycott.json")
+    assert import_snapshot(str(src), dest) == 1
+    listing = BoycottList(dest)
+    assert listing.loaded and listing.match("INTC Foods")[1] == "alias"
+    assert listing.age is not None and listing.age < 60
+    # Remplacement de l'instantané : rechargé seulement quand le fichier change
+    assert not listing.reload()
+    with open(dest, "w", encoding="utf-8") as f: json.dump({"companies": [{"name": "Globex Corporation"}]}, f)
+    os.utime(dest, (0, 1))
+    assert listing.reload()
+    assert listing.is_listed("Globex Corp") and not listing.is_listed("Initech")
+    assert listing.age is None
+
+
+def test_missing_snapshot_is_not_loaded(tmp_path):
+    assert not BoycottList(str(tmp_path / "absent.json")).loaded
+
+
+class Client:
+    def __init__(self, outcome): self.outcome = outcome
+    def get(self, url, timeout=None):
+        if isinstance(self.outcome, Exception): raise self.outcome
+        return self.outcome
+
+
+class Response:
+    def __init__(self, status_code, body=None): self.status_code, self.body = status_code, body
+    def json(self): return self.body
+
+
+def test_live_lookup_never_reports_a_false_negative():
+    assert lookup_live("Initech Inc.", Client(Response(200, [{"name": "Initech"}]))) is True
+    assert lookup_live("Acme", Client(Response(404))) is False
+    assert lookup_live("Acme", Client(Response(500))) is None
+    assert lookup_live("Acme", Client(Unavailable("down"))) is None
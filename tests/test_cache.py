@@ -0,0 +1,73 @@
+import pickle
+
+from mizan import cache as cache_module
+from mizan.cache import DiskCache
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0): self.now = now
+    def __call__(self): return self.now
+
+
+def test_ttl_per_dataset(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "time", clock)
+    cache = DiskCache(":memory:", ttl={'info': 100, 'history': 10})
+    cache.set('acme', 'info', {'sector': 'Tech'})
+    cache.set('ACME', 'history:3mo', [1, 2, 3])
+    clock.now += 50
+    # 'history:3mo' hérite du TTL de 'history' ; les tickers sont insensibles à la casse
+    assert cache.get('ACME', 'info') == {'sector': 'Tech'}
+    assert cache.get('acme', 'history:3mo') is None
+    # Périmé mais toujours lisible pour une mise à jour incrémentale
+    value, stored_at = cache.peek('ACME', 'history:3mo')
+    assert value == [1, 2, 3] and not cache.is_fresh('history:3mo', stored_at)
+    clock.now += 51
+    assert cache.get('ACME', 'info', 'missing') == 'missing'
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 2
+
+
+def test_get_or_fetch_caches_falsy_values():
+    cache = DiskCache(":memory:")
+    calls = []
+    fetch = lambda: calls.append(1) or None
+    assert cache.get_or_fetch('ACME', 'info', fetch) is None
+    assert cache.get_or_fetch('ACME', 'info', fetch) is None
+    assert calls == [1]
+
+
+def test_lru_eviction(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "time", clock)
+    blob = b'x' * 1000
+    size = len(pickle.dumps(blob, protocol=pickle.HIGHEST_PROTOCOL))
+    cache = DiskCache(":memory:", max_bytes=3 * size)
+    for ticker in ('A', 'B', 'C'):
+        clock.now += 1
+        cache.set(ticker, 'info', blob)
+    # Relire A le rend plus récent que B : c'est B qui part quand D arrive
+    clock.now += 1
+    assert cache.get('A', 'info') == blob
+    clock.now += 1
+    cache.set('D', 'info', blob)
+    assert cache.peek('B', 'info') == (None, None)
+    assert all(cache.peek(t, 'info')[0] == blob for t in ('A', 'C', 'D'))
+    stats = cache.stats()
+    assert stats['evictions'] == 1 and stats['entries'] == 3 and stats['bytes'] <= stats['max_bytes']
+
+
+def test_replacing_an_entry_keeps_size_accounting():
+    cache = DiskCache(":memory:", max_bytes=10_000)
+    cache.set('A', 'info', b'x' * 4000)
+    cache.set('A', 'info', b'x' * 4000)
+    cache.set('B', 'info', b'x' * 4000)
+    # Sans décompter l'ancienne taille, la réécriture de A aurait déclenché une éviction
+    assert cache.stats()['evictions'] == 0 and cache.stats()['bytes'] == cache._bytes
+    cache.invalidate('A')
+    assert cache.stats()['entries'] == 1 and cache._bytes == cache.stats()['bytes']
+
+
+def test_persists_across_instances(tmp_path):
+    path = str(tmp_path / "cache" / "mizan.sqlite")
+    DiskCache(path).set('ACME', 'income_stmt', {'Total Revenue': 10})
+    assert DiskCache(path).get('ACME', 'income_stmt') == {'Total Revenue': 10}
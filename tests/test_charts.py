@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from mizan import charts
+from mizan.cache import DiskCache
+from mizan.charts import chart_series, downsample, lttb
+from mizan.prices import DATASET, PriceStore
+from mizan.replay import ReplayProvider
+
+
+def reference_lttb(x, y, n):
+    # LTTB tel que publié (Steinarsson), seau par seau, sans précalcul
+    size = len(y)
+    edges = np.linspace(1, size - 1, n - 1).astype(np.int64)
+    out, a = [0], 0
+    for i in range(n - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt = slice(edges[i + 1], edges[i + 2]) if i + 2 < n - 1 else slice(size - 1, size)
+        mx, my = x[nxt].mean(), y[nxt].mean()
+        area = np.abs((x[a] - mx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (my - y[a]))
+        a = lo + int(np.argmax(area))
+        out.append(a)
+    return np.array(out + [size - 1])
+
+
+@pytest.mark.parametrize("size, n", [(50, 20), (5000, 1000), (100000, 500)])
+def test_lttb_matches_reference(size, n):
+    # Les deux chemins (table de transitions pour les seaux étroits, boucle sinon) donnent le LTTB publié
+    rng = np.random.default_rng(size)
+    x = np.arange(size, dtype=float)
+    y = np.cumsum(rng.normal(size=size))
+    np.testing.assert_array_equal(lttb(x, y, n), reference_lttb(x, y, n))
+
+
+def test_lttb_keeps_ends_and_spikes():
+    x = np.arange(10000, dtype=float)
+    y = np.sin(x / 500)
+    y[4321] = 50
+    kept = lttb(x, y, 200)
+    assert len(kept) == 200 and kept[0] == 0 and kept[-1] == 9999
+    assert 4321 in kept
+    assert np.all(np.diff(kept) > 0)
+
+
+def test_lttb_short_series_untouched():
+    np.testing.assert_array_equal(lttb(np.arange(5.0), np.arange(5.0), 10), np.arange(5))
+
+
+def test_downsample_caps_points_and_drops_missing():
+    hist = ReplayProvider().ticker('ACME').history(period='max')
+    frame = hist[['Close']].copy()
+    frame.iloc[3, 0] = np.nan
+    out = downsample(frame, 'Close', 100)
+    assert len(out) == min(100, len(frame) - 1)
+    assert out['Close'].notna().all() and out.index.is_monotonic_increasing
+
+
+def test_long_ranges_leave_price_store_window_alone():
+    # Un graphique 'max' ne doit pas élargir la fenêtre stockée (partagée par analyses, scans et surveillance)
+    provider = ReplayProvider()
+    cache = DiskCache(":memory:")
+    store = PriceStore(cache, provider.history)
+    store.get('ACME')
+    for chart_range in ('5y', 'max'):
+        series = chart_series('ACME', chart_range, points=200, prices=store, cache=cache)
+        assert series is not None and len(series) <= 200
+    assert cache.peek('ACME', DATASET)[0]['window'] == store.window
+    # Série longue servie par son propre cache au second appel
+    assert cache.peek('ACME', f"{charts.LONG_DATASET}:max:1d")[0] is not None
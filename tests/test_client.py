@@ -0,0 +1,103 @@
+import time
+
+import pytest
+import requests
+
+from mizan.client import CircuitBreaker, HttpClient, TokenBucket, Unavailable
+from mizan.metrics import Registry
+
+URL = "https://api.example.test/v1/search"
+
+
+class Response:
+    def __init__(self, status_code): self.status_code = status_code
+
+
+class Session:
+    # Session factice : rejoue une suite de réponses (code HTTP) ou d'exceptions
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def get(self, url, timeout=None, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0) if len(self.outcomes) > 1 else self.outcomes[0]
+        if isinstance(outcome, Exception): raise outcome
+        return Response(outcome)
+
+
+def client(*outcomes, retries=2):
+    c = HttpClient(retries=retries, backoff=0)
+    c.session = Session(*outcomes)
+    return c
+
+
+def test_retries_transient_status_then_returns():
+    c = client(503, 502, 200)
+    assert c.get(URL).status_code == 200
+    assert c.session.calls == 3
+
+
+def test_non_transient_status_is_returned_without_retry():
+    c = client(404)
+    assert c.get(URL).status_code == 404
+    assert c.session.calls == 1
+
+
+@pytest.mark.parametrize("error", [requests.ConnectionError(), requests.Timeout(), requests.TooManyRedirects(),
+                                   requests.exceptions.ChunkedEncodingError(), requests.exceptions.InvalidURL()])
+def test_any_requests_error_raises_unavailable(error):
+    c = client(error, retries=0)
+    with pytest.raises(Unavailable): c.get(URL)
+    assert c._host("api.example.test")[1].failures == 1
+
+
+def test_breaker_opens_then_short_circuits():
+    c = client(requests.ConnectionError(), retries=0)
+    breaker = c._host("api.example.test")[1]
+    for _ in range(breaker.threshold):
+        with pytest.raises(Unavailable): c.get(URL)
+    assert breaker.state == "open"
+    with pytest.raises(Unavailable, match="circuit open"): c.get(URL)
+    assert c.session.calls == breaker.threshold
+
+
+def test_failed_probe_does_not_lock_the_host():
+    # Appel d'essai semi-ouvert en échec sur une erreur hors ConnectionError/Timeout : un nouvel essai reste possible
+    c = client(requests.exceptions.ChunkedEncodingError(), retries=0)
+    breaker = c._host("api.example.test")[1]
+    breaker.cooldown = 0.01
+    for _ in range(breaker.threshold):
+        with pytest.raises(Unavailable): c.get(URL)
+    time.sleep(0.02)
+    with pytest.raises(Unavailable): c.get(URL)
+    assert not breaker._probing
+    time.sleep(0.02)
+    c.session.outcomes = [200]
+    assert c.get(URL).status_code == 200
+    assert breaker.state == "closed"
+
+
+def test_half_open_lets_one_probe_through():
+    breaker = CircuitBreaker(threshold=1, cooldown=0.0)
+    assert breaker.record(False)
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record(True)
+    assert breaker.allow() and breaker.state == "closed"
+
+
+def test_token_bucket_gives_up_past_timeout():
+    bucket = TokenBucket(rate=1.0, burst=1)
+    assert bucket.acquire(0)
+    assert not bucket.acquire(0.01)
+
+
+def test_stats_are_exported_with_a_host_label():
+    c = client(200)
+    c.get(URL)
+    registry = Registry(log_path=None)
+    registry.gauge("http", c.stats, label="host")
+    text = registry.to_prometheus()
+    assert 'mizan_http_circuit_open{host="api.example.test"} 0' in text
+    assert "api.example.test." not in text
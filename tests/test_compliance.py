@@ -0,0 +1,88 @@
+import os
+
+import pandas as pd
+import pytest
+
+from mizan import metrics, yahoo
+from mizan.agent import MizanAgent, run_analysis
+from mizan.boycott import BoycottList
+from mizan.cache import DiskCache
+from mizan.compliance import assemble, filing_rows, purification, shariah_timeline
+from mizan.prices import PriceStore
+from mizan.replay import FIXTURES_DIR
+from mizan.statements import STATEMENTS, statement_panel
+
+
+def agent_for(ticker, cache):
+    return MizanAgent(ticker, cache=cache, prices=PriceStore(cache, yahoo.history), boycott=BoycottList(os.path.join(FIXTURES_DIR, "boycott.json")))
+
+
+def computed(freq): return metrics.default_registry().count("shariah_filings_computed_total", freq=freq)
+
+
+@pytest.mark.parametrize("ticker", ['ACME', 'GLBX', 'INIT'])
+def test_latest_annual_filing_matches_analysis(ticker):
+    timeline = shariah_timeline(ticker, agent=agent_for(ticker, DiskCache(":memory:")))
+    assert timeline['period_end'].is_monotonic_increasing and set(timeline['freq']) == {'A', 'Q'}
+    latest = timeline[timeline['freq'] == 'A'].iloc[-1]
+    shariah = run_analysis(ticker, agent=agent_for(ticker, DiskCache(":memory:")))['shariah']
+    for ratio in ('haram_ratio', 'debt_ratio', 'illiquid_ratio'): assert latest[ratio] == pytest.approx(shariah[ratio])
+    assert latest['status'] == shariah['status'] and latest['details'] == ", ".join(shariah['details'])
+
+
+def test_filings_are_cached_and_revisions_recomputed():
+    cache = DiskCache(":memory:")
+    first = shariah_timeline('ACME', agent=agent_for('ACME', cache))
+    annual, quarterly = computed('A'), computed('Q')
+    # Deuxième affichage : tout vient du cache
+    pd.testing.assert_frame_equal(shariah_timeline('ACME', agent=agent_for('ACME', cache)), first)
+    assert (computed('A'), computed('Q')) == (annual, quarterly)
+    # Bilan annuel révisé sur une seule clôture : seule celle-ci est recalculée
+    sheet = cache.get('ACME', 'balance_sheet').copy()
+    sheet.loc['Total Debt', sheet.columns[0]] *= 2
+    cache.set('ACME', 'balance_sheet', sheet)
+    revised = shariah_timeline('ACME', agent=agent_for('ACME', cache))
+    assert (computed('A'), computed('Q')) == (annual + 1, quarterly)
+    changed = revised['debt_ratio'] != first['debt_ratio']
+    assert revised.loc[changed, 'period_end'].tolist() == [sheet.columns[0]]
+    # Une clôture que Yahoo ne renvoie plus reste dans l'historique
+    cache.set('ACME', 'balance_sheet', sheet.iloc[:, :2])
+    cache.set('ACME', 'income_stmt', cache.get('ACME', 'income_stmt').iloc[:, :2])
+    cache.set('ACME', 'cashflow', cache.get('ACME', 'cashflow').iloc[:, :2])
+    assert len(shariah_timeline('ACME', agent=agent_for('ACME', cache))) == len(first)
+
+
+def test_dividends_from_price_history_take_precedence():
+    stock = yahoo.ticker('ACME')
+    panel = statement_panel({ds: getattr(stock, ds) for ds in STATEMENTS})
+    history = stock.history(period='max').copy()
+    fallback = filing_rows(panel, 'A', history)
+    # Quatre versements de 0.5 pendant l'exercice 2025 (aucun dans les fixtures)
+    paid = history.index[history.index.searchsorted(pd.to_datetime(['2025-02-03', '2025-05-01', '2025-08-01', '2025-11-03']).tz_localize(history.index.tz))]
+    history.loc[paid, 'Dividends'] = 0.5
+    rows = filing_rows(panel, 'A', history)
+    year = pd.Timestamp('2025-12-31')
+    assert rows.loc[year, 'dividend_per_share'] == pytest.approx(2.0)
+    assert rows.loc[year, 'purification_per_share'] == pytest.approx(2.0 * rows.loc[year, 'haram_ratio'] / 100)
+    # Autres exercices : dividendes du tableau de flux / actions de la clôture
+    earlier = rows.index != year
+    pd.testing.assert_series_equal(rows.loc[earlier, 'dividend_per_share'], fallback.loc[earlier, 'dividend_per_share'])
+    assert (fallback['dividend_per_share'] > 0).all()
+
+
+def test_purification_uses_one_frequency():
+    timeline = shariah_timeline('ACME', agent=agent_for('ACME', DiskCache(":memory:")))
+    annual = purification(timeline, 100)
+    assert len(annual) == (timeline['freq'] == 'A').sum()
+    assert annual['purification'].tolist() == pytest.approx((annual['dividends'] * annual['haram_ratio'] / 100).tolist())
+    assert len(purification(timeline, 100, 'Q')) == (timeline['freq'] == 'Q').sum()
+
+
+def test_profile_applied_to_every_filing():
+    filings = {'A:2024-12-31': {'haram_ratio': 1.0, 'filing_failures': ""}, 'A:2025-12-31': {'haram_ratio': 9.0, 'filing_failures': "Interest > 5%"}}
+    clean = assemble(filings, (True, "OK"), None)
+    assert clean['status'].tolist() == ["UNKNOWN", "HARAM"]
+    assert clean['details'].tolist() == ["Boycott Unknown", "Interest > 5%, Boycott Unknown"]
+    listed = assemble(filings, (False, "Sector: Banks"), True)
+    assert listed['details'].tolist() == ["Activity, Boycott Listed", "Activity, Boycott Listed, Interest > 5%"]
+    assert assemble({}, (True, "OK"), False).empty
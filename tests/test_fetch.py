@@ -0,0 +1,107 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from mizan import agent as agent_module, metrics
+from mizan.agent import MizanAgent
+from mizan.cache import DiskCache
+from mizan.fetch import SingleFlight, fetch_all
+
+
+def shared(name): return metrics.default_registry().count("singleflight_shared_total", flight=name)
+
+
+def test_concurrent_callers_share_one_call():
+    flight, calls, release = SingleFlight("test_share"), [], threading.Event()
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        return "value"
+    before = shared("test_share")
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(flight.do, "ACME", slow) for _ in range(8)]
+        # Tous les suiveurs attendent l'appel du premier avant de le libérer
+        while shared("test_share") - before < 7: time.sleep(0.001)
+        release.set()
+    assert [f.result() for f in futures] == ["value"] * 8
+    assert calls == [1] and flight.in_flight() == 0
+
+
+def test_exception_shared_then_key_released():
+    flight, release = SingleFlight("test_error"), threading.Event()
+    def fail():
+        release.wait(5)
+        raise ConnectionError("down")
+    before = shared("test_error")
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        futures = [pool.submit(flight.do, "ACME", fail) for _ in range(2)]
+        while shared("test_error") == before: time.sleep(0.001)
+        release.set()
+    for future in futures:
+        with pytest.raises(ConnectionError): future.result()
+    # La clé est libérée : l'appel suivant est exécuté à nouveau
+    assert flight.do("ACME", lambda: 1) == 1 and flight.in_flight() == 0
+
+
+def test_distinct_keys_do_not_wait_on_each_other():
+    flight, release = SingleFlight("test_keys"), threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        blocked = pool.submit(flight.do, "ACME", lambda: release.wait(5))
+        while flight.in_flight() == 0: time.sleep(0.001)
+        assert flight.do("GLBX", lambda: "glbx") == "glbx"
+        release.set()
+        assert blocked.result() is True
+
+
+def test_agents_of_concurrent_sessions_fetch_each_dataset_once(monkeypatch):
+    # Deux sessions analysent le même ticker en même temps : un seul appel Yahoo par dataset
+    calls, release = [], threading.Event()
+    fetch = MizanAgent._fetch
+    def counted(self, dataset):
+        calls.append(dataset)
+        release.wait(5)
+        return fetch(self, dataset)
+    monkeypatch.setattr(MizanAgent, "_fetch", counted)
+    cache = DiskCache(":memory:")
+    agents = [MizanAgent('ACME', cache=cache) for _ in range(2)]
+    before = shared(agent_module.FLIGHT.name)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        futures = [pool.submit(a.prefetch, ('info', 'balance_sheet')) for a in agents]
+        while shared(agent_module.FLIGHT.name) - before < 2: time.sleep(0.001)
+        release.set()
+        assert [f.result() for f in futures] == [{}, {}]
+    assert sorted(calls) == ['balance_sheet', 'info']
+    assert agents[0].info == agents[1].info
+
+
+
+def test_fetch_all_isolates_failures_and_timeouts():
+    release = threading.Event()
+    def fail(): raise ValueError("bad payload")
+    start = time.monotonic()
+    results, errors = fetch_all({'info': lambda: {'ok': 1}, 'slow': lambda: release.wait(5), 'bad': fail}, timeouts={'slow': 0.05})
+    release.set()
+    assert results == {'info': {'ok': 1}}
+    assert errors == {'slow': "timeout", 'bad': "ValueError: bad payload"}
+    assert time.monotonic() - start < 2
+
+
+def test_slow_dataset_falls_back_without_blocking_the_others(monkeypatch):
+    release = threading.Event()
+    fetch = MizanAgent._fetch
+    def slow_info(self, dataset):
+        if dataset == 'info': release.wait(5)
+        return fetch(self, dataset)
+    monkeypatch.setattr(MizanAgent, "_fetch", slow_info)
+    monkeypatch.setitem(agent_module.FETCH_TIMEOUTS, 'info', 0.05)
+    agent = MizanAgent('ACME', cache=DiskCache(":memory:"))
+    start = time.monotonic()
+    assert agent.prefetch(('info', 'balance_sheet', 'income_stmt')) == {'info': "timeout"}
+    assert time.monotonic() - start < 2
+    assert agent.info == {} and not agent.balance_sheet.empty
+    # Le résultat tardif ne remplace pas le repli déjà servi
+    release.set()
+    time.sleep(0.05)
+    assert agent.info == {}
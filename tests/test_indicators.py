@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from mizan.indicators import IndicatorBank
+from mizan.replay import ReplayProvider
+
+COLUMNS = ['close', 'bars', 'sma_20', 'sma_50', 'sma_200', 'ema_12', 'ema_26', 'atr_14', 'peak', 'drawdown', 'cross']
+
+
+def history(ticker='ACME'): return ReplayProvider().history(ticker, period='1y')
+
+
+def seeded(histories):
+    bank = IndicatorBank()
+    bank.ingest(histories, include_last=True)
+    return bank.snapshot(list(histories))
+
+
+def assert_same(a, b, columns=COLUMNS):
+    pd.testing.assert_frame_equal(a[columns], b[columns], check_exact=False, rtol=1e-9)
+
+
+def test_matches_pandas_on_the_full_series():
+    hist = history()
+    snap = seeded({'ACME': hist}).loc['ACME']
+    close = hist['Close']
+    for w in (20, 50, 200): assert snap[f'sma_{w}'] == pytest.approx(close.rolling(w).mean().iloc[-1])
+    for s in (12, 26): assert snap[f'ema_{s}'] == pytest.approx(close.ewm(span=s, adjust=False).mean().iloc[-1])
+    assert snap['peak'] == close.max() and snap['bars'] == len(hist)
+    assert snap['trend_broken'] == (close.iloc[-1] < close.rolling(50).mean().iloc[-1])
+
+
+def test_incremental_updates_match_a_full_reseed():
+    hist = history()
+    bank = IndicatorBank()
+    for end in (100, 101, 180, len(hist)): bank.ingest({'ACME': hist.iloc[:end]}, include_last=True)
+    assert_same(bank.snapshot(['ACME']), seeded({'ACME': hist}))
+
+
+def test_last_bar_is_a_provisional_preview():
+    hist = history()
+    bank = IndicatorBank()
+    pending = bank.ingest({'ACME': hist})
+    assert pending == {'ACME': hist['Close'].iloc[-1]}
+    assert bank.snapshot(['ACME']).loc['ACME', 'bars'] == len(hist) - 1
+    # Aperçu avec le cours en cours de séance == état amorcé avec cette barre (ATR et croisements exclus)
+    assert_same(bank.snapshot(['ACME'], pending), seeded({'ACME': hist}), ['close', 'sma_20', 'sma_50', 'sma_200', 'ema_12', 'ema_26', 'peak', 'drawdown'])
+
+
+def test_rewritten_history_reseeds_the_ticker():
+    hist = history()
+    bank = IndicatorBank()
+    bank.ingest({'ACME': hist.iloc[:-5]}, include_last=True)
+    # Split 2:1 appliqué rétroactivement par le fournisseur
+    split = hist.copy()
+    split[['Open', 'High', 'Low', 'Close']] /= 2
+    bank.ingest({'ACME': split}, include_last=True)
+    assert_same(bank.snapshot(['ACME']), seeded({'ACME': split}))
+
+
+def test_tickers_are_independent_across_calendars():
+    acme, glbx = history('ACME'), history('GLBX').iloc[::2]
+    together = seeded({'ACME': acme, 'GLBX': glbx})
+    assert_same(together.loc[['ACME']], seeded({'ACME': acme}))
+    assert_same(together.loc[['GLBX']], seeded({'GLBX': glbx}))
+    # Tickers ajoutés après coup : l'état existant est conservé quand les tableaux grandissent
+    bank = IndicatorBank()
+    bank.ingest({'ACME': acme}, include_last=True)
+    bank.ingest({f"T{i}": glbx for i in range(5)}, include_last=True)
+    assert_same(bank.snapshot(['ACME']), seeded({'ACME': acme}))
+    assert np.isnan(bank.snapshot(['T0']).loc['T0', 'sma_200'])
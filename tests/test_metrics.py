@@ -0,0 +1,77 @@
+import re
+
+import pytest
+
+from mizan import metrics
+from mizan.agent import run_analysis
+from mizan.client import default_client
+from mizan.metrics import Registry
+
+# Format texte d'exposition Prometheus 0.0.4 : commentaire TYPE, ou nom{étiquettes} valeur
+TYPE = re.compile(r"# TYPE ([a-zA-Z_:][a-zA-Z0-9_:]*) (counter|gauge|summary|histogram|untyped)")
+SAMPLE = re.compile(r'([a-zA-Z_:][a-zA-Z0-9_:]*)(\{(?:[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\\n]|\\.)*"(?:,[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\\n]|\\.)*")*)?\})? (\S+)')
+
+
+def parse(text):
+    # {nom: nombre d'échantillons} ; toute ligne hors format fait échouer le test, comme un scrape rejeté
+    samples, typed = {}, set()
+    for line in text.splitlines():
+        if line.startswith("#"):
+            match = TYPE.fullmatch(line)
+            assert match, line
+            assert match.group(1) not in typed, f"duplicate TYPE: {line}"
+            typed.add(match.group(1))
+            continue
+        match = SAMPLE.fullmatch(line)
+        assert match, line
+        float(match.group(3))
+        samples[match.group(1)] = samples.get(match.group(1), 0) + 1
+    return samples
+
+
+def test_export_parses():
+    r = Registry(log_path=None)
+    with r.span('fetch.info'): pass
+    with pytest.raises(KeyError):
+        with r.span('say "hi"\nthere'): raise KeyError()
+    r.incr("cache_lookups_total", cache="disk", dataset="info")
+    r.incr("errors_total", source='a\\b', kind='"quoted"')
+    r.gauge("disk_cache", lambda: {"hits": 3, "hit.rate": 0.5, "path": "/tmp/x"})
+    r.gauge("http", lambda: {"query2.finance.yahoo.com": {"circuit_open": 0, "tokens": 9.5}}, label="host")
+    samples = parse(r.to_prometheus())
+    assert samples["mizan_stage_seconds"] == 6
+    assert samples["mizan_errors_total"] == 2
+    assert samples["mizan_disk_cache_hit_rate"] == 1
+    assert "mizan_disk_cache_path" not in samples
+    assert samples["mizan_http_circuit_open"] == 1
+
+
+def test_default_registry_export_parses_after_an_analysis():
+    # Tous les noms réellement émis par le code (spans, compteurs, jauges des stores) passent le format
+    default_client()
+    run_analysis('ACME')
+    samples = parse(metrics.default_registry().to_prometheus())
+    assert samples["mizan_stage_seconds_count"] > 0
+
+
+@pytest.mark.parametrize("name, labels", [("prices.rewrite", {}), ("1st_total", {}), ("ok_total", {"bad-label": 1}), ("ok_total", {"9": 2})])
+def test_invalid_counter_names_are_rejected(name, labels):
+    with pytest.raises(ValueError): Registry(log_path=None).incr(name, **labels)
+
+
+def test_invalid_gauge_names_are_rejected():
+    r = Registry(log_path=None)
+    with pytest.raises(ValueError): r.gauge("http.client", dict)
+    with pytest.raises(ValueError): r.gauge("http", dict, label="host-name")
+
+
+def test_counts_and_percentiles():
+    r = Registry(log_path=None)
+    for ms in range(1, 101): r.observe("page.run", ms / 1000)
+    r.incr("cache_lookups_total", cache="disk", dataset="info")
+    r.incr("cache_lookups_total", value=3, cache="disk", dataset="history")
+    r.incr("cache_misses_total", cache="disk", dataset="history")
+    stage = r.stages()["page.run"]
+    assert stage["count"] == 100 and stage["p50"] == pytest.approx(0.051) and stage["max"] == pytest.approx(0.1)
+    assert r.count("cache_lookups_total", cache="disk") == 4
+    assert r.cache_rates()["disk:history"]["hit_rate"] == pytest.approx(2 / 3)
@@ -0,0 +1,109 @@
+import time
+
+import pandas as pd
+import pytest
+
+from mizan import metrics, monitor as monitor_module
+from mizan.agent import MizanAgent, exit_targets
+from mizan.cache import DiskCache
+from mizan.indicators import IndicatorBank
+from mizan.monitor import TARGET_METRICS, WatchlistMonitor
+from mizan.prices import PriceStore, window
+from mizan.replay import ReplayProvider
+from mizan.watchlist import WatchlistStore
+
+OWNERS = ('local', 'bob@example.test')
+
+
+class Feed:
+    # Historique servi par le "fournisseur", prolongé barre par barre par le test
+    def __init__(self, tickers):
+        provider = ReplayProvider()
+        self.bars = {t: provider.history(t, period='1y') for t in tickers}
+        self.calls = 0
+
+    def fetch(self, ticker, period=None, start=None):
+        self.calls += 1
+        hist = self.bars[ticker]
+        return hist[hist.index >= pd.Timestamp(start, tz=hist.index.tz)] if start is not None else window(hist, period)
+
+    def close_at(self, ticker, price):
+        hist = self.bars[ticker]
+        bar = hist.iloc[[-1]].copy()
+        bar.index = bar.index + pd.Timedelta(days=1)
+        bar[['Open', 'High', 'Low', 'Close']] = price
+        self.bars[ticker] = pd.concat([hist, bar])
+
+
+@pytest.fixture
+def setup(monkeypatch):
+    # Cours toujours « périmés » : chaque cycle relit les barres récentes
+    monkeypatch.setattr(monitor_module, "QUOTE_MAX_AGE", -1)
+    watchlists = WatchlistStore(":memory:")
+    watchlists.save("core", ['ACME'], owner=OWNERS[0])
+    watchlists.save("mine", ['acme', 'GLBX'], owner=OWNERS[1])
+    feed = Feed(['ACME', 'GLBX'])
+    cache = DiskCache(":memory:")
+    store = PriceStore(cache, feed.fetch)
+    make = lambda: WatchlistMonitor(watchlists, store, IndicatorBank(), cache, request_interval=0.0)
+    return watchlists, feed, make
+
+
+def evaluations(): return metrics.default_registry().count("monitor_evaluations_total")
+
+
+def aim(monitor, feed, ticker='ACME'):
+    # Objectifs fixés au-dessus du dernier cours, datés de maintenant : pas recalculés depuis les fondamentaux
+    price = float(feed.bars[ticker]['Close'].iloc[-1])
+    monitor.targets[ticker] = (price * 1.5, price * 2, time.time())
+    return price
+
+
+def test_targets_come_from_fundamentals(setup):
+    watchlists, feed, make = setup
+    monitor = make()
+    monitor.run_once()
+    agent = MizanAgent('ACME')
+    _, tp1, tp2 = exit_targets(agent.collect_data(TARGET_METRICS))
+    assert monitor.targets['ACME'][:2] == pytest.approx((tp1, tp2)) and tp1 > 0
+    assert monitor.stats() == {"cycles": 1, "tickers": 2, "targets": 2}
+
+
+def test_alerts_only_when_a_signal_turns_on(setup):
+    watchlists, feed, make = setup
+    monitor = make()
+    price = aim(monitor, feed)
+    tp2 = price * 2
+    assert all(kind == 'trend_break' for _, _, kind, _, _ in monitor.run_once())
+    before = evaluations()
+    # Cours inchangé : aucune réévaluation, aucune alerte
+    assert monitor.run_once() == [] and evaluations() == before
+    feed.close_at('ACME', price * 2.2)
+    alerts = monitor.run_once()
+    assert evaluations() == before + 1
+    assert sorted((owner, kind) for owner, ticker, kind, _, _ in alerts) == sorted((o, k) for o in OWNERS for k in ('tp1', 'tp2'))
+    assert [level for _, _, kind, _, level in alerts if kind == 'tp2'] == pytest.approx([tp2, tp2])
+    # Signal toujours actif au cycle suivant : pas de nouvelle alerte
+    feed.close_at('ACME', price * 2.4)
+    assert monitor.run_once() == []
+    # Chute sous la MA50 : cassure de tendance (les TP s'éteignent sans alerte)
+    feed.close_at('ACME', 1.0)
+    alerts = monitor.run_once()
+    assert sorted((owner, kind) for owner, _, kind, _, _ in alerts) == [(o, 'trend_break') for o in sorted(OWNERS)]
+    unread = watchlists.alerts(OWNERS[1])
+    assert [a['kind'] for a in unread if a['ticker'] == 'ACME'] == ['trend_break', 'tp2', 'tp1']
+    assert all(a['ticker'] == 'ACME' for a in watchlists.alerts(OWNERS[0]))
+
+
+def test_signal_state_survives_a_restart(setup):
+    watchlists, feed, make = setup
+    first = make()
+    price = aim(first, feed)
+    first.run_once()
+    feed.close_at('ACME', price * 2.2)
+    assert first.run_once()
+    # Nouveau process : l'état des signaux est relu, les signaux déjà actifs ne sont pas renotifiés
+    second = make()
+    second.targets = dict(first.targets)
+    assert second.run_once() == []
+    assert watchlists.signal_states()['ACME'] == second.signals['ACME'] != 0
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from mizan.agent import ANALYSIS_METRICS, MizanAgent
+from mizan.peers import PEER_METRICS, PeerIndex, composite, percentile_ranks
+from mizan.snapshot import Fundamentals
+
+
+def record(ticker, industry='Software', sector='Technology', **values):
+    return Fundamentals(ticker=ticker, name=ticker, industry=industry, sector=sector, **values)
+
+
+def test_percentile_ranks_average_ties_and_skip_nan():
+    ranks = percentile_ranks(np.array([[1.0], [2.0], [2.0], [np.nan], [3.0]]))
+    assert ranks[:, 0].tolist()[:3] == [12.5, 50.0, 50.0]
+    assert np.isnan(ranks[3, 0]) and ranks[4, 0] == 87.5
+
+
+def test_composite_follows_rule_direction():
+    # Lynch : PEG < seuil (plus bas = mieux) ; un rang de 100 sur le PEG compte comme 0
+    assert composite({'peg': 100.0}, 'Lynch') == 0.0
+    assert composite({'peg': 0.0}, 'Lynch') == 100.0
+    assert composite({}, 'Lynch') is None
+
+
+def test_group_ranks_and_sector_fallback():
+    index = PeerIndex(":memory:", min_peers=3)
+    index.update([record(f"S{i}", roe=float(i)) for i in range(4)] + [record("LONE", industry='Niche', roe=10.0)])
+    software = index.peers("S3")
+    assert software['level'] == 'industry' and software['count'] == 4 and software['ranks']['roe'] == 87.5
+    # Industrie trop petite : le ticker est situé dans son secteur
+    lone = index.peers("lone")
+    assert lone['level'] == 'sector' and lone['count'] == 5 and lone['ranks']['roe'] == 90.0
+    assert index.peers("UNKNOWN") is None
+
+
+def test_defaulted_metrics_stay_out_of_the_distribution():
+    index = PeerIndex(":memory:", min_peers=1)
+    index.update([record("A", roe=20.0), record("B", roe=10.0)])
+    # roe manquant chez C : le 0 par défaut de l'agent n'entre pas dans les quantiles
+    index.update([record("C", roe=0.0, defaulted="roe")])
+    peers = index.peers("A")
+    assert peers['quantiles']['roe'][0] == pytest.approx(11.0)
+    assert 'roe' not in index.peers("C")['ranks']
+    # Une mesure plus tard remplace l'absence ; un nouveau défaut garde la dernière mesure
+    index.update([record("A", roe=0.0, defaulted="roe")])
+    assert index.rows["A"][1][PEER_METRICS.index('roe')] == 20.0
+
+
+def test_records_without_profile_are_ignored():
+    index = PeerIndex(":memory:")
+    assert index.update([Fundamentals(ticker="X"), record("Y", industry='Unknown', sector='Unknown')]) == 0
+
+
+def test_rows_persist_across_instances(tmp_path):
+    path = str(tmp_path / "peers.sqlite")
+    PeerIndex(path, min_peers=1).update([record("A", roe=5.0)])
+    assert PeerIndex(path, min_peers=1).peers("A")['count'] == 1
+
+
+def test_from_agent_marks_missing_inputs():
+    agent = MizanAgent('ACME')
+    info = dict(agent.info)
+    del info['returnOnEquity'], info['totalCash']
+    agent._datasets['info'] = info
+    snapshot = Fundamentals.from_agent(agent, ANALYSIS_METRICS)
+    assert snapshot.defaulted == "net_debt_ebitda, roe"
+    assert snapshot.roe == 0
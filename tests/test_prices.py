@@ -0,0 +1,53 @@
+import pandas as pd
+
+from mizan import metrics
+from mizan.cache import DiskCache
+from mizan.prices import DATASET, PriceStore
+from mizan.replay import ReplayProvider
+
+
+def fixture_history(ticker='ACME'): return ReplayProvider().ticker(ticker).history(period='1y')
+
+
+def store_with(bars, served):
+    # Store dont la série stockée est `bars`, et dont le fournisseur renvoie désormais `served` (périmé : TTL nul)
+    calls = []
+    def fetch(ticker, period=None, start=None):
+        calls.append('full' if start is None else 'delta')
+        return served if start is None else served[served.index >= pd.Timestamp(start, tz=served.index.tz)]
+    store = PriceStore(DiskCache(":memory:", ttl={DATASET: 0}), fetch)
+    store.cache.set('ACME', DATASET, {'window': '1y', 'bars': bars})
+    return store, calls
+
+
+def test_merge_appends_new_bars():
+    hist = fixture_history()
+    store, calls = store_with(hist.iloc[:-5], hist)
+    merged = store.get('ACME')
+    assert calls == ['delta']
+    pd.testing.assert_frame_equal(merged, hist)
+
+
+def test_merge_refetches_after_split():
+    # Split 2:1 sur les dernières barres : Yahoo renvoie tout l'historique divisé par deux
+    hist = fixture_history()
+    adjusted = hist.copy()
+    adjusted[['Open', 'High', 'Low', 'Close']] /= 2
+    adjusted.loc[adjusted.index[-3], 'Stock Splits'] = 2.0
+    store, calls = store_with(hist.iloc[:-5], adjusted)
+    before = metrics.default_registry().count("prices_rewrites_total")
+    merged = store.get('ACME')
+    assert calls == ['delta', 'full']
+    assert metrics.default_registry().count("prices_rewrites_total") == before + 1
+    pd.testing.assert_frame_equal(merged, adjusted)
+
+
+def test_merge_refetches_when_overlap_was_readjusted():
+    # Dividende déjà hors du delta : seul l'écart sur la barre commune révèle le réajustement
+    hist = fixture_history()
+    adjusted = hist.copy()
+    adjusted[['Open', 'High', 'Low', 'Close']] *= 0.99
+    store, calls = store_with(hist.iloc[:-5], adjusted)
+    merged = store.get('ACME')
+    assert calls == ['delta', 'full']
+    pd.testing.assert_frame_equal(merged, adjusted)
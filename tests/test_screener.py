@@ -0,0 +1,56 @@
+import csv
+import threading
+
+import pytest
+
+from mizan import cli, screener
+from mizan.screener import iter_screen, scan_ticker, screen, to_rows
+
+TICKERS = ['ACME', 'GLBX', 'INIT']
+
+
+@pytest.mark.parametrize("strategy", ['Mizan', 'Graham', 'Lynch'])
+def test_batch_scoring_matches_single_ticker_scan(strategy):
+    rows = {r['ticker']: r for r in to_rows(screen(TICKERS, strategy))}
+    for ticker in TICKERS: assert rows[ticker] == scan_ticker(ticker, strategy)
+
+
+def test_replay_verdicts():
+    rows = {r['ticker']: r for r in to_rows(screen(TICKERS + ['NOPE'], 'Mizan'))}
+    assert rows['ACME']['shariah_status'] == "HALAL"
+    assert rows['INIT']['shariah_status'] == "HARAM" and "Boycott Listed" in rows['INIT']['shariah_details']
+    # Ticker inconnu : pas de faux HARAM tiré des valeurs par défaut
+    assert rows['NOPE']['shariah_status'] is None and rows['NOPE']['errors'] == "no data"
+
+
+def slow_collect(monkeypatch, slow):
+    # collect_row dont un ticker reste bloqué jusqu'à release.set()
+    release, collect = threading.Event(), screener.collect_row
+    def collect_row(ticker, strategy):
+        if ticker == slow: assert release.wait(5)
+        return collect(ticker, strategy)
+    monkeypatch.setattr(screener, "collect_row", collect_row)
+    return release
+
+
+def test_stream_does_not_wait_for_a_slow_ticker(monkeypatch):
+    release = slow_collect(monkeypatch, 'GLBX')
+    batches = iter_screen(TICKERS, 'Mizan', workers=3, stream=True)
+    # Les deux tickers rapides sortent (ensemble ou non) pendant que GLBX est encore bloqué
+    seen = []
+    while len(seen) < 2: seen += list(next(batches)['ticker'])
+    assert sorted(seen) == ['ACME', 'INIT']
+    release.set()
+    assert [list(b['ticker']) for b in batches] == [['GLBX']]
+
+
+def test_full_batches_without_stream():
+    assert [len(b) for b in iter_screen(TICKERS, 'Mizan', batch_size=2)] == [2, 1]
+
+
+def test_scan_cli_writes_every_row(tmp_path):
+    universe, out = tmp_path / "tickers.txt", tmp_path / "scan.csv"
+    universe.write_text("ticker\nACME\nGLBX\n# commentaire\nINIT\nACME\n")
+    assert cli.main(["scan", str(universe), "--strategy", "Lynch", "--out", str(out), "--quiet"]) == 0
+    with open(out, encoding='utf-8') as f: rows = list(csv.DictReader(f))
+    assert sorted(r['ticker'] for r in rows) == TICKERS
@@ -0,0 +1,72 @@
+import math
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from mizan.agent import ANALYSIS_METRICS, MizanAgent
+from mizan.snapshot import NO_DATA, NUMERIC_FIELDS, TEXT_FIELDS, Fundamentals, FundamentalsTable
+
+TICKERS = ('ACME', 'GLBX', 'INIT')
+
+
+def same(a, b):
+    # Égalité champ par champ, NaN == NaN
+    assert a.keys() == b.keys()
+    for f in a:
+        if isinstance(a[f], float) and math.isnan(a[f]): assert math.isnan(b[f]), f
+        else: assert a[f] == b[f], f
+
+
+def records(): return [Fundamentals.from_agent(MizanAgent(t), ANALYSIS_METRICS) for t in TICKERS]
+
+
+def test_from_agent_keeps_the_analysis_values():
+    agent = MizanAgent('INIT')
+    record = Fundamentals.from_agent(agent, ANALYSIS_METRICS)
+    data = agent.collect_data(ANALYSIS_METRICS)
+    assert record.name == data['name'] and record.is_boycotted is True
+    assert all(getattr(record, f) == float(data[f]) for f in NUMERIC_FIELDS if f in data)
+    assert (record.activity_ok, record.activity_msg) == agent.check_business_activity()
+    assert record.errors == "" and record.defaulted is None
+
+
+def test_unknown_ticker_snapshot_is_empty():
+    record = Fundamentals.from_agent(MizanAgent('NOPE'), ANALYSIS_METRICS)
+    assert record.errors == NO_DATA and record.name is None
+    assert all(math.isnan(getattr(record, f)) for f in NUMERIC_FIELDS)
+
+
+def test_table_record_round_trip():
+    recs = records()
+    table = FundamentalsTable.from_records(recs)
+    assert len(table) == 3 and table.nbytes == table.array.itemsize * 3
+    for r in recs: same(table.record(r.ticker).to_dict(), r.to_dict())
+    # Drapeau inconnu -> None, pas False
+    unknown = FundamentalsTable.from_records([Fundamentals(ticker='ACME', is_boycotted=None, activity_ok=False)]).record('acme')
+    assert unknown.is_boycotted is None and unknown.activity_ok is False and math.isnan(unknown.roe)
+
+
+def test_bytes_round_trip_without_pickle():
+    table = FundamentalsTable.from_records(records())
+    payload = table.to_bytes()
+    assert b"pickle" not in payload
+    pd.testing.assert_frame_equal(FundamentalsTable.from_bytes(payload).to_frame(), table.to_frame())
+
+
+def test_long_text_is_never_truncated():
+    name = "Very Long Holdings " * 10
+    errors = ", ".join(f"dataset_{i}: ConnectionError" for i in range(10))
+    long = Fundamentals(ticker='LONG', name=name, errors=errors)
+    assert len(name) > TEXT_FIELDS['name'] and len(errors) > TEXT_FIELDS['errors']
+    table = FundamentalsTable.concat([FundamentalsTable.from_records(records()), FundamentalsTable.from_records([long])])
+    assert table.record('LONG').name == name and table.record('LONG').errors == errors
+    assert table.record('ACME').name == records()[0].name
+
+
+def test_pickle_uses_the_compact_row():
+    record = records()[0]
+    same(pickle.loads(pickle.dumps(record)).to_dict(), record.to_dict())
+    frame = FundamentalsTable.from_records([record]).to_frame()
+    assert frame.loc[0, 'ticker'] == 'ACME' and frame['is_boycotted'].tolist() == [False]
+    assert np.isclose(frame.loc[0, 'market_cap'], record.market_cap)
@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+from mizan.replay import ReplayProvider
+from mizan.statements import FIELDS, STATEMENTS, latest_fields
+
+TICKERS = ('ACME', 'GLBX', 'INIT')
+
+
+def first_alias(df, items):
+    # Extraction d'avant le schéma canonique (MizanAgent._get_item) : premier libellé présent, colonne la plus récente
+    if df is None or df.empty: return 0
+    for item in items:
+        if item in df.index: return df.loc[item].iloc[0]
+    return 0
+
+
+@pytest.mark.parametrize("ticker", TICKERS)
+def test_latest_fields_match_first_alias(ticker):
+    stock = ReplayProvider().ticker(ticker)
+    statements = {ds: getattr(stock, ds) for ds in STATEMENTS}
+    latest = latest_fields(statements)
+    for name, (dataset, aliases) in FIELDS.items():
+        # Poste absent : NaN dans le schéma, 0 dans l'ancienne extraction (MizanAgent._field garde ce défaut)
+        assert np.nan_to_num(latest[name]) == pytest.approx(first_alias(statements[dataset], aliases)), name
@@ -0,0 +1,16 @@
+import pandas as pd
+import pytest
+
+from mizan.agent import STRATEGIES, STRATEGY_METRICS, MizanAgent
+
+TICKERS = ('ACME', 'GLBX', 'INIT')
+
+
+@pytest.mark.parametrize("strategy", sorted(STRATEGIES))
+def test_masks_match_scalar_rules(strategy):
+    # Règles compilées en masques (screener, backtest) == évaluation scalaire d'un ticker (analyse)
+    rows = [dict(MizanAgent(t).collect_data(STRATEGY_METRICS[strategy])) for t in TICKERS]
+    # Ligne sans aucune donnée : cas na / valid des règles
+    rows.append({m: None for m in STRATEGY_METRICS[strategy]})
+    masks = STRATEGIES[strategy].masks(pd.DataFrame(rows))
+    assert masks.to_numpy().tolist() == [[c['pass'] for c in STRATEGIES[strategy].evaluate(d)] for d in rows]
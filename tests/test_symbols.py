@@ -0,0 +1,68 @@
+import pytest
+
+from mizan import symbols
+from mizan.symbols import SymbolIndex, search_symbol
+
+ROWS = [
+    {'symbol': 'KO', 'shortname': 'Coca-Cola Company', 'exchange': 'NYQ', 'aliases': ''},
+    {'symbol': 'AAPL', 'shortname': 'Apple Inc.', 'exchange': 'NMS', 'aliases': ''},
+    {'symbol': 'AA', 'shortname': 'Alcoa Corporation', 'exchange': 'NYQ', 'aliases': ''},
+    {'symbol': 'GOOGL', 'shortname': 'Alphabet Inc.', 'exchange': 'NMS', 'aliases': 'Google'},
+    {'symbol': 'NESN.SW', 'shortname': 'Nestlé S.A.', 'exchange': 'EBS', 'aliases': ''},
+    {'symbol': 'MC.PA', 'shortname': 'LVMH Moët Hennessy', 'exchange': 'PAR', 'aliases': 'Louis Vuitton'},
+]
+
+
+@pytest.fixture
+def index(): return SymbolIndex(ROWS)
+
+
+def symbols_of(quotes): return [q['symbol'] for q in quotes]
+
+
+def test_exact_symbol_first(index):
+    # "aa" est aussi le préfixe de AAPL : le symbole exact passe devant
+    assert symbols_of(index.search("AA")) == ['AA', 'AAPL']
+
+
+def test_prefix_on_any_word_of_name_and_aliases(index):
+    assert symbols_of(index.search("cola")) == ['KO']
+    assert symbols_of(index.search("goog")) == ['GOOGL']
+    assert symbols_of(index.search("vuitton")) == ['MC.PA']
+    # Accents et suffixes de place
+    assert symbols_of(index.search("nestle")) == ['NESN.SW']
+    assert symbols_of(index.search("nesn.s")) == ['NESN.SW']
+
+
+def test_name_start_ranks_before_inner_word(index):
+    # "a" : symboles d'abord, puis débuts de nom, puis mots internes ; à rang égal, symbole le plus court
+    assert symbols_of(index.search("a")) == ['AA', 'AAPL', 'GOOGL']
+    assert symbols_of(index.search("a", limit=1)) == ['AA']
+
+
+def test_fuzzy_fallback_for_typos(index):
+    assert symbols_of(index.search("alphabte")) == ['GOOGL']
+    assert index.search("zzzz") == [] and index.search("  ") == []
+
+
+def test_from_file(tmp_path):
+    path = tmp_path / "symbols.csv"
+    path.write_text("symbol,shortname,exchange,aliases\nko,Coca-Cola Company,NYQ,Coke|Coca Cola\n", encoding="utf-8")
+    index = SymbolIndex.from_file(str(path))
+    assert len(index) == 1 and symbols_of(index.search("coke")) == ['KO']
+
+
+def test_remote_only_for_unknown_titles(monkeypatch):
+    monkeypatch.setattr(symbols, "default_symbol_index", lambda: SymbolIndex(ROWS))
+    calls = []
+    remote = lambda q: calls.append(q) or [{'symbol': 'XYZ'}]
+    assert symbols_of(search_symbol("Apple", remote)) == ['AAPL']
+    assert search_symbol(" Unknown Corp ", remote) == [{'symbol': 'XYZ'}]
+    assert calls == ["unknown corp"]
+    assert search_symbol("Unknown Corp", None) == []
+
+
+def test_remote_failure_returns_nothing(monkeypatch):
+    def fail(query, timeout): raise ConnectionError("offline")
+    monkeypatch.setattr(symbols.yahoo, "search", fail)
+    assert symbols.search_remote("acme") == []
@@ -0,0 +1,23 @@
+import os
+from functools import lru_cache
+
+import streamlit as st
+
+# =========================================================
+# 🎨 DESIGN SYSTEM PARTAGÉ (DARK LUXURY)
+# =========================================================
+# Une feuille commune (assets/base.css : polices, palette, fond, titres) et une feuille par page.
+# Lues et assemblées une fois par process ; chaque rerun renvoie la même chaîne.
+ASSETS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+
+
+@lru_cache(maxsize=None)
+def stylesheet(page):
+    parts = []
+    for name in ("base", page):
+        with open(os.path.join(ASSETS, f"{name}.css"), encoding="utf-8") as f: parts.append(f.read())
+    return "<style>\n" + "\n".join(parts) + "</style>"
+
+
+def apply_theme(page):
+    st.markdown(stylesheet(page), unsafe_allow_html=True)
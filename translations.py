@@ -0,0 +1,161 @@
+# =========================================================
+# 🌍 TRADUCTIONS (MODIFIED: INC_HARAM FR RENAMED)
+# =========================================================
+# Module importé une fois par process : les reruns ne reconstruisent pas les deux dictionnaires,
+# et app.py reste court à compiler (Streamlit réécrit l'AST du script à chaque compilation).
+TRANSLATIONS = {
+    'en': {
+        'sidebar_title': "Mizan Inv.", 'sidebar_subtitle': "Institutional Grade Analysis",
+        'analyze_btn': "INITIATE SCAN", 'search_placeholder': "Search ticker...", 
+        'no_result': "No asset found.", 'select_stock': "Select Asset", 'crunching': "Processing...",
+        'hero_title': "Take your wealth<br>to the next level.", 'hero_sub': "Manage. Analyze. Dominate.",
+        'search_title': "ASSET INTELLIGENCE",
+        'methodology': "Proprietary Algorithm",
+
+        'verdict_halal_title': "COMPLIANT ASSET", 'verdict_halal_desc': "Meets quantitative Shariah standards.",
+        'verdict_haram_title': "NON-COMPLIANT", 'verdict_haram_desc': "Failed checks: ",
+        'verdict_unknown_title': "VERIFICATION INCOMPLETE", 'verdict_unknown_desc': "Financial checks pass, but the boycott list could not be reached. Try again later.",
+        
+        'tab_fund': "STRATEGY AUDIT", 'tab_shariah': "COMPLIANCE", 'tab_exit': "EXIT PLAN",
+        
+        'company': "Issuer", 'company_help': "Official registered name.",
+        'price': "Spot Price", 'price_help': "Real-time market price.",
+        'mcap': "Market Cap", 'mcap_help': "Total value of all shares.",
+        'momentum': "Momentum (3M)", 'momentum_help': "Price trend over last 3 months.",
+        
+        'strategy_label': "STRATEGY SELECTION",
+        'strategy_active': "Active Strategy:",
+        'bullets_shariah': "• Debt < 33%<br>• Interest < 5%<br>• Real Assets > 20%",
+
+        'per': "P/E Ratio", 'per_help': "Price-to-Earnings Ratio. N/A usually means negative earnings.", 
+        'pb': "P/B Ratio", 'pb_help': "Price-to-Book Ratio.", 
+        'peg': "PEG Ratio", 'peg_help': "Price/Earnings-to-Growth. N/A means no growth or negative earnings.",
+        'fcf_yield': "FCF Yield", 'fcf_help': "Free Cash Flow Yield.",
+        'roe': "ROE", 'roe_help': "Return on Equity.", 
+        'margin': "Ops Margin", 'margin_help': "Operating Margin.",
+        'solvency': "Net Debt/EBITDA", 'solvency_help': "Years to pay off debt.",
+        'growth': "Rev Growth", 'growth_help': "Revenue Growth.",
+        'current_ratio': "Current Ratio", 'current_help': "Short-term liquidity.",
+        'debt_equity': "Debt/Equity", 'de_help': "Total Debt to Equity.",
+        'interest_cov': "Interest Cov.", 'ic_help': "Can the company pay its interest? (EBIT / Interest Expense).",
+        'goal': "Goal:",
+
+        'act_check': "Activity", 'act_help': "Sector Screening.",
+        'inc_haram': "Interest Inc.", 'inc_help': "Interest Income from cash deposits (Riba). Does not include operational revenue.", 'inc_target': "Limit < 5%",
+        'debt': "Leverage", 'debt_help': "Debt/Assets Ratio.", 'debt_target': "Limit < 33%",
+        'real_assets': "Real Assets", 'real_help': "Tangible Assets Ratio.", 'real_target': "Min > 20%",
+        'cash_cap': "Liquidity", 'cash_help': "Cash vs Market Cap.", 'cash_target': "Cash < Market Cap",
+        'boycott_check': "Boycott", 'boycott_help': "Boycott List Check.", 'boycott_target': "Not Listed",
+        'boycott_age': "List snapshot: {age} old", 'boycott_live': "Live lookup (no local snapshot)", 'unit_day': "d",
+        'debug_title': "🛠️ Debug: metrics", 'debug_stages': "Latency per stage (s)", 'debug_caches': "Cache hit rates", 'debug_counters': "Errors & counters",
+        'timeline_title': "Compliance history", 'timeline_freq': "Statements", 'timeline_annual': "Annual", 'timeline_quarterly': "Quarterly",
+        'timeline_empty': "No statement history available.", 'timeline_note': "Ratios per published statement; activity and boycott reflect the current profile.",
+        'purif_title': "Dividend purification", 'purif_shares': "Shares held", 'purif_total': "Total to purify",
+        'purif_help': "Dividend per share x share of interest income in revenue, for each fiscal year.",
+        
+        'status_safe': "SAFE", 'status_listed': "LISTED", 'status_unknown': "UNKNOWN",
+        'status_approved': "APPROVED", 'status_restricted': "RESTRICTED",
+        'status_pass': "PASS", 'status_fail': "FAIL",
+
+        # Exit Plan Keys
+        'peers_title': "👥 Peer Context", 'peers_scope': "among {n} companies · {group}",
+        'peers_composite': "Peer Score", 'peers_composite_help': "Average percentile on this strategy's metrics, oriented so that 100 is the best of the group.",
+        'peers_rank_help': "Percentile among peers (P100 = highest value). Peer median: {median}.",
+        'peers_none': "Not enough peers indexed yet: screen this sector to build the comparison.",
+        'chart_title': "Price Action", 'chart_range': "Range",
+        'range_1d': "1D", 'range_5d': "5D", 'range_1y': "1Y", 'range_5y': "5Y", 'range_max': "Max",
+        'dynamic_targets': "🎯 Dynamic Targets",
+        'tp1_safety': "TP1 (Safety)", 'tp2_euphoria': "TP2 (Euphoria)",
+        'tp1_help': "Partial profit taking zone.", 'tp2_help': "Full exit recommended.",
+        'trend_ma50': "Trend (MA50)", 'trend_broken': "⚠️ BROKEN", 'trend_intact': "✅ INTACT",
+        'trend_help': "If price falls below this line, the uptrend is broken.",
+        'drawdown': "Drawdown from peak", 'drawdown_help': "Distance from the highest close of the past year.",
+        'atr': "Volatility (ATR 14)", 'atr_help': "Average True Range: typical daily move, useful to size a stop-loss.",
+        'ma_cross': "MA20 / MA50 cross", 'cross_golden': "📈 BULLISH", 'cross_death': "📉 BEARISH", 'cross_none': "—",
+        'cross_help': "Last crossover of the 20-day average over the 50-day average.",
+        'alerts_title': "Watchlist alerts", 'alerts_read': "Mark as read",
+        'alert_trend_break': "📉 below MA50", 'alert_tp1': "🎯 TP1 reached", 'alert_tp2': "🚀 TP2 reached",
+        'ps_note': "ℹ️ *Note: Zero profits detected. Targets based on Revenue (Price/Sales).*",
+        'data_insufficient': "Insufficient data to calculate price targets."
+    },
+    'fr': {
+        'sidebar_title': "Mizan Inv.", 'sidebar_subtitle': "Analyse de niveau institutionnel",
+        'analyze_btn': "LANCER LE SCAN", 'search_placeholder': "Rechercher...", 
+        'no_result': "Aucun actif trouvé.", 'select_stock': "Sélectionner l'actif", 'crunching': "Traitement...",
+        'hero_title': "Votre patrimoine passe<br>au niveau supérieur.", 'hero_sub': "Gérez. Analysez. Dominez.",
+        'search_title': "INTELLIGENCE D'ACTIF",
+        'methodology': "Algorithme Propriétaire",
+
+        'verdict_halal_title': "ACTIF CONFORME", 'verdict_halal_desc': "Respecte les standards Shariah.",
+        'verdict_haram_title': "NON-CONFORME", 'verdict_haram_desc': "Échecs : ",
+        'verdict_unknown_title': "VÉRIFICATION INCOMPLÈTE", 'verdict_unknown_desc': "Critères financiers respectés, mais la liste boycott est injoignable. Réessayez plus tard.",
+        
+        'tab_fund': "AUDIT STRATÉGIQUE", 'tab_shariah': "CONFORMITÉ", 'tab_exit': "PLAN DE SORTIE",
+        
+        'company': "Émetteur", 'company_help': "Nom officiel enregistré.",
+        'price': "Prix Spot", 'price_help': "Prix marché temps réel.",
+        'mcap': "Capitalisation", 'mcap_help': "Valeur totale des actions.",
+        'momentum': "Momentum 3M", 'momentum_help': "Tendance sur 3 mois.",
+
+        'strategy_label': "SÉLECTION STRATÉGIE",
+        'strategy_active': "Stratégie Active :",
+        'bullets_shariah': "• Dette < 33%<br>• Intérêts < 5%<br>• Actifs Réels > 20%",
+
+        'per': "PER", 'per_help': "Ratio Cours/Bénéfice. N/A indique souvent un résultat net négatif.", 
+        'pb': "Price/Book", 'pb_help': "Ratio Cours/Actif Net.", 
+        'peg': "Ratio PEG", 'peg_help': "Ratio PER/Croissance. N/A indique une croissance ou des profits absents.",
+        'fcf_yield': "Rendement FCF", 'fcf_help': "Rendement du Cash Flow Libre.",
+        'roe': "ROE", 'roe_help': "Rentabilité des Capitaux Propres.", 
+        'margin': "Marge Ops", 'margin_help': "Marge Opérationnelle.",
+        'solvency': "Dette Nette/EBITDA", 'solvency_help': "Années pour rembourser la dette.",
+        'growth': "Croissance CA", 'growth_help': "Croissance du CA (Annuel).",
+        'current_ratio': "Ratio Courant", 'current_help': "Liquidité à court terme.",
+        'debt_equity': "Dette/Equity", 'de_help': "Dette sur Capitaux Propres.",
+        'interest_cov': "Couv. Intérêts", 'ic_help': "Capacité à payer les intérêts (EBIT / Charges d'intérêts).",
+        'goal': "Cible :",
+
+        'act_check': "Activité", 'act_help': "Scan Sectoriel.",
+        
+        # --- LABEL RENOMMÉ (FR) ---
+        'inc_haram': "Revenus basés sur Interets", 
+        'inc_help': "Intérêts perçus sur la trésorerie (Riba). N'inclut pas les revenus opérationnels.", 
+        'inc_target': "Limite < 5%",
+        # --------------------------
+
+        'debt': "Levier", 'debt_help': "Ratio Dette/Actifs.", 'debt_target': "Limite < 33%",
+        'real_assets': "Actifs Réels", 'real_help': "Ratio Actifs Tangibles.", 'real_target': "Min > 20%",
+        'cash_cap': "Liquidité", 'cash_help': "Cash vs Capitalisation.", 'cash_target': "Cash < Capitalisation",
+        'boycott_check': "Boycott", 'boycott_help': "Vérification Liste Boycott.", 'boycott_target': "Non Listé",
+        'boycott_age': "Instantané de la liste : {age}", 'boycott_live': "Recherche en ligne (pas d'instantané local)", 'unit_day': "j",
+        'debug_title': "🛠️ Debug : métriques", 'debug_stages': "Latence par étape (s)", 'debug_caches': "Taux de hit des caches", 'debug_counters': "Erreurs et compteurs",
+        'timeline_title': "Historique de conformité", 'timeline_freq': "États", 'timeline_annual': "Annuels", 'timeline_quarterly': "Trimestriels",
+        'timeline_empty': "Aucun historique d'états disponible.", 'timeline_note': "Ratios par état publié ; activité et boycott selon le profil actuel.",
+        'purif_title': "Purification des dividendes", 'purif_shares': "Actions détenues", 'purif_total': "Total à purifier",
+        'purif_help': "Dividende par action x part des revenus d'intérêts dans le chiffre d'affaires, pour chaque exercice.",
+
+        'status_safe': "SÛR", 'status_listed': "LISTÉ", 'status_unknown': "INCONNU",
+        'status_approved': "APPROUVÉ", 'status_restricted': "RESTREINT",
+        'status_pass': "VALIDE", 'status_fail': "ÉCHEC",
+
+        # Exit Plan Keys
+        'peers_title': "👥 Comparaison aux pairs", 'peers_scope': "parmi {n} sociétés · {group}",
+        'peers_composite': "Score vs pairs", 'peers_composite_help': "Centile moyen sur les métriques de la stratégie, orienté : 100 = meilleur du groupe.",
+        'peers_rank_help': "Centile parmi les pairs (P100 = valeur la plus haute). Médiane des pairs : {median}.",
+        'peers_none': "Pas encore assez de pairs indexés : lancez un screening du secteur pour construire la comparaison.",
+        'chart_title': "Action des Prix", 'chart_range': "Période",
+        'range_1d': "1J", 'range_5d': "5J", 'range_1y': "1A", 'range_5y': "5A", 'range_max': "Max",
+        'dynamic_targets': "🎯 Objectifs Dynamiques",
+        'tp1_safety': "TP1 (Sécurité)", 'tp2_euphoria': "TP2 (Euphorie)",
+        'tp1_help': "Zone de prise de profits partielle.", 'tp2_help': "Zone de sortie totale conseillée.",
+        'trend_ma50': "Tendance (MA50)", 'trend_broken': "⚠️ CASSÉE", 'trend_intact': "✅ INTACTE",
+        'trend_help': "Si le prix passe sous cette ligne, la tendance haussière est cassée.",
+        'drawdown': "Repli depuis le sommet", 'drawdown_help': "Écart avec la plus haute clôture de l'année écoulée.",
+        'atr': "Volatilité (ATR 14)", 'atr_help': "Average True Range : amplitude journalière typique, utile pour placer un stop.",
+        'ma_cross': "Croisement MM20 / MM50", 'cross_golden': "📈 HAUSSIER", 'cross_death': "📉 BAISSIER", 'cross_none': "—",
+        'cross_help': "Dernier croisement de la moyenne 20 jours avec la moyenne 50 jours.",
+        'alerts_title': "Alertes watchlists", 'alerts_read': "Marquer comme lues",
+        'alert_trend_break': "📉 sous la MM50", 'alert_tp1': "🎯 TP1 atteint", 'alert_tp2': "🚀 TP2 atteint",
+        'ps_note': "ℹ️ *Note : Profits nuls ou négatifs. Cibles basées sur le Chiffre d'Affaires (Price/Sales).*",
+        'data_insufficient': "Données insuffisantes pour calculer des objectifs de prix."
+    }
+}